@@ -3,16 +3,12 @@ Sample Data Generator for RecoverAI
 Populates the database with realistic debt cases for testing and demo purposes.
 """
 
-from modules.database import SessionLocal, DebtorDB, InvoiceDB, Base, engine
-from modules.riskon_engine.model import RiskonODE
-from modules.allocation_core.agent import AllocationAgent
+import logging
+from modules.database import SessionLocal, DebtorDB, InvoiceDB, engine, init_schema
+from modules.portfolio_summary import read_summary
+from modules.scoring import score_invoices
 
-# Initialize engines
-risk_engine = RiskonODE(decay_rate=0.03, boost_factor=0.15)
-allocation_agent = AllocationAgent(risk_engine)
-
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
 # Sample debtors with varying credit profiles
 SAMPLE_DEBTORS = [
@@ -39,93 +35,77 @@ SAMPLE_INVOICES = [
 ]
 
 def add_sample_data():
+    """
+    Loads the sample portfolio in bulk: one lookup per table, bulk inserts,
+    and one vectorized RISKON + Allocation pass for every invoice that needs a score.
+    """
+    # Create tables if they don't exist (here rather than at import, which is on the API's cold-start path)
+    init_schema(engine)
+
     db = SessionLocal()
     print("\n" + "="*50)
     print("RecoverAI - Sample Data Engine")
     print("="*50)
     
     try:
-        print("[*] Adding sample debtors...")
-        debtor_objects = []
-        
-        for debtor_data in SAMPLE_DEBTORS:
-            # Check if debtor already exists
-            existing = db.query(DebtorDB).filter(DebtorDB.name == debtor_data["name"]).first()
-            if existing:
-                print(f"  [SKIP] {debtor_data['name']} (already exists)")
-                debtor_objects.append(existing)
-            else:
-                debtor = DebtorDB(**debtor_data, is_sample=1)  # Mark as sample
-                db.add(debtor)
-                db.flush()  # Get the ID
-                debtor_objects.append(debtor)
-                print(f"  [OK] Added {debtor_data['name']}")
-        
-        db.commit()
-        
-        print("\n[*] Adding sample invoices...")
+        # 1. Debtors: one lookup, insert only the missing ones
+        names = [d["name"] for d in SAMPLE_DEBTORS]
+        existing = {d.name: d for d in db.query(DebtorDB).filter(DebtorDB.name.in_(names))}
+        new_debtors = [
+            DebtorDB(**debtor_data, is_sample=1)  # Mark as sample
+            for debtor_data in SAMPLE_DEBTORS if debtor_data["name"] not in existing
+        ]
+        db.add_all(new_debtors)
+        db.flush()  # Get the IDs
+        existing.update({d.name: d for d in new_debtors})
+        debtor_objects = [existing[name] for name in names]
+        print(f"[*] Debtors: {len(new_debtors)} added, {len(names) - len(new_debtors)} already present")
+
+        # 2. Invoices: one lookup keyed by (debtor, amount)
+        debtor_ids = [d.id for d in debtor_objects]
+        existing_invoices = {
+            (inv.debtor_id, inv.amount): inv
+            for inv in db.query(InvoiceDB).filter(InvoiceDB.debtor_id.in_(debtor_ids))
+        }
+
+        to_score, initial_scores = [], []
+        new_invoices = []
         for invoice_data in SAMPLE_INVOICES:
             debtor = debtor_objects[invoice_data["debtor_idx"]]
-            
-            # Check if invoice already exists for this debtor with same amount
-            existing_invoice = db.query(InvoiceDB).filter(
-                InvoiceDB.debtor_id == debtor.id,
-                InvoiceDB.amount == invoice_data["amount"]
-            ).first()
-            
-            if existing_invoice:
-                if existing_invoice.p_score == 0.0 or existing_invoice.decision == "PENDING":
-                    print(f"  [UPDATE] refreshing scores for {debtor.name}...")
-                    case_metadata = {
-                        "initial_score": debtor.credit_score,
-                        "age_days": invoice_data["age_days"],
-                        "history_logs": []
-                    }
-                    existing_invoice.p_score = risk_engine.predict_probability(
-                        case_metadata["initial_score"],
-                        case_metadata["age_days"],
-                        case_metadata["history_logs"]
-                    )
-                    decision_obj = allocation_agent.allocate_case(case_metadata)
-                    existing_invoice.decision = decision_obj["action"]
-                    existing_invoice.risk_level = "SAFE"
-                    print(f"    -> Prob: {existing_invoice.p_score:.2%}, Strategy: {existing_invoice.decision}")
-                else:
-                    print(f"  [SKIP] invoice for {debtor.name} (already has score)")
-            else:
-                # 1. Calculate realistic initial score and strategy
-                case_metadata = {
-                    "initial_score": debtor.credit_score,
-                    "age_days": invoice_data["age_days"],
-                    "history_logs": [] # No logs yet for samples
-                }
-                
-                # Use the agent to calculate probability and decision
-                p_score = risk_engine.predict_probability(
-                    case_metadata["initial_score"],
-                    case_metadata["age_days"],
-                    case_metadata["history_logs"]
-                )
-                decision_obj = allocation_agent.allocate_case(case_metadata)
+            invoice = existing_invoices.get((debtor.id, invoice_data["amount"]))
 
+            if invoice:
+                if not (invoice.p_score == 0.0 or invoice.decision == "PENDING"):
+                    logger.debug("Skip invoice for %s (already has score)", debtor.name)
+                    continue
+                logger.debug("Refreshing scores for %s", debtor.name)
+            else:
                 invoice = InvoiceDB(
                     debtor_id=debtor.id,
                     amount=invoice_data["amount"],
                     age_days=invoice_data["age_days"],
-                    p_score=p_score,
-                    decision=decision_obj["action"],
-                    risk_level="SAFE", # Default samples to SAFE
                     status="PENDING"
                 )
-                db.add(invoice)
-                print(f"  [OK] Added Rs.{invoice_data['amount']:,} invoice for {debtor.name} (Prob: {p_score:.2%}, Strategy: {decision_obj['action']})")
-        
+                new_invoices.append(invoice)
+                logger.debug("Adding Rs.%s invoice for %s", f"{invoice_data['amount']:,}", debtor.name)
+
+            invoice.risk_level = "SAFE"  # Default samples to SAFE
+            to_score.append(invoice)
+            initial_scores.append(debtor.credit_score)
+
+        # 3. Score everything in one vectorized pass, then bulk insert
+        score_invoices(to_score, initial_scores)
+        db.add_all(new_invoices)
         db.commit()
+        print(f"[*] Invoices: {len(new_invoices)} added, {len(to_score) - len(new_invoices)} re-scored")
         
+        # From the maintained portfolio summary, not a scan of the invoices
+        summary = read_summary(db)
+        total_outstanding = summary["by_status"].get("PENDING", {"outstanding": 0})["outstanding"]
         print("\n[SUCCESS] Sample data loaded!")
         print(f"[DATA] Total Debtors: {db.query(DebtorDB).count()}")
-        print(f"[DATA] Total Invoices: {db.query(InvoiceDB).count()}")
-        print(f"[DATA] Total Outstanding: Rs.{sum([inv.amount for inv in db.query(InvoiceDB).filter(InvoiceDB.status == 'PENDING').all()]):,}")
+        print(f"[DATA] Total Invoices: {summary['totals']['invoices']}")
+        print(f"[DATA] Total Outstanding: Rs.{total_outstanding:,}")
         
     except Exception as e:
         print(f"[ERROR] {e}")
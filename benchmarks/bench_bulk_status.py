@@ -0,0 +1,79 @@
+"""
+Bulk Status Update Benchmark
+Moving a cohort of PENDING cases to IN_PROGRESS:
+  - per case:   PATCH /api/v1/cases/{case_id}/status once per case (timed on a sample,
+                reported as cases/s)
+  - bulk ids:   POST /api/v1/cases/status/bulk with the cohort's case_ids
+  - bulk filter: the same endpoint with a filter (status + age range) instead of ids
+Each bulk request is one transaction; the portfolio summary is checked with reconcile()
+afterwards.
+
+Usage:
+  python benchmarks/bench_bulk_status.py --invoices 200000 --cohort 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=200_000)
+    parser.add_argument("--cohort", type=int, default=20_000)
+    parser.add_argument("--sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_bulk_status.db')}"
+    os.environ["BOOTSTRAP_ON_STARTUP"] = "false"
+    os.environ.setdefault("SLOW_QUERY_MS", "1e9")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    import main as app_main
+    from generate_portfolio import load_database
+    from modules import portfolio_summary
+    from modules.database import engine, rebuild_portfolio_summary
+    from modules.security import verify_token
+
+    load_database(debtors=args.invoices // 10, invoices=args.invoices, logs=0, is_sample=0)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE invoices SET status = 'PENDING'"))
+        rebuild_portfolio_summary(conn)
+        ids = conn.execute(text("SELECT id FROM invoices ORDER BY id")).scalars().all()
+    app_main.app.dependency_overrides[verify_token] = lambda: "bench"
+    client = TestClient(app_main.app)
+    print(f"{args.invoices:,} invoices, cohort of {args.cohort:,}")
+
+    sample, cohort = ids[:args.sample], ids[args.sample:args.sample + args.cohort]
+    started = time.perf_counter()
+    for invoice_id in sample:
+        client.patch(f"/api/v1/cases/C-{invoice_id}/status", json={"new_status": "IN_PROGRESS"})
+    per_case = len(sample) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    by_ids = client.post("/api/v1/cases/status/bulk", json={
+        "new_status": "IN_PROGRESS", "case_ids": [f"C-{i}" for i in cohort]}).json()
+    ids_rate = by_ids["updated"] / (time.perf_counter() - started)
+
+    # The filter cohort: PENDING cases in an age range of about the same size
+    with engine.connect() as conn:
+        low, high = conn.execute(text(
+            "SELECT MIN(age_days), MAX(age_days) FROM (SELECT age_days FROM invoices WHERE status = 'PENDING' "
+            "ORDER BY age_days LIMIT :n)"), {"n": args.cohort}).one()
+    started = time.perf_counter()
+    by_filter = client.post("/api/v1/cases/status/bulk", json={
+        "new_status": "IN_PROGRESS", "filter": {"status": "PENDING", "min_age_days": low, "max_age_days": high}}).json()
+    filter_rate = by_filter["updated"] / (time.perf_counter() - started)
+
+    print(f"\n{'method':<14}{'cases':>10}{'cases/s':>12}")
+    print(f"{'per case':<14}{len(sample):>10,}{per_case:>12,.0f}")
+    print(f"{'bulk ids':<14}{by_ids['updated']:>10,}{ids_rate:>12,.0f}")
+    print(f"{'bulk filter':<14}{by_filter['updated']:>10,}{filter_rate:>12,.0f}")
+    print(f"summary drift after: {portfolio_summary.reconcile() or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Case List Projection Benchmark
+Response bytes and server time of GET /api/v1/cases, full vs a sparse fieldset, on a
+portfolio where every case has a long interaction history (cache disabled, median of N).
+Also times one page of GET /api/v1/cases/{case_id}/history, the lazy replacement.
+
+Usage:
+  python benchmarks/bench_case_list.py --invoices 2000 --logs-per-case 40 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEADLINE = "companyName,amount,status,pScore,riskLevel,paidAmount"
+
+def timed_get(client, url, params, repeat, clear=None):
+    times, body = [], b""
+    for _ in range(repeat):
+        if clear:
+            clear()
+        started = time.perf_counter()
+        response = client.get(url, params=params)
+        times.append((time.perf_counter() - started) * 1000)
+        body = response.content
+    return statistics.median(times), len(body)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=2000)
+    parser.add_argument("--logs-per-case", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_cases.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["BOOTSTRAP_ON_STARTUP"] = "false"
+
+    from fastapi.testclient import TestClient
+    import main as app_main
+    from generate_portfolio import load_database
+    from modules.security import verify_token
+
+    load_database(debtors=args.invoices // 2, invoices=args.invoices, logs=args.invoices * args.logs_per_case)
+    app_main.app.dependency_overrides[verify_token] = lambda: "bench"
+    client = TestClient(app_main.app)
+    clear = app_main.case_list_cache.clear
+
+    full_ms, full_bytes = timed_get(client, "/api/v1/cases", {}, args.repeat, clear)
+    sparse_ms, sparse_bytes = timed_get(client, "/api/v1/cases", {"fields": HEADLINE}, args.repeat, clear)
+    case_id = client.get("/api/v1/cases", params={"fields": "status"}).json()[0]["case_id"]
+    page_ms, page_bytes = timed_get(client, f"/api/v1/cases/{case_id}/history", {"limit": 20}, args.repeat)
+
+    print(f"{'request':<32} {'ms':>8} {'bytes':>12}")
+    print(f"{'cases (full)':<32} {full_ms:>8.1f} {full_bytes:>12,}")
+    print(f"{'cases ?fields=' + HEADLINE[:16] + '...':<32} {sparse_ms:>8.1f} {sparse_bytes:>12,}")
+    print(f"{'history (one page of 20)':<32} {page_ms:>8.1f} {page_bytes:>12,}")
+    print(f"sparse vs full: {full_ms / sparse_ms:.1f}x faster, {full_bytes / sparse_bytes:.1f}x smaller")
+
+if __name__ == "__main__":
+    main()
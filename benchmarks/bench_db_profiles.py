@@ -0,0 +1,103 @@
+"""
+SQLite Profile Benchmark
+Concurrent read and write throughput of each SQLITE_PROFILE (see modules/database.py),
+one fresh interpreter and database file per profile:
+  - readers:  active-case page (invoices join debtors, 200 rows) + one case by id
+  - writers:  a status-PATCH-shaped transaction (read invoice, update it, insert a
+              StatusHistoryDB row, commit) through SessionLocal, version hooks included
+Reports operations/s per kind and how many failed with "database is locked".
+
+Usage:
+  python benchmarks/bench_db_profiles.py --readers 8 --writers 4 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, random, sys, threading, time
+from datetime import datetime
+sys.path.insert(0, {root!r})
+from generate_portfolio import load_database
+from modules.database import SessionLocal, DebtorDB, InvoiceDB, StatusHistoryDB, SQLITE_PRAGMAS
+
+load_database(debtors=2000, invoices={invoices}, logs={invoices}, is_sample=0)
+counts = {{"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}}
+lock = threading.Lock()
+stop = time.perf_counter() + {seconds}
+
+def reader(seed):
+    rng = random.Random(seed)
+    while time.perf_counter() < stop:
+        db = SessionLocal()
+        try:
+            db.query(InvoiceDB.id, InvoiceDB.status, DebtorDB.name).join(DebtorDB, InvoiceDB.debtor_id == DebtorDB.id) \
+              .filter(InvoiceDB.status.notin_(["RESOLVED", "CLOSED"])).limit(200).all()
+            db.query(InvoiceDB).filter(InvoiceDB.id == rng.randint(1, {invoices})).first()
+            kind = "reads"
+        except Exception:
+            kind = "read_errors"
+        finally:
+            db.close()
+        with lock:
+            counts[kind] += 1
+
+def writer(seed):
+    rng = random.Random(seed)
+    while time.perf_counter() < stop:
+        db = SessionLocal()
+        try:
+            invoice = db.query(InvoiceDB).filter(InvoiceDB.id == rng.randint(1, {invoices})).first()
+            old, invoice.status = invoice.status, rng.choice(["IN_PROGRESS", "UNDER_REVIEW", "ESCALATED"])
+            db.add(StatusHistoryDB(invoice_id=invoice.id, old_status=old, new_status=invoice.status,
+                                   changed_by="bench", changed_at=datetime(2025, 1, 1), auto_updated=0))
+            db.commit()
+            kind = "writes"
+        except Exception:
+            db.rollback()
+            kind = "write_errors"
+        finally:
+            db.close()
+        with lock:
+            counts[kind] += 1
+
+threads = [threading.Thread(target=reader, args=(i,)) for i in range({readers})]
+threads += [threading.Thread(target=writer, args=(100 + i,)) for i in range({writers})]
+started = time.perf_counter()
+for t in threads: t.start()
+for t in threads: t.join()
+elapsed = time.perf_counter() - started
+print(json.dumps({{"pragmas": SQLITE_PRAGMAS, "seconds": elapsed, **counts}}))
+"""
+
+def run_profile(profile, args):
+    path = os.path.join(tempfile.mkdtemp(), f"profile_{profile}.db")
+    env = {**os.environ, "SQLITE_PROFILE": profile, "DATABASE_URL": f"sqlite:///{path}", "SLOW_QUERY_MS": "1e9"}
+    code = CHILD.format(root=ROOT, invoices=args.invoices, seconds=args.seconds, readers=args.readers, writers=args.writers)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", default=["legacy", "wal"])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--invoices", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{args.readers} reader + {args.writers} writer threads, {args.seconds:.0f}s per profile")
+    print(f"{'profile':<10}{'reads/s':>10}{'writes/s':>10}{'read errors':>13}{'write errors':>14}")
+    for profile in args.profiles:
+        r = run_profile(profile, args)
+        print(f"{profile:<10}{r['reads'] / r['seconds']:>10.1f}{r['writes'] / r['seconds']:>10.1f}"
+              f"{r['read_errors']:>13}{r['write_errors']:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Event Bus Benchmark
+In-process (no sockets) cost of the /api/v1/events fan-out, for N connected clients:
+  - idle_cpu_pct:    process CPU while all clients wait for events (heartbeat default 15s)
+  - fanout_ms:       publish one event from a worker thread -> every client has yielded it
+  - per_delivery_us: CPU per (event, client) pair over a burst of events
+  - max_pending:     largest per-client buffer after a burst to clients that never read
+                     (bounded by EVENT_QUEUE_SIZE: coalesced per case, oldest dropped)
+
+Usage:
+  python benchmarks/bench_events.py --clients 5000 --idle 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import events
+
+def make_event(i, cases):
+    return events.StatusChanged(f"C-{i % cases}", i, "IN_PROGRESS", "UNDER_REVIEW", "SYSTEM", "bench", True, "")
+
+async def consume(subscription, received):
+    async for chunk in events.event_stream(subscription):
+        received[0] += chunk.count("event: status_changed")
+
+def publish_from_thread(batch):
+    worker = threading.Thread(target=events.bus.publish, args=(batch,))
+    worker.start()
+    worker.join()
+
+async def run(args):
+    received = [0]
+    subscriptions = [events.bus.subscribe() for _ in range(args.clients)]
+    tasks = [asyncio.create_task(consume(s, received)) for s in subscriptions]
+    await asyncio.sleep(0.5)  # Let every client reach its wait
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    await asyncio.sleep(args.idle)
+    idle_cpu_pct = 100 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+    async def until_received(target):
+        while received[0] < target:
+            await asyncio.sleep(0.0005)
+
+    started = time.perf_counter()
+    publish_from_thread([make_event(0, 1)])
+    await until_received(args.clients)
+    fanout_ms = (time.perf_counter() - started) * 1000
+
+    cpu = time.process_time()
+    for i in range(args.events):
+        publish_from_thread([make_event(i, args.events)])
+        await until_received(args.clients * (i + 2))
+    per_delivery_us = (time.process_time() - cpu) / (args.events * args.clients) * 1e6
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Clients that never read: buffers stay bounded however many events arrive
+    stalled = [events.bus.subscribe() for _ in range(min(args.clients, 100))]
+    for i in range(0, args.burst, 100):
+        events.bus.publish([make_event(j, args.burst // 4) for j in range(i, i + 100)])
+    await asyncio.sleep(0.1)
+    max_pending = max(len(s.pending) for s in stalled)
+    for subscription in stalled:
+        events.bus.unsubscribe(subscription)
+
+    print(f"clients={args.clients}")
+    print(f"idle_cpu_pct={idle_cpu_pct:.2f}")
+    print(f"fanout_ms={fanout_ms:.1f}")
+    print(f"per_delivery_us={per_delivery_us:.2f}")
+    print(f"max_pending={max_pending} (EVENT_QUEUE_SIZE={events.EVENT_QUEUE_SIZE}, burst={args.burst})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds to measure idle CPU over")
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=10000)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""
+Ingestion Parse Benchmark for RecoverAI
+Times read_upload() on the same invoice dataset encoded as CSV, CSV.gz, CSV.zst,
+Parquet and Arrow IPC.
+
+Usage: python benchmarks/bench_ingest_formats.py --rows 200000 --repeat 5 [--json out.json]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add parent directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.ingestion import read_upload
+
+def build_dataset(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "company_name": [f"Debtor {i:07d} Pvt Ltd" for i in rng.integers(0, rows // 4 + 1, rows)],
+        "amount": rng.lognormal(11.5, 1.0, rows).round(2),
+        "age_days": rng.integers(1, 365, rows),
+        "credit_score": rng.beta(5, 2, rows).round(3),
+        "phone": [f"+91{n}" for n in rng.integers(7_000_000_000, 9_999_999_999, rows)],
+    })
+
+def encode_all(df):
+    csv_bytes = df.to_csv(index=False).encode()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    zst = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(zst, "zstd") as out:
+        out.write(csv_bytes)
+
+    parquet = pa.BufferOutputStream()
+    pq.write_table(table, parquet)
+
+    arrow = pa.BufferOutputStream()
+    with pa.ipc.new_file(arrow, table.schema) as writer:
+        writer.write_table(table)
+
+    return {
+        "csv": csv_bytes,
+        "csv.gz": gzip.compress(csv_bytes),
+        "csv.zst": zst.getvalue().to_pybytes(),
+        "parquet": parquet.getvalue().to_pybytes(),
+        "arrow": arrow.getvalue().to_pybytes(),
+    }
+
+def time_parse(payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_upload(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parse time of supported upload formats")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    payloads = encode_all(build_dataset(args.rows))
+    baseline = None
+    results = []
+
+    print(f"{'format':<10}{'bytes':>14}{'parse ms':>12}{'vs csv':>9}")
+    for fmt, payload in payloads.items():
+        seconds = time_parse(payload, args.repeat)
+        baseline = baseline or seconds
+        results.append({"format": fmt, "bytes": len(payload), "parse_ms": round(seconds * 1000, 2)})
+        print(f"{fmt:<10}{len(payload):>14,}{seconds * 1000:>12.1f}{baseline / seconds:>8.1f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "repeat": args.repeat, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
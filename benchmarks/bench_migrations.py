@@ -0,0 +1,93 @@
+"""
+Online Migration Benchmark
+What a backfill on a large invoices table does to concurrent writers. The same change (add
+a column, fill it from every row, index it) is applied twice on one SQLite file while writer
+threads run status-PATCH-shaped transactions:
+  - one statement:  ALTER + a single UPDATE over the table + CREATE INDEX (the table is
+                    write-locked until it finishes)
+  - migration:      Operations.add_column / backfill / create_index, batches of
+                    MIGRATION_BATCH_SIZE rows with MIGRATION_BATCH_SLEEP_MS between them
+Reports the change's duration, writer throughput and the worst writer stall during it.
+
+Usage:
+  python benchmarks/bench_migrations.py --invoices 1000000 --writers 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=1_000_000)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--sleep-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_migrations.db')}"
+    os.environ.setdefault("SLOW_QUERY_MS", "1e9")
+    from sqlalchemy import text
+    from generate_portfolio import load_database
+    from modules import migrations
+    from modules.database import engine, SessionLocal, InvoiceDB
+
+    load_database(debtors=args.invoices // 10, invoices=args.invoices, logs=0, is_sample=0)
+    print(f"{args.invoices:,} invoices, {args.writers} writer threads")
+
+    def with_writers(change):
+        stop, latencies, errors = threading.Event(), [], []
+        def writer(seed):
+            rng = random.Random(seed)
+            while not stop.is_set():
+                started = time.perf_counter()
+                db = SessionLocal()
+                try:
+                    invoice = db.get(InvoiceDB, rng.randint(1, args.invoices))
+                    invoice.status = rng.choice(["IN_PROGRESS", "UNDER_REVIEW", "ESCALATED"])
+                    db.commit()
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    db.rollback()
+                    errors.append(1)
+                finally:
+                    db.close()
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+        for t in threads:
+            t.start()
+        time.sleep(1)  # Writers warmed up
+        del latencies[:]
+        started = time.perf_counter()
+        change()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for t in threads:
+            t.join()
+        return elapsed, len(latencies) / elapsed, max(latencies, default=0) * 1000, len(errors)
+
+    def one_statement():
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE invoices ADD COLUMN due_a FLOAT"))
+            conn.execute(text("UPDATE invoices SET due_a = amount - paid_amount"))
+            conn.execute(text("CREATE INDEX ix_invoices_due_a ON invoices (due_a)"))
+
+    def migration():
+        op = migrations.Operations(engine, 999, args.batch_size, args.sleep_ms, log=lambda line: None)
+        op.add_column("invoices", "due_b", "FLOAT")
+        op.backfill("due_b", "invoices", "UPDATE invoices SET due_b = amount - paid_amount WHERE id >= :low AND id < :high")
+        op.create_index("ix_invoices_due_b", "invoices", ["due_b"])
+
+    print(f"\n{'change':<16}{'seconds':>9}{'writes/s':>10}{'worst stall ms':>16}{'errors':>8}")
+    for name, change in (("one statement", one_statement), ("migration", migration)):
+        elapsed, rate, worst, errors = with_writers(change)
+        print(f"{name:<16}{elapsed:>9.1f}{rate:>10.1f}{worst:>16.0f}{errors:>8}")
+
+if __name__ == "__main__":
+    main()
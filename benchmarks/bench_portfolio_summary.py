@@ -0,0 +1,93 @@
+"""
+Portfolio Summary Benchmark
+Dashboard KPIs (counts and balances by status, risk level, decision and age bucket):
+  - scan:     the GROUP BY over invoices that the summary table is built from (what a
+              KPI query costs without it)
+  - summary:  /api/v1/portfolio/summary's read of portfolio_summary (version + rows)
+and what maintaining the table costs a write: a status-PATCH-shaped transaction with the
+summary hooks on and off (best of N).
+
+Usage:
+  python benchmarks/bench_portfolio_summary.py --invoices 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_summary.db')}"
+    os.environ.setdefault("SLOW_QUERY_MS", "1e9")
+    from sqlalchemy import event
+    from generate_portfolio import load_database
+    from modules import database, portfolio_summary
+    from modules.database import SessionLocal, InvoiceDB, PortfolioSummaryDB, get_portfolio_version, summary_aggregate
+
+    load_database(debtors=args.invoices // 10, invoices=args.invoices, logs=0, is_sample=0)
+    db = SessionLocal()
+    groups = db.query(PortfolioSummaryDB).count()
+    print(f"{args.invoices:,} invoices in {groups} summary groups")
+
+    scan = best_ms(lambda: portfolio_summary.summarize(
+        portfolio_summary.PortfolioSummaryDB(status=r[0], risk_level=r[1], decision=r[2], age_bucket=r[3],
+                                             invoices=r[4], amount=r[5], paid_amount=r[6])
+        for r in db.execute(summary_aggregate())), args.repeat)
+    summary = best_ms(lambda: (get_portfolio_version(db), portfolio_summary.read_summary(db)), args.repeat)
+    db.close()
+    print(f"\n{'KPI read':<24}{'ms':>10}")
+    print(f"{'scan (GROUP BY invoices)':<24}{scan:>10.2f}")
+    print(f"{'summary table':<24}{summary:>10.2f}")
+    print(f"speedup: {scan / summary:,.0f}x")
+
+    rng = random.Random(1)
+    def write():
+        session = SessionLocal()
+        invoice = session.get(InvoiceDB, rng.randint(1, args.invoices))
+        invoice.status = rng.choice(["IN_PROGRESS", "UNDER_REVIEW", "ESCALATED"])
+        invoice.paid_amount = (invoice.paid_amount or 0) + 10
+        session.commit()
+        session.close()
+
+    def per_write_ms():
+        times = []
+        for _ in range(args.writes):
+            started = time.perf_counter()
+            write()
+            times.append((time.perf_counter() - started) * 1000)
+        return statistics.median(times)
+
+    per_write_ms()  # Warm the page cache
+    with_hooks, without_hooks = [], []
+    for _ in range(3):  # Alternate, so drift in cache state hits both sides
+        with_hooks.append(per_write_ms())
+        event.remove(SessionLocal, "before_flush", database.track_summary_changes)
+        without_hooks.append(per_write_ms())
+        event.listen(SessionLocal, "before_flush", database.track_summary_changes)
+    with_hooks, without_hooks = min(with_hooks), min(without_hooks)
+    print(f"\n{'status write':<24}{'median ms':>10}")
+    print(f"{'without summary':<24}{without_hooks:>10.3f}")
+    print(f"{'with summary':<24}{with_hooks:>10.3f}")
+
+if __name__ == "__main__":
+    main()
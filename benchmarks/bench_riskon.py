@@ -0,0 +1,146 @@
+"""
+RISKON Micro-Benchmarks with Regression Gates
+Measures RiskonODE.predict_probability and predict_probability_batch across grids of
+invoice age, interaction count and batch size. Reports ns per case and peak memory,
+and fails when a case gets slower than the saved baseline by more than the threshold.
+
+Run:      pytest benchmarks/bench_riskon.py -s
+Env:      RISKON_BENCH_BASELINE   baseline file (default benchmarks/.baselines/riskon.json)
+          RISKON_BENCH_THRESHOLD  allowed slowdown in percent (default 25)
+          RISKON_BENCH_SAVE=1     overwrite the baseline with this run
+The first run on a machine writes the baseline. Timings are rescaled by a calibration
+loop before comparing, but baselines are still best kept per machine.
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+# Add parent directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.riskon_engine.model import RiskonODE
+
+BASELINE_PATH = os.getenv("RISKON_BENCH_BASELINE", os.path.join(os.path.dirname(__file__), ".baselines", "riskon.json"))
+THRESHOLD_PCT = float(os.getenv("RISKON_BENCH_THRESHOLD", "25"))
+SAVE_BASELINE = os.getenv("RISKON_BENCH_SAVE", "0") == "1"
+
+AGES = [1, 30, 365, 3650]
+INTERACTIONS = [0, 10, 100, 1000]
+BATCH_SIZES = [1, 100, 10_000]
+# Skip batch cells that would build more interaction dicts than this
+MAX_BATCH_INTERACTIONS = 200_000
+TARGET_SECONDS = 0.05  # per timed repeat
+REPEATS = 7
+
+engine = RiskonODE(decay_rate=0.03, boost_factor=0.15)
+
+def make_interactions(count, age_days):
+    return [{"day": (i * 7) % (age_days + 1), "weight": 0.5 + (i % 3) * 0.5} for i in range(count)]
+
+def measure(fn, cases):
+    """
+    Best-of-REPEATS timing, auto-scaling loops to TARGET_SECONDS, GC off (like timeit).
+    Returns ns per case and tracemalloc peak bytes of one call.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        best, loops = _time_loops(fn)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ns_per_case": round(best / (loops * cases) * 1e9, 1), "peak_bytes": peak}
+
+def _time_loops(fn):
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= TARGET_SECONDS or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(REPEATS - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return best, loops
+
+def calibrate():
+    """
+    ns per iteration of a fixed pure-Python loop. Baselines are rescaled by the ratio of
+    calibrations, so a slower/busier machine does not read as a code regression.
+    """
+    def spin():
+        x = 0.5
+        for _ in range(10_000):
+            x = max(0.0, min(x * 0.997 + 0.001, 1.0))
+        return x
+    return measure(spin, 10_000)["ns_per_case"]
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+BASELINE = load_baseline()
+CALIBRATION_NS = calibrate()
+results = {"_calibration_ns": CALIBRATION_NS}
+
+@pytest.fixture(scope="module", autouse=True)
+def save_baseline():
+    yield
+    if SAVE_BASELINE or not BASELINE:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n[BASELINE] {len(results) - 1} cells written to {BASELINE_PATH}")
+
+def check(key, stats):
+    results[key] = stats
+    print(f"\n{key:<40}{stats['ns_per_case']:>14,.1f} ns/case{stats['peak_bytes']:>12,} B peak")
+
+    before = BASELINE.get(key)
+    if before and not SAVE_BASELINE:
+        # Only ever loosen the limit: a slow calibration must not hide a real regression
+        speed = max(1.0, CALIBRATION_NS / BASELINE.get("_calibration_ns", CALIBRATION_NS))
+        limit = before["ns_per_case"] * speed * (1 + THRESHOLD_PCT / 100)
+        assert stats["ns_per_case"] <= limit, (
+            f"{key} regressed: {before['ns_per_case']} -> {stats['ns_per_case']} ns/case "
+            f"(> {THRESHOLD_PCT}% after x{speed:.2f} machine calibration)"
+        )
+
+@pytest.mark.parametrize("interactions", INTERACTIONS)
+@pytest.mark.parametrize("age_days", AGES)
+def test_scalar(age_days, interactions):
+    data = make_interactions(interactions, age_days)
+    stats = measure(lambda: engine.predict_probability(0.7, age_days, data), 1)
+    check(f"scalar/age={age_days}/n={interactions}", stats)
+
+@pytest.mark.parametrize("batch", BATCH_SIZES)
+@pytest.mark.parametrize("interactions", INTERACTIONS)
+@pytest.mark.parametrize("age_days", AGES)
+def test_batch(age_days, interactions, batch):
+    if batch * interactions > MAX_BATCH_INTERACTIONS:
+        pytest.skip("grid cell above MAX_BATCH_INTERACTIONS")
+
+    probs = [0.3 + (i % 7) * 0.1 for i in range(batch)]
+    ages = [age_days] * batch
+    data = [make_interactions(interactions, age_days) for _ in range(batch)] if interactions else None
+    stats = measure(lambda: engine.predict_probability_batch(probs, ages, data), batch)
+    check(f"batch/age={age_days}/n={interactions}/b={batch}", stats)
@@ -0,0 +1,201 @@
+"""
+Sentinel Throughput & Accuracy Benchmark
+Runs Sentinel.scan_interaction over a labelled corpus of collection transcripts
+(benchmarks/data/sentinel_corpus.jsonl, short + generated long variants) and reports:
+  - transcripts/sec for the rules (VADER) path and a fake-LLM path
+  - per-stage time (keywords, VADER, risk, intent / LLM call, VADER)
+  - intent accuracy, risk accuracy and violation precision/recall for the rules path
+
+Usage:
+  python benchmarks/bench_sentinel.py --repeat 20 --out sentinel.json
+  python benchmarks/bench_sentinel.py --compare sentinel.json --threshold 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+# Add parent directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.sentinel_guard.analyzer import Sentinel
+from benchmarks.load_test import FakeSentinelModel
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sentinel_corpus.jsonl")
+
+# Neutral call-centre filler used to build the long variants (no keyword from any rule list)
+LONG_PREAMBLE = [
+    "Agent: Good afternoon, this is Meera from the recoveries desk, am I speaking with the accounts department?",
+    "Debtor: Yes, this is accounts, go ahead.",
+    "Agent: This call may be recorded for quality and training purposes.",
+    "Debtor: Understood.",
+    "Agent: I am calling about invoice number 4471 raised in the first quarter for freight services.",
+    "Debtor: Let me pull up the file, one moment please.",
+    "Agent: Of course. The invoice covers three consignments shipped from Mumbai to Pune.",
+    "Debtor: I see the consignments listed here on our side as well.",
+]
+LONG_CLOSING = ["Agent: Thank you for your time today.", "Debtor: Goodbye."]
+
+def load_corpus(path=CORPUS_PATH, long_variants=True):
+    with open(path) as f:
+        short = [dict(json.loads(line), variant="short") for line in f if line.strip()]
+    if not long_variants:
+        return short
+    long = [
+        dict(item, id=f"{item['id']}-long", variant="long",
+             text=" ".join(LONG_PREAMBLE * 2 + [item["text"]] + LONG_CLOSING))
+        for item in short
+    ]
+    return short + long
+
+def evaluate(sentinel, corpus):
+    """
+    Rules-path accuracy. Returns overall and per-variant intent/risk accuracy plus
+    violation precision/recall, and the ids of misclassified transcripts.
+    """
+    by_variant = defaultdict(lambda: {"n": 0, "intent_ok": 0, "risk_ok": 0})
+    tp = fp = fn = 0
+    misses = []
+    for item in corpus:
+        result = sentinel.scan_rules(item["text"])
+        flagged = bool(result["violation_flags"])
+        stats = by_variant[item["variant"]]
+        stats["n"] += 1
+        stats["intent_ok"] += result["intent"] == item["intent"]
+        stats["risk_ok"] += result["risk_level"] == item["risk_level"]
+        tp += flagged and item["violation"]
+        fp += flagged and not item["violation"]
+        fn += item["violation"] and not flagged
+        if result["intent"] != item["intent"] or result["risk_level"] != item["risk_level"]:
+            misses.append(f"{item['id']}: intent {result['intent']}/{item['intent']}, risk {result['risk_level']}/{item['risk_level']}")
+
+    total = sum(s["n"] for s in by_variant.values())
+    return {
+        "intent_accuracy": round(sum(s["intent_ok"] for s in by_variant.values()) / total, 4),
+        "risk_accuracy": round(sum(s["risk_ok"] for s in by_variant.values()) / total, 4),
+        "violation_precision": round(tp / (tp + fp), 4) if tp + fp else 1.0,
+        "violation_recall": round(tp / (tp + fn), 4) if tp + fn else 1.0,
+        "by_variant": {
+            variant: {"intent_accuracy": round(s["intent_ok"] / s["n"], 4), "risk_accuracy": round(s["risk_ok"] / s["n"], 4)}
+            for variant, s in sorted(by_variant.items())
+        },
+        "misses": misses,
+    }
+
+def time_stages(stages, corpus, repeat):
+    """
+    stages: {name: fn(text)}. Best-of-repeat seconds for one pass over the corpus, per stage.
+    """
+    timings = {}
+    for name, fn in stages.items():
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for item in corpus:
+                fn(item["text"])
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+    return timings
+
+def bench_rules(sentinel, corpus, repeat):
+    sentinel.model = None
+    lower = lambda text: text.lower()
+    stages = {
+        "total": sentinel.scan_interaction,
+        "keywords": lambda text: sentinel.check_keywords(text.lower()),
+        "vader": sentinel.score_sentiment,
+        "risk": lambda text: sentinel.classify_risk([], 0.0),
+        "intent": lambda text: sentinel.classify_intent(lower(text), 0.0),
+    }
+    return _summarize(time_stages(stages, corpus, repeat), len(corpus))
+
+def bench_fake_llm(sentinel, corpus, repeat, latency_ms):
+    model = FakeSentinelModel(latency_ms)
+    sentinel.model = model
+    try:
+        stages = {
+            "total": sentinel.scan_interaction,
+            "llm_call": lambda text: model.generate_content(text),
+            "vader": sentinel.score_sentiment,
+        }
+        return _summarize(time_stages(stages, corpus, repeat), len(corpus))
+    finally:
+        sentinel.model = None
+
+def _summarize(timings, count):
+    total = timings.pop("total")
+    return {
+        "transcripts_per_sec": round(count / total, 1),
+        "us_per_transcript": round(total / count * 1e6, 2),
+        "stage_us_per_transcript": {name: round(seconds / count * 1e6, 2) for name, seconds in timings.items()},
+    }
+
+def run(repeat=10, fake_llm_ms=0.0, long_variants=True):
+    sentinel = Sentinel()
+    corpus = load_corpus(long_variants=long_variants)
+    return {
+        "transcripts": len(corpus),
+        "accuracy": evaluate(sentinel, corpus),
+        "rules": bench_rules(sentinel, corpus, repeat),
+        "fake_llm": bench_fake_llm(sentinel, corpus, repeat, fake_llm_ms),
+    }
+
+def compare(report, baseline, threshold_pct):
+    """
+    Regressions: throughput down by more than threshold_pct, or any accuracy metric lower.
+    """
+    regressions = []
+    for path in ("rules", "fake_llm"):
+        before, now = baseline[path]["transcripts_per_sec"], report[path]["transcripts_per_sec"]
+        if now < before * (1 - threshold_pct / 100):
+            regressions.append(f"{path}: {before} -> {now} transcripts/sec")
+    for metric in ("intent_accuracy", "risk_accuracy", "violation_precision", "violation_recall"):
+        before, now = baseline["accuracy"][metric], report["accuracy"][metric]
+        if now < before:
+            regressions.append(f"{metric}: {before} -> {now}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Sentinel speed and classification accuracy")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--fake-llm-ms", type=float, default=0.0, help="Latency of the fake LLM (0 = pure overhead)")
+    parser.add_argument("--short-only", action="store_true")
+    parser.add_argument("--show-misses", action="store_true")
+    parser.add_argument("--out", help="Write the report as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed throughput regression in percent")
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.fake_llm_ms, not args.short_only)
+    acc = report["accuracy"]
+    print(f"Corpus: {report['transcripts']} transcripts")
+    for path in ("rules", "fake_llm"):
+        r = report[path]
+        stages = ", ".join(f"{k} {v}us" for k, v in r["stage_us_per_transcript"].items())
+        print(f"[{path}] {r['transcripts_per_sec']:,} transcripts/sec ({r['us_per_transcript']}us each; {stages})")
+    print(f"[accuracy] intent {acc['intent_accuracy']:.1%}, risk {acc['risk_accuracy']:.1%}, "
+          f"violation P {acc['violation_precision']:.1%} / R {acc['violation_recall']:.1%}")
+    for variant, v in acc["by_variant"].items():
+        print(f"  - {variant}: intent {v['intent_accuracy']:.1%}, risk {v['risk_accuracy']:.1%}")
+    if args.show_misses:
+        for miss in acc["misses"]:
+            print(f"  x {miss}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"[OK] No regression against {args.compare}")
+
+if __name__ == "__main__":
+    main()
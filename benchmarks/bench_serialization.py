@@ -0,0 +1,81 @@
+"""
+Serialization & Compression Benchmark
+CPU to encode a 10k-case /api/v1/cases payload (with embedded histories) and the bytes
+it puts on the wire, for the old and new encoders and each Content-Encoding.
+  - stdlib json.dumps:           what the case list used before
+  - jsonable_encoder + JSONResponse: FastAPI's default path for routes returning dicts
+  - orjson (serialization.dumps): what both use now
+Compression is timed on the orjson body (best of N).
+
+Usage:
+  python benchmarks/bench_serialization.py --invoices 10000 --logs 50000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.process_time()
+        result = fn()
+        times.append((time.process_time() - started) * 1000)
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=10_000)
+    parser.add_argument("--logs", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_json.db')}"
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from generate_portfolio import load_database
+    from main import build_case_list
+    from modules import compression, serialization
+    from modules.database import SessionLocal
+
+    load_database(debtors=args.invoices // 2, invoices=args.invoices, logs=args.logs)
+    db = SessionLocal()
+    cases = build_case_list(db)
+    db.close()
+    print(f"{len(cases):,} active cases, {sum(len(c['history']) for c in cases):,} embedded log entries")
+
+    print(f"\n{'encoder':<34} {'CPU ms':>8} {'bytes':>12}")
+    encoders = [
+        ("json.dumps (before)", lambda: json.dumps(cases, ensure_ascii=False, separators=(",", ":")).encode("utf-8")),
+        ("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(cases)).body),
+        ("orjson (after)", lambda: serialization.dumps(cases)),
+    ]
+    results = {}
+    for name, fn in encoders:
+        ms, body = best_ms(fn, args.repeat)
+        results[name] = ms
+        print(f"{name:<34} {ms:>8.1f} {len(body):>12,}")
+    body = serialization.dumps(cases)
+    print(f"orjson vs json.dumps: {results['json.dumps (before)'] / results['orjson (after)']:.1f}x less CPU")
+
+    print(f"\n{'Content-Encoding':<34} {'CPU ms':>8} {'bytes':>12} {'ratio':>7}")
+    print(f"{'identity (before)':<34} {0:>8.1f} {len(body):>12,} {1:>6.1f}x")
+    variants = [(f"gzip level {level}", lambda level=level: gzip.compress(body, compresslevel=level, mtime=0))
+                for level in (1, 6, 9)]
+    if compression.load_brotli():
+        variants += [(f"br quality {q}", lambda q=q: compression.brotli.compress(body, quality=q)) for q in (4, 5, 11)]
+    else:
+        print("(brotli not installed: pip install brotli to include it)")
+    for name, fn in variants:
+        ms, encoded = best_ms(fn, max(1, args.repeat // 2))
+        print(f"{name:<34} {ms:>8.1f} {len(encoded):>12,} {len(body) / len(encoded):>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Cold-Start Benchmark
+Starts a fresh interpreter per run and measures, for each startup mode:
+  - import_s:         `import main`
+  - startup_s:        FastAPI startup handlers (what Cloud Run waits on before traffic)
+  - first_request_s:  process start -> first `GET /` answered (the number to keep well under 1s)
+  - process_s:        wall clock of the whole child as seen by the parent (includes interpreter boot)
+  - bootstrap_s:      FAST_START only: when the background bootstrap thread finished
+Runs against a throwaway SQLite file that already has tables and the admin user,
+like a restarted instance pointed at an existing database.
+
+Usage:
+  python benchmarks/bench_startup.py --repeat 5
+  python benchmarks/bench_startup.py --modes fast --top 15   # also list the slowest imports
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "default": {},
+    "fast": {"FAST_START": "true"},
+    "skip": {"BOOTSTRAP_ON_STARTUP": "false"},
+}
+
+CHILD = r"""
+import json, sys, threading, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    up = time.perf_counter()
+    assert client.get("/").status_code == 200
+    answered = time.perf_counter()
+result = {{"import_s": imported - started, "startup_s": up - imported, "first_request_s": answered - started}}
+for thread in threading.enumerate():
+    if thread.name == "bootstrap":
+        thread.join()
+        result["bootstrap_s"] = time.perf_counter() - started
+print("RESULT " + json.dumps(result))
+"""
+
+def run_child(env, importtime=False):
+    args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD.format(root=ROOT)]
+    started = time.perf_counter()
+    proc = subprocess.run(args, env=env, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    line = next(l for l in proc.stdout.splitlines() if l.startswith("RESULT "))
+    result = json.loads(line[len("RESULT "):])
+    result["process_s"] = elapsed
+    return result, proc.stderr
+
+def slowest_imports(stderr, top):
+    """Top-level packages by cumulative import time (from -X importtime)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def run(modes, repeat, top=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        base_env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        base_env.pop("GOOGLE_CLOUD_PROJECT", None)  # never talk to Vertex AI from a benchmark
+        run_child(base_env)  # create tables + admin once
+
+        report = {}
+        for mode in modes:
+            env = dict(base_env, **MODES[mode])
+            runs = [run_child(env)[0] for _ in range(repeat)]
+            report[mode] = {key: round(statistics.median(r[key] for r in runs), 3) for key in runs[0]}
+            if top:
+                report[mode]["slowest_imports"] = slowest_imports(run_child(env, importtime=True)[1], top)
+        return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and startup time of the API")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per mode (median is reported)")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest top-level imports")
+    parser.add_argument("--out", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.modes, args.repeat, args.top)
+    for mode, r in report.items():
+        extra = f", bootstrap done {r['bootstrap_s']}s" if "bootstrap_s" in r else ""
+        print(f"[{mode}] import {r['import_s']}s, startup {r['startup_s']}s, "
+              f"first request {r['first_request_s']}s (process {r['process_s']}s{extra})")
+        for seconds, name in r.get("slowest_imports", []):
+            print(f"    {seconds:.3f}s  {name}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
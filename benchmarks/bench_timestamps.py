@@ -0,0 +1,94 @@
+"""
+Timestamp Column Benchmark
+"Activity in the last N days" queries against the old string timestamps (ISO 'T' values,
+no range index) and after migration 0002_timestamp_columns (DateTime, indexed), plus how long
+the batched backfill takes:
+  - portfolio:  interaction logs in the last 7 days (count)
+  - case:       one case's logs in the last 30 days, newest first
+  - history:    status changes in the last 7 days
+Timed with the same SQL on the same file, before and after the migration (best of N).
+
+Usage:
+  python benchmarks/bench_timestamps.py --invoices 50000 --logs 500000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def best_ms(conn, sql, params, repeat):
+    from sqlalchemy import text
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).all()
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=50_000)
+    parser.add_argument("--logs", type=int, default=500_000)
+    parser.add_argument("--history", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_timestamps.db')}"
+    from sqlalchemy import text
+    from generate_portfolio import load_database
+    from modules import migrations
+    from modules.database import engine
+
+    as_of = datetime(2025, 1, 1)
+    load_database(debtors=args.invoices // 2, invoices=args.invoices, logs=args.logs, as_of=as_of)
+    with engine.begin() as conn:
+        # Rewind to the string schema: ISO values and no range indexes
+        conn.execute(text(
+            "INSERT INTO status_history (invoice_id, old_status, new_status, changed_by, changed_at, auto_updated) "
+            "SELECT invoice_id, 'PENDING', 'IN_PROGRESS', 'bench', created_at, 0 FROM interaction_logs LIMIT :n"
+        ), {"n": args.history})
+        for table, column in (("interaction_logs", "created_at"), ("status_history", "changed_at"), ("invoices", "closed_at")):
+            conn.execute(text(f"UPDATE {table} SET {column} = replace(substr({column}, 1, 19), ' ', 'T')"))
+        for index in ("ix_interaction_logs_invoice_created", "ix_status_history_changed_at", "ix_invoices_closed_at"):
+            conn.execute(text(f"DROP INDEX {index}"))
+    print(f"{args.logs:,} logs, {args.history:,} status changes, {args.invoices:,} invoices")
+
+    queries = {
+        "portfolio: logs, last 7 days": (
+            "SELECT COUNT(*) FROM interaction_logs WHERE created_at >= :week", {}),
+        "case: logs, last 30 days": (
+            "SELECT id, created_at FROM interaction_logs WHERE invoice_id = :case AND created_at >= :month "
+            "ORDER BY created_at DESC", {}),
+        "history: changes, last 7 days": (
+            "SELECT invoice_id, new_status FROM status_history WHERE changed_at >= :week", {}),
+    }
+    with engine.connect() as conn:
+        case = conn.execute(text("SELECT invoice_id FROM interaction_logs GROUP BY invoice_id "
+                                 "ORDER BY COUNT(*) DESC LIMIT 1")).scalar()
+
+    def run(fmt):
+        params = {"week": fmt(as_of - timedelta(days=7)), "month": fmt(as_of - timedelta(days=30)), "case": case}
+        with engine.connect() as conn:
+            return {name: best_ms(conn, sql, params, args.repeat) for name, (sql, _) in queries.items()}
+
+    before = run(lambda dt: dt.isoformat())
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(migrations.schema_migrations.delete().where(migrations.schema_migrations.c.version == 2))
+    migrations.upgrade(engine, sleep_ms=0, log=lambda line: None)
+    migration_s = time.perf_counter() - started
+    after = run(lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S.%f"))
+
+    print(f"migration (batches of {migrations.MIGRATION_BATCH_SIZE:,} rows, indexes included): {migration_s:.1f}s")
+    print(f"\n{'query':<32}{'before ms':>11}{'after ms':>11}{'speedup':>9}")
+    for name in queries:
+        print(f"{name:<32}{before[name]:>11.2f}{after[name]:>11.2f}{before[name] / after[name]:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+HTTP Load-Test Harness for RecoverAI
+Drives a realistic mix of dashboard and agent traffic against the FastAPI app and reports
+p50/p95/p99 latency, throughput and error rate per endpoint.
+
+Modes:
+  inprocess  ASGI transport, no network (default)
+  uvicorn    local uvicorn server in a background thread, real HTTP
+  --url      an already running server (no fake Sentinel, needs --token)
+
+Sentinel's Gemini model is replaced by a fake with configurable latency, so runs are
+repeatable without Vertex AI. Optional endpoints (not in the default mix): "ingest" uploads
+a small CSV, "analyze_audio" posts a fake recording; both are async routes.
+
+Usage:
+  python benchmarks/load_test.py --requests 5000 --concurrency 32 --out baseline.json
+  python benchmarks/load_test.py --mode uvicorn --compare baseline.json --threshold 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+import httpx
+import numpy as np
+
+# Add parent directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Endpoint mix (weights): dashboard reads dominate, then agent activity
+DEFAULT_MIX = {
+    "cases": 40,
+    "analyze": 15,
+    "log_interaction": 25,
+    "status": 10,
+    "sentinel_audit": 10,
+}
+
+TRANSCRIPTS = [
+    "I promise to pay the full amount by Friday.",
+    "We will transfer the payment tomorrow morning.",
+    "I have no money, I can't pay this right now.",
+    "This invoice is wrong, we already paid it.",
+    "Please call back next week, the accounts team is out.",
+    "Listen you idiot, pay now or we will send the police.",
+]
+
+# Transitions that are valid both ways, so the status PATCH load is not all 400s
+STATUS_STEPS = {"PENDING": "IN_PROGRESS", "IN_PROGRESS": "UNDER_REVIEW", "UNDER_REVIEW": "IN_PROGRESS", "ESCALATED": "UNDER_REVIEW"}
+
+class FakeSentinelModel:
+    """
+    Stands in for the Gemini GenerativeModel: fixed latency, canned JSON verdicts.
+    """
+    def __init__(self, latency_ms=50, seed=0):
+        self.latency = latency_ms / 1000
+        self.rng = random.Random(seed)
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)  # The real SDK call is blocking too
+        intent = self.rng.choice(["PTP", "PTP", "GENERAL", "REFUSAL", "DISPUTE"])
+        risk = "CRITICAL" if "police" in str(prompt).lower() else "LOW"
+        verdict = {
+            "conversation_summary": "Load test",
+            "risk_level": risk,
+            "violation_flags": ["False legal threat"] if risk == "CRITICAL" else [],
+            "intent": intent,
+            "reasoning": "Fake model",
+        }
+        return type("FakeResponse", (), {"text": json.dumps(verdict)})()
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, endpoint, seconds, status_code):
+        self.samples.setdefault(endpoint, []).append((seconds, status_code))
+
+    def report(self, wall_seconds):
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            latency_ms = np.array([s for s, _ in samples]) * 1000
+            codes = np.array([c for _, c in samples])
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / wall_seconds, 2),
+                "error_rate": round(float(np.mean((codes >= 500) | (codes == 0))), 4),
+                "rejected_rate": round(float(np.mean((codes >= 400) & (codes < 500))), 4),
+                "p50_ms": round(float(np.percentile(latency_ms, 50)), 2),
+                "p95_ms": round(float(np.percentile(latency_ms, 95)), 2),
+                "p99_ms": round(float(np.percentile(latency_ms, 99)), 2),
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        return {
+            "wall_seconds": round(wall_seconds, 2),
+            "total_requests": total,
+            "throughput_rps": round(total / wall_seconds, 2),
+            "endpoints": endpoints,
+        }
+
+class Workload:
+    def __init__(self, client, cases, mix, seed=0, ingest_rows=50):
+        self.client = client
+        self.ingest_rows = ingest_rows
+        self.uploads = 0
+        self.cases = cases
+        self.rng = random.Random(seed)
+        self.names = list(mix)
+        self.weights = list(mix.values())
+
+    def pick_case(self):
+        return self.rng.choice(self.cases)
+
+    async def call(self, endpoint):
+        case = self.pick_case() if self.cases else None
+        if endpoint == "cases":
+            return await self.client.get("/api/v1/cases")
+        if endpoint == "sentinel_audit":
+            return await self.client.post("/api/v1/sentinel/audit", json={"text": self.rng.choice(TRANSCRIPTS)})
+        if endpoint == "ingest":
+            self.uploads += 1
+            rows = "".join(f"Load Ingest {self.uploads}-{i} Ltd,{1000 + i},{i % 90},0.5\n" for i in range(self.ingest_rows))
+            csv = "company_name,amount,age_days,credit_score\n" + rows
+            return await self.client.post("/api/v1/ingest", files={"file": ("load.csv", csv.encode())})
+        if case is None:
+            return None
+        if endpoint == "analyze":
+            return await self.client.post("/api/v1/analyze", json={
+                "case_id": case["case_id"],
+                "company_name": case["companyName"],
+                "amount": case["amount"],
+                "initial_score": case["initial_score"] or 0.5,
+                "age_days": case["age_days"] or 0,
+                "history_logs": [],
+            })
+        if endpoint == "log_interaction":
+            return await self.client.post(f"/api/v1/cases/{case['case_id']}/log_interaction",
+                                          json={"text": self.rng.choice(TRANSCRIPTS)})
+        if endpoint == "analyze_audio":
+            return await self.client.post(f"/api/v1/cases/{case['case_id']}/analyze_audio",
+                                          files={"file": ("call.webm", b"fake-audio", "audio/webm")})
+        if endpoint == "status":
+            target = STATUS_STEPS.get(case["status"], "IN_PROGRESS")
+            response = await self.client.patch(f"/api/v1/cases/{case['case_id']}/status",
+                                               json={"new_status": target, "reason": "load test"})
+            if response.status_code == 200:
+                case["status"] = target
+            return response
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+    async def worker(self, recorder, budget):
+        while budget["left"] > 0:
+            budget["left"] -= 1
+            endpoint = self.rng.choices(self.names, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await self.call(endpoint)
+                if response is None:
+                    continue
+                code = response.status_code
+            except httpx.HTTPError:
+                code = 0
+            recorder.add(endpoint, time.perf_counter() - started, code)
+
+async def run_load(client, requests=1000, concurrency=16, mix=None, seed=0, ingest_rows=50):
+    """
+    Drives `requests` calls through `concurrency` workers. Returns the report dict.
+    """
+    response = await client.get("/api/v1/cases")
+    response.raise_for_status()
+    cases = response.json()
+
+    workload = Workload(client, cases, mix or DEFAULT_MIX, seed, ingest_rows)
+    recorder = Recorder()
+    budget = {"left": requests}
+
+    started = time.perf_counter()
+    await asyncio.gather(*(workload.worker(recorder, budget) for _ in range(concurrency)))
+    report = recorder.report(time.perf_counter() - started)
+    report.update({"concurrency": concurrency, "cases_in_book": len(cases)})
+    return report
+
+def prepare_app(fake_latency_ms, seed):
+    """Imports the app with auth bypassed and the fake Sentinel model installed."""
+    import main
+    from modules.database import Base, engine
+    from modules.security import verify_token
+
+    Base.metadata.create_all(bind=engine)
+    main.app.dependency_overrides[verify_token] = lambda: "loadtest"
+    main.sentinel.model = FakeSentinelModel(fake_latency_ms, seed)
+    from modules.sentinel_guard import analyzer
+    if analyzer.load_vertex() is None:
+        # analyze_audio builds Gemini Parts; the fake model only needs them to exist
+        part = type("Part", (), {"from_text": staticmethod(lambda text: text),
+                                 "from_data": staticmethod(lambda data, mime_type: data)})
+        analyzer.vertexai = type("vertexai", (), {"generative_models": type("generative_models", (), {"Part": part})})
+    return main.app
+
+def start_uvicorn(app):
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+def compare(report, baseline, threshold_pct):
+    """
+    Returns a list of regressions: p95 latency up or throughput down by more than threshold_pct.
+    """
+    regressions = []
+    for endpoint, now in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + threshold_pct / 100):
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["throughput_rps"] < before["throughput_rps"] * (1 - threshold_pct / 100):
+            regressions.append(f"{endpoint}: throughput {before['throughput_rps']} -> {now['throughput_rps']} rps")
+    return regressions
+
+def print_report(report):
+    print(f"{'endpoint':<18}{'reqs':>7}{'rps':>9}{'err%':>7}{'4xx%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, e in report["endpoints"].items():
+        print(f"{endpoint:<18}{e['requests']:>7}{e['throughput_rps']:>9.1f}{e['error_rate'] * 100:>7.1f}"
+              f"{e['rejected_rate'] * 100:>7.1f}{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}{e['p99_ms']:>9.1f}")
+    print(f"TOTAL {report['total_requests']} requests in {report['wall_seconds']}s ({report['throughput_rps']} rps)")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the RecoverAI API")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--url", help="Target an already running server instead")
+    parser.add_argument("--token", help="Bearer token for --url mode")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake-llm-ms", type=float, default=50, help="Fake Sentinel model latency")
+    parser.add_argument("--mix", help='JSON endpoint weights, e.g. \'{"cases": 80, "log_interaction": 20}\'')
+    parser.add_argument("--seed-invoices", type=int, default=0, help="Generate this many invoices first (see generate_portfolio.py)")
+    parser.add_argument("--ingest-rows", type=int, default=50, help="Rows per upload for the ingest endpoint")
+    parser.add_argument("--out", help="Write the report as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+    mix = json.loads(args.mix) if args.mix else None
+
+    if args.seed_invoices:
+        from generate_portfolio import load_database
+        # is_sample=0: uploads from the "ingest" endpoint would otherwise purge the seeded book
+        load_database(debtors=max(args.seed_invoices // 5, 1), invoices=args.seed_invoices,
+                      logs=args.seed_invoices, seed=args.seed, is_sample=0)
+
+    server = None
+    if args.url:
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        client = httpx.AsyncClient(base_url=args.url, headers=headers, timeout=60)
+    else:
+        app = prepare_app(args.fake_llm_ms, args.seed)
+        if args.mode == "uvicorn":
+            server, url = start_uvicorn(app)
+            client = httpx.AsyncClient(base_url=url, timeout=60)
+        else:
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60)
+
+    async with client:
+        report = await run_load(client, args.requests, args.concurrency, mix, args.seed, args.ingest_rows)
+    if server:
+        server.should_exit = True
+
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"[OK] No regression beyond {args.threshold}% against {args.compare}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
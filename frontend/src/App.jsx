@@ -114,17 +114,23 @@ function App() {
     }
   }, []);
 
-  // 2. AUTO-REFRESH (POLLING) TO UPDATE STATUS
-  // This ensures the Agent sees "PAID" automatically when the Debtor pays remotely
+  // 2. LIVE UPDATES (SERVER-SENT EVENTS)
+  // This ensures the Agent sees "PAID" automatically when the Debtor pays remotely.
+  // The server pushes status changes and new logs; we refetch the (ETag-cached) case list.
   useEffect(() => {
     if (!token) return;
 
-    // Poll the database every 10 seconds to check for status updates
-    const interval = setInterval(() => {
-      fetchCases(token);
-    }, 10000); // 10 seconds
+    const source = new EventSource(`${API.EVENTS}?access_token=${encodeURIComponent(token)}`);
+    const refresh = () => fetchCases(token);
+    ["status_changed", "interaction_logged", "resync"].forEach((type) => source.addEventListener(type, refresh));
 
-    return () => clearInterval(interval);
+    // Slow safety-net poll in case the stream is blocked by a proxy
+    const interval = setInterval(refresh, 60000); // 60 seconds
+
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
   }, [token]);
 
   const fetchCases = async (authToken) => {
@@ -15,6 +15,7 @@ export const API = {
     INGEST: `${BASE_URL}/api/v1/ingest`,
     PAYMENT: `${BASE_URL}/api/v1/payment/create`,
     CASES: `${BASE_URL}/api/v1/cases`,
+    EVENTS: `${BASE_URL}/api/v1/events`,
     LOG_INTERACTION: (caseId) => `${BASE_URL}/api/v1/cases/${caseId}/log_interaction`,
     UPDATE_STATUS: (caseId) => `${BASE_URL}/api/v1/cases/${caseId}/status`,
     ANALYZE_AUDIO: (caseId) => `${BASE_URL}/api/v1/cases/${caseId}/analyze_audio`,
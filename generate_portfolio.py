@@ -0,0 +1,321 @@
+"""
+Synthetic Portfolio Generator for RecoverAI
+Scales the sample data engine up to production-sized books for load and capacity testing.
+Generates N debtors, M invoices and K interaction logs with realistic distributions,
+deterministically from a seed (and chunk size), and bulk loads them (SQLite / Postgres) or writes an
+ingestion file (CSV / Parquet / NDJSON).
+
+Usage:
+  python generate_portfolio.py --debtors 1000000 --invoices 5000000 --logs 4000000 --seed 7
+  python generate_portfolio.py --invoices 1000000 --format parquet --out portfolio.parquet
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select, text
+
+# Add parent directory to path so we can import modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.database import DebtorDB, InvoiceDB, InteractionLogDB, engine, init_schema, bump_portfolio_version, mark_portfolio_reset, rebuild_portfolio_summary
+from modules.scoring import risk_engine, allocation_agent
+
+# --- DISTRIBUTIONS ---
+NAME_PREFIXES = ["Acme", "Global", "Prime", "Sunrise", "Apex", "Metro", "Vertex", "Orbit", "Zenith", "Delta",
+                 "Pioneer", "Summit", "Harbor", "Crest", "Nova", "Atlas", "Unity", "Coastal", "Royal", "Eastern"]
+NAME_SUFFIXES = ["Logistics Pvt Ltd", "Trade Enterprises", "Technologies Inc", "Retail Corp", "Manufacturing Co",
+                 "E-Commerce Ventures", "Builders Ltd", "Healthcare Services", "Foods Pvt Ltd", "Textiles Ltd"]
+
+STATUSES = ["PENDING", "IN_PROGRESS", "UNDER_REVIEW", "ESCALATED", "RESOLVED", "CLOSED"]
+STATUS_MIX = [0.45, 0.25, 0.08, 0.04, 0.12, 0.06]
+
+INTENTS = ["GENERAL", "PTP", "REFUSAL", "DISPUTE"]
+INTENT_MIX = [0.45, 0.30, 0.15, 0.10]
+INTENT_SENTIMENT = {"GENERAL": (0.05, 0.25), "PTP": (0.35, 0.25), "REFUSAL": (-0.9, 0.0), "DISPUTE": (-0.3, 0.2)}
+VIOLATION_RATE = 0.03
+
+TRANSCRIPTS = {
+    "GENERAL": ["Please call back next week, the accounts team is out.",
+                "Who is this? Send me the invoice details by email.",
+                "I need to check with my manager before discussing this."],
+    "PTP": ["I promise to pay the full amount by Friday.",
+            "We will transfer the payment tomorrow morning.",
+            "The cheque will be sent on Monday, we will settle it."],
+    "REFUSAL": ["I have no money, I can't pay this right now.",
+                "We refuse to pay, do your worst.",
+                "We are not going to pay this invoice."],
+    "DISPUTE": ["This invoice is wrong, we already paid it.",
+                "There is a mistake, we were charged twice.",
+                "We never received the goods, this is incorrect."],
+}
+VIOLATIONS = [("police", "Pay now or we will send the police."),
+              ("arrest", "You will face arrest if this is not cleared."),
+              ("idiot", "Listen you idiot, pay the invoice."),
+              ("ruin your credit", "We will ruin your credit for years.")]
+
+# Table codes keep every (table, chunk) random stream independent of chunk order
+DEBTORS, INVOICES, LOGS = 1, 2, 3
+
+def chunk_rng(seed, table, chunk_index):
+    return np.random.default_rng([seed, table, chunk_index])
+
+def debtor_names(ids):
+    return [f"{NAME_PREFIXES[i % 20]} {NAME_SUFFIXES[(i // 20) % 10]} #{i}" for i in ids]
+
+def debtor_phones(ids):
+    return [f"+91{7000000000 + (i * 7919) % 2999999999}" for i in ids]
+
+def timestamps_before(as_of, seconds_ago):
+    """
+    Vectorized timestamps seconds_ago before as_of, as the strings DateTime stores on SQLite
+    ('YYYY-MM-DD HH:MM:SS.ffffff'; Postgres COPY parses the same text).
+    """
+    stamps = np.datetime64(as_of, "s") - seconds_ago.astype("timedelta64[s]")
+    return np.char.replace(np.datetime_as_string(stamps, unit="us"), "T", " ").astype(object)
+
+def generate_debtors(seed, chunk_index, ids, is_sample=1):
+    rng = chunk_rng(seed, DEBTORS, chunk_index)
+    return pd.DataFrame({
+        "id": ids,
+        "name": debtor_names(ids),
+        # Skewed towards good payers, long tail of weak credit
+        "credit_score": rng.beta(5, 2, len(ids)).round(3),
+        "phone": debtor_phones(ids),
+        "is_sample": is_sample,
+    })
+
+def generate_invoices(seed, chunk_index, ids, debtor_ids, credit_scores, as_of):
+    """
+    debtor_ids/credit_scores: every debtor an invoice may belong to (aligned arrays).
+    """
+    rng = chunk_rng(seed, INVOICES, chunk_index)
+    n = len(ids)
+    owner = rng.integers(0, len(debtor_ids), n)
+
+    # Invoice amounts are log-normal (median ~Rs.1L); age is a long-tailed gamma
+    amount = rng.lognormal(11.5, 1.0, n).round(2)
+    age_days = np.clip(rng.gamma(1.2, 60.0, n) + 1, 1, 3650).astype(np.int64)
+    status = np.array(STATUSES)[rng.choice(len(STATUSES), n, p=STATUS_MIX)]
+
+    # Vectorized RISKON + Allocation so every generated case is already scored
+    p_score = risk_engine.predict_probability_batch(credit_scores[owner], age_days)
+    decision = allocation_agent.allocate_batch(p_score)
+
+    paid = np.where(status == "RESOLVED", amount, 0.0)
+    partial = (status == "IN_PROGRESS") & (rng.random(n) < 0.3)
+    paid = np.where(partial, (amount * rng.uniform(0.1, 0.6, n)).round(2), paid)
+
+    done_at = timestamps_before(as_of, rng.integers(0, 60 * 86400, n))
+    resolved = status == "RESOLVED"
+    closed = status == "CLOSED"
+
+    return pd.DataFrame({
+        "id": ids,
+        "debtor_id": debtor_ids[owner],
+        "amount": amount,
+        "age_days": age_days,
+        "p_score": p_score,
+        "decision": decision,
+        "risk_level": "SAFE",
+        "status": status,
+        "paid_amount": paid,
+        "resolved_at": np.where(resolved, done_at, None),
+        "closed_at": np.where(closed, done_at, None),
+        "closed_reason": np.where(closed, "Settled offline", None),
+    })
+
+def generate_logs(seed, chunk_index, ids, invoice_ids, as_of):
+    rng = chunk_rng(seed, LOGS, chunk_index)
+    n = len(ids)
+    intent_idx = rng.choice(len(INTENTS), n, p=INTENT_MIX)
+    intent = np.array(INTENTS)[intent_idx]
+    violation = rng.random(n) < VIOLATION_RATE
+    template = rng.integers(0, 3, n)
+    which_violation = rng.integers(0, len(VIOLATIONS), n)
+
+    means, spread = np.array([INTENT_SENTIMENT[i] for i in INTENTS]).T
+    sentiment = np.clip(rng.normal(means[intent_idx], spread[intent_idx]), -1.0, 1.0).round(2)
+
+    # Same thresholds as the Sentinel rules engine
+    risk = np.where(sentiment < -0.5, "HIGH", np.where(sentiment < -0.1, "MEDIUM", "LOW"))
+    risk = np.where(violation, "CRITICAL", risk)
+
+    texts, flags = [], []
+    for i in range(n):
+        line = TRANSCRIPTS[intent[i]][template[i]]
+        if violation[i]:
+            word, threat = VIOLATIONS[which_violation[i]]
+            line = f"{threat} {line}"
+            flags.append(json.dumps([f"VIOLATION_KEYWORD: '{word}'"]))
+        else:
+            flags.append("[]")
+        texts.append(line)
+
+    seconds_ago = rng.integers(0, 180 * 86400, n)
+    return pd.DataFrame({
+        "id": ids,
+        "invoice_id": invoice_ids[rng.integers(0, len(invoice_ids), n)],
+        "created_at": timestamps_before(as_of, seconds_ago),
+        "interaction_text": texts,
+        "risk_level": risk,
+        "intent": intent,
+        "sentiment_score": sentiment,
+        "violation_flags": flags,
+    })
+
+# --- WRITERS ---
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _bulk_insert(conn, model, df):
+    """COPY on Postgres, one DBAPI executemany elsewhere (skips per-row ORM/Core overhead)."""
+    if conn.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor = conn.connection.dbapi_connection.cursor()
+        cursor.copy_expert(f"COPY {model.__tablename__} ({', '.join(df.columns)}) FROM STDIN WITH CSV", buffer)
+    else:
+        placeholder = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+        sql = f"INSERT INTO {model.__tablename__} ({', '.join(df.columns)}) VALUES ({', '.join([placeholder] * len(df.columns))})"
+        conn.exec_driver_sql(sql, list(df.astype(object).itertuples(index=False, name=None)))
+
+def _reset_sequence(conn, model):
+    # Explicit ids bypass Postgres serial sequences; move them past the new rows
+    if conn.dialect.name == "postgresql":
+        table = model.__tablename__
+        conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+
+def _chunks(start, count, chunk_size):
+    for chunk_index, offset in enumerate(range(0, count, chunk_size)):
+        yield chunk_index, np.arange(start + offset, start + min(offset + chunk_size, count), dtype=np.int64)
+
+def load_database(debtors, invoices, logs, seed=42, chunk_size=100_000, as_of=None, is_sample=1, bind=None):
+    """
+    Generates and bulk loads a portfolio. Returns the row counts and elapsed seconds per table.
+    """
+    bind = bind or engine
+    as_of = as_of or datetime(2025, 1, 1)
+    init_schema(bind)
+    stats = {}
+
+    with bind.begin() as conn:
+        debtor_start = _next_id(conn, DebtorDB)
+        invoice_start = _next_id(conn, InvoiceDB)
+        log_start = _next_id(conn, InteractionLogDB)
+
+    debtor_ids = np.arange(debtor_start, debtor_start + debtors, dtype=np.int64)
+    credit_scores = np.empty(debtors)
+
+    started = time.perf_counter()
+    for chunk_index, ids in _chunks(debtor_start, debtors, chunk_size):
+        df = generate_debtors(seed, chunk_index, ids, is_sample)
+        credit_scores[ids - debtor_start] = df["credit_score"].to_numpy()
+        with bind.begin() as conn:
+            _bulk_insert(conn, DebtorDB, df)
+    stats["debtors"] = {"rows": debtors, "seconds": round(time.perf_counter() - started, 2)}
+
+    started = time.perf_counter()
+    for chunk_index, ids in _chunks(invoice_start, invoices, chunk_size):
+        df = generate_invoices(seed, chunk_index, ids, debtor_ids, credit_scores, as_of)
+        with bind.begin() as conn:
+            _bulk_insert(conn, InvoiceDB, df)
+    stats["invoices"] = {"rows": invoices, "seconds": round(time.perf_counter() - started, 2)}
+
+    invoice_ids = np.arange(invoice_start, invoice_start + invoices, dtype=np.int64)
+    started = time.perf_counter()
+    if invoices:
+        for chunk_index, ids in _chunks(log_start, logs, chunk_size):
+            df = generate_logs(seed, chunk_index, ids, invoice_ids, as_of)
+            with bind.begin() as conn:
+                _bulk_insert(conn, InteractionLogDB, df)
+    stats["logs"] = {"rows": logs if invoices else 0, "seconds": round(time.perf_counter() - started, 2)}
+
+    with bind.begin() as conn:
+        for model in (DebtorDB, InvoiceDB, InteractionLogDB):
+            _reset_sequence(conn, model)
+        # Raw inserts bypass the session hooks: new version, change feeds must resync, and the
+        # portfolio summary is recomputed
+        mark_portfolio_reset(conn, bump_portfolio_version(conn))
+        rebuild_portfolio_summary(conn)
+    return stats
+
+def write_ingestion_file(path, fmt, debtors, invoices, seed=42, chunk_size=100_000, as_of=None):
+    """
+    Writes invoices in the /api/v1/ingest layout: company_name, amount, age_days, credit_score, phone.
+    """
+    as_of = as_of or datetime(2025, 1, 1)
+    debtor_ids = np.arange(1, debtors + 1, dtype=np.int64)
+    credit_scores = np.empty(debtors)
+    for chunk_index, ids in _chunks(1, debtors, chunk_size):
+        credit_scores[ids - 1] = generate_debtors(seed, chunk_index, ids)["credit_score"].to_numpy()
+
+    writer = None
+    with open(path, "wb") as out:
+        for chunk_index, ids in _chunks(1, invoices, chunk_size):
+            inv = generate_invoices(seed, chunk_index, ids, debtor_ids, credit_scores, as_of)
+            owner = inv["debtor_id"].to_numpy()
+            df = pd.DataFrame({
+                "company_name": debtor_names(owner),
+                "amount": inv["amount"],
+                "age_days": inv["age_days"],
+                "credit_score": credit_scores[owner - 1],
+                "phone": debtor_phones(owner),
+            })
+
+            if fmt == "csv":
+                df.to_csv(out, index=False, header=chunk_index == 0)
+            elif fmt == "ndjson":
+                out.write(df.to_json(orient="records", lines=True).encode())
+            elif fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                writer = writer or pq.ParquetWriter(out, table.schema)
+                writer.write_table(table)
+            else:
+                raise ValueError(f"Unknown format: {fmt}")
+        if writer:
+            writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic RecoverAI portfolio")
+    parser.add_argument("--debtors", type=int, default=10_000)
+    parser.add_argument("--invoices", type=int, default=50_000)
+    parser.add_argument("--logs", type=int, default=40_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--as-of", default="2025-01-01", help="Reference date for timestamps (keeps runs reproducible)")
+    parser.add_argument("--format", choices=["db", "csv", "parquet", "ndjson"], default="db")
+    parser.add_argument("--out", help="Output file for csv/parquet/ndjson")
+    parser.add_argument("--real", action="store_true", help="Mark debtors is_sample=0 (not purged by uploads)")
+    args = parser.parse_args()
+    as_of = datetime.fromisoformat(args.as_of)
+
+    print("=" * 50)
+    print("RecoverAI - Synthetic Portfolio Generator")
+    print("=" * 50)
+
+    if args.format == "db":
+        stats = load_database(args.debtors, args.invoices, args.logs, args.seed, args.chunk_size, as_of,
+                              is_sample=0 if args.real else 1)
+        for table, s in stats.items():
+            rate = s["rows"] / s["seconds"] if s["seconds"] else 0
+            print(f"[OK] {table:<9} {s['rows']:>12,} rows in {s['seconds']:>8.2f}s ({rate:,.0f} rows/s)")
+    else:
+        if not args.out:
+            parser.error("--out is required for file formats")
+        started = time.perf_counter()
+        write_ingestion_file(args.out, args.format, args.debtors, args.invoices, args.seed, args.chunk_size, as_of)
+        print(f"[OK] Wrote {args.invoices:,} invoices to {args.out} in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
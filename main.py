@@ -1,18 +1,7 @@
 import json
-import requests
+import base64
 import asyncio
-import uvicorn
-try:
-    from twilio.jwt.access_token import AccessToken
-    from twilio.jwt.access_token.grants import VoiceGrant
-    from twilio.twiml.voice_response import VoiceResponse
-    TWILIO_AVAILABLE = True
-except ImportError:
-    AccessToken = None
-    VoiceGrant = None
-    VoiceResponse = None
-    TWILIO_AVAILABLE = False
-    print("Warning: Twilio SDK not found. Telephony features will be disabled.")
+import threading
 from fastapi import FastAPI, HTTPException, Request, Form, Response, Depends, status, File, UploadFile
 from pydantic import BaseModel
 import os
@@ -27,19 +16,25 @@ from modules.allocation_core.agent import AllocationAgent
 from modules.sentinel_guard.analyzer import Sentinel
 
 # Import Database Modules
-from modules.database import Base, engine, get_db, InvoiceDB, DebtorDB, UserDB, SessionLocal, InteractionLogDB, StatusHistoryDB
+from modules.database import Base, engine, get_db, get_async_db, init_schema, get_portfolio_version, PortfolioStateDB, InvoiceDB, DebtorDB, UserDB, SessionLocal, InteractionLogDB, StatusHistoryDB
+from modules.database import reserve_change_seq, summary_aggregate, apply_summary_deltas
+from modules.response_cache import PageCache, etag_matches, make_etag, normalized_query
+from sqlalchemy import String, and_, or_, select, insert, update as sql_update, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 # from fastapi import Depends, status, File, UploadFile  # Moved to line 7
 from fastapi.security import OAuth2PasswordRequestForm
-from modules.security import verify_password, create_access_token, verify_token, get_password_hash
-from modules.ingestion import process_csv_upload
+from modules.security import verify_password, create_access_token, verify_token, verify_stream_token, verify_admin, get_password_hash
+from modules.scoring import SCORE_ON_INGEST, score_invoices
 from modules.payments import create_payment_link
 from add_sample_data import add_sample_data
 
 # Create the Database Tables (recoverai.db)
 # Base.metadata.create_all(bind=engine) # Moved to startup event for Cloud Build stability
 
-app = FastAPI(title="RecoverAI Core API", version="1.0.0")
+from modules import compression, serialization
+
+app = FastAPI(title="RecoverAI Core API", version="1.0.0", default_response_class=serialization.FastJSONResponse)
 
 # --- CORS MIDDLEWARE (Required for Cloud/Frontend Integration) ---
 from fastapi.middleware.cors import CORSMiddleware
@@ -52,16 +47,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- COMPRESSION (gzip, or brotli if installed, above COMPRESSION_MIN_BYTES) ---
+app.add_middleware(compression.CompressionMiddleware)
+
+# --- METRICS (Prometheus text format at /metrics) ---
+from fastapi.responses import FileResponse, PlainTextResponse
+from modules import metrics
+
+app.add_middleware(metrics.MetricsMiddleware, router=app.router)
+
+# --- SQL INSTRUMENTATION (query count / DB time per request, slow-query log) ---
+from modules.query_stats import QueryStatsMiddleware
+
+app.add_middleware(QueryStatsMiddleware)
+
+# --- PROFILER (opt-in: admin X-Profile header or PROFILE_SAMPLE_RATE) ---
+from modules import profiler
+
+app.add_middleware(profiler.ProfilerMiddleware)
+
+# --- PORTFOLIO SUMMARY (KPIs maintained by every invoice write, reconciled periodically) ---
+from modules import portfolio_summary
+
+# --- CASE EVENTS (in-process pub/sub, streamed over SSE) ---
+from fastapi.responses import StreamingResponse
+from modules import events
+
 # --- INSTANTIATE ENGINES ---
 risk_engine = RiskonODE(decay_rate=0.03, boost_factor=0.15)
 allocation_agent = AllocationAgent(risk_engine)
-sentinel = Sentinel()
+sentinel = Sentinel()  # VADER / Vertex AI load on first use (or in the warm-up thread)
+
+# --- OPTIONAL SDKs (imported on first use to keep cold starts fast) ---
+TWILIO_AVAILABLE = None  # None = not probed yet
+AccessToken = VoiceGrant = VoiceResponse = None
+
+def load_twilio():
+    """
+    Imports the Twilio SDK once. Returns True when telephony is available.
+    """
+    global TWILIO_AVAILABLE, AccessToken, VoiceGrant, VoiceResponse
+    if TWILIO_AVAILABLE is None:
+        try:
+            from twilio.jwt.access_token import AccessToken
+            from twilio.jwt.access_token.grants import VoiceGrant
+            from twilio.twiml.voice_response import VoiceResponse
+            TWILIO_AVAILABLE = True
+        except ImportError:
+            TWILIO_AVAILABLE = False
+            print("Warning: Twilio SDK not found. Telephony features will be disabled.")
+    return TWILIO_AVAILABLE
+
+# --- STARTUP MODE ---
+# FAST_START=true: the server accepts requests right away; table creation, the admin
+# user and sample data run in a background thread, and an existing admin password is
+# left alone instead of being re-hashed (PBKDF2) on every boot.
+# BOOTSTRAP_ON_STARTUP=false: skip that work entirely and run it out of process
+# (python create_admin.py && python add_sample_data.py) as a deploy step.
+FAST_START = os.getenv("FAST_START", "false").lower() in ("1", "true", "yes")
+BOOTSTRAP_ON_STARTUP = os.getenv("BOOTSTRAP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+# MIGRATE_ON_STARTUP=false: pending schema migrations are only reported; run them out of
+# process (python migrate.py upgrade) when a backfill would hold up boot on a large table.
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
 
 # --- STARTUP: AUTO-CREATE ADMIN (MVP ONLY) ---
-@app.on_event("startup")
-def startup_event():
+def bootstrap(reset_admin_password=True):
+    """
+    Tables, default admin and sample data. reset_admin_password re-hashes an
+    existing admin's password back to the default (slow: PBKDF2).
+    """
     print("--- STARTUP: Ensuring Database Tables ---")
-    Base.metadata.create_all(bind=engine)
+    init_schema(engine, migrate=MIGRATE_ON_STARTUP)
     
     print("--- STARTUP: Initializing Admin User ---")
     db = SessionLocal()
@@ -74,7 +130,7 @@ def startup_event():
             db.add(admin)
             db.commit()
             print("Admin user created successfully.")
-        else:
+        elif reset_admin_password:
             print("Admin exists. Resetting password...")
             user.hashed_password = get_password_hash("password123")
             db.commit()
@@ -88,6 +144,22 @@ def startup_event():
         db.close()
     print("--- STARTUP: Complete ---")
 
+def background_bootstrap():
+    bootstrap(reset_admin_password=False)
+    sentinel.warm_up()
+
+@app.on_event("startup")
+def startup_event():
+    if portfolio_summary.SUMMARY_RECONCILE_SECONDS > 0:
+        portfolio_summary.ReconcileJob().start()
+    if not BOOTSTRAP_ON_STARTUP:
+        print("--- STARTUP: Bootstrap skipped (BOOTSTRAP_ON_STARTUP=false) ---")
+    elif FAST_START:
+        print("--- STARTUP: Fast start, bootstrapping in background ---")
+        threading.Thread(target=background_bootstrap, name="bootstrap", daemon=True).start()
+    else:
+        bootstrap()
+
 # --- DATA MODELS ---
 # --- AUTH ENDPOINT ---
 @app.post("/token")
@@ -122,13 +194,22 @@ class AuditRequest(BaseModel):
 def health_check():
     return {"status": "active", "system": "RecoverAI Agentic Core"}
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """
+    Route latency histograms, in-flight requests and hot-path timers for Prometheus scraping.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/api/v1/ingest")
-async def ingest_csv(file: UploadFile = File(...), db: Session = Depends(get_db), current_user: str = Depends(verify_token)):
+async def ingest_csv(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db), current_user: str = Depends(verify_token)):
     """
-    Upload FedEx CSV Export -> Cloud SQL
+    Upload FedEx ERP Export (CSV, CSV.gz/.zst, Parquet, Arrow) -> Cloud SQL
     """
+    from modules.ingestion import process_csv_upload_async  # pandas/pyarrow load on first upload
+
     content = await file.read()
-    results = process_csv_upload(content, db)
+    results = await process_csv_upload_async(content, db)
     return results
 
 class PaymentRequest(BaseModel):
@@ -259,7 +340,7 @@ def log_interaction(
         # Create interaction log
         log_entry = InteractionLogDB(
             invoice_id=invoice_id,
-            created_at=datetime.utcnow().isoformat(),
+            created_at=datetime.utcnow(),
             interaction_text=interaction.text,
             risk_level=compliance_result.get("risk_level", "UNKNOWN"),
             intent=compliance_result.get("intent", "GENERAL"),
@@ -302,7 +383,7 @@ def log_interaction(
         invoice.p_score = new_p_score
 
         # 2. AUTOMATED STATUS TRANSITIONS
-        timestamp = datetime.utcnow().isoformat()
+        timestamp = datetime.utcnow()
         
         # Auto-update status to IN_PROGRESS on first interaction (if PENDING)
         if invoice.status == "PENDING":
@@ -376,7 +457,7 @@ def log_interaction(
 async def analyze_audio_interaction(
     case_id: str,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: str = Depends(verify_token)
 ):
     """
@@ -391,7 +472,7 @@ async def analyze_audio_interaction(
             
         # Log the result just like a manual text log
         invoice_id = int(case_id.replace("C-", ""))
-        invoice = db.query(InvoiceDB).filter(InvoiceDB.id == invoice_id).first()
+        invoice = await db.get(InvoiceDB, invoice_id)
         
         if not invoice:
             raise HTTPException(status_code=404, detail="Case not found")
@@ -399,7 +480,7 @@ async def analyze_audio_interaction(
         # Create log entry from transcript
         log_entry = InteractionLogDB(
             invoice_id=invoice_id,
-            created_at=datetime.utcnow().isoformat(),
+            created_at=datetime.utcnow(),
             interaction_text=f"[VOICE RECORDING] {analysis.get('transcript', '')}",
             risk_level=analysis.get("risk_level", "UNKNOWN"),
             intent=analysis.get("intent", "GENERAL"),
@@ -407,11 +488,11 @@ async def analyze_audio_interaction(
             violation_flags=json.dumps(analysis.get("violation_flags", []))
         )
         db.add(log_entry)
-        db.flush()
+        await db.flush()
 
         # Recalculate score (Shared Logic)
-        debtor = db.query(DebtorDB).filter(DebtorDB.id == invoice.debtor_id).first()
-        all_logs = db.query(InteractionLogDB).filter(InteractionLogDB.invoice_id == invoice_id).all()
+        debtor = await db.get(DebtorDB, invoice.debtor_id)
+        all_logs = (await db.scalars(select(InteractionLogDB).where(InteractionLogDB.invoice_id == invoice_id))).all()
         interaction_data = []
         for log in all_logs:
             day = (log.id * 7) % (invoice.age_days + 1) 
@@ -439,7 +520,7 @@ async def analyze_audio_interaction(
         if analysis.get("intent") == "PTP" and invoice.status == "IN_PROGRESS":
             invoice.status = "UNDER_REVIEW"
         
-        db.commit()
+        await db.commit()
         
         return {
             "status": "success",
@@ -450,6 +531,16 @@ async def analyze_audio_interaction(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Valid status transitions (single and bulk updates)
+VALID_TRANSITIONS = {
+    "PENDING": ["IN_PROGRESS", "CLOSED"],
+    "IN_PROGRESS": ["UNDER_REVIEW", "RESOLVED", "CLOSED", "ESCALATED"],
+    "UNDER_REVIEW": ["IN_PROGRESS", "RESOLVED", "ESCALATED"],
+    "RESOLVED": ["CLOSED"],
+    "ESCALATED": ["UNDER_REVIEW", "CLOSED"],
+    "CLOSED": []  # Final state
+}
+
 class StatusUpdateRequest(BaseModel):
     new_status: str  # PENDING, IN_PROGRESS, UNDER_REVIEW, RESOLVED, CLOSED, ESCALATED
     reason: Optional[str] = None
@@ -464,16 +555,6 @@ def update_case_status(
     """
     Update case status manually with validation and history tracking.
     """
-    # Valid status transitions
-    VALID_TRANSITIONS = {
-        "PENDING": ["IN_PROGRESS", "CLOSED"],
-        "IN_PROGRESS": ["UNDER_REVIEW", "RESOLVED", "CLOSED", "ESCALATED"],
-        "UNDER_REVIEW": ["IN_PROGRESS", "RESOLVED", "ESCALATED"],
-        "RESOLVED": ["CLOSED"],
-        "ESCALATED": ["UNDER_REVIEW", "CLOSED"],
-        "CLOSED": []  # Final state
-    }
-    
     try:
         # Extract numeric ID from case_id like "C-123"
         invoice_id = int(case_id.replace("C-", ""))
@@ -499,7 +580,7 @@ def update_case_status(
         invoice.status = new_status
         
         # Set timestamps based on new status
-        timestamp = datetime.utcnow().isoformat()
+        timestamp = datetime.utcnow()
         if new_status == "RESOLVED" and not invoice.resolved_at:
             invoice.resolved_at = timestamp
         elif new_status == "CLOSED":
@@ -538,6 +619,162 @@ def update_case_status(
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+# Case IDs per statement in a bulk update (keeps IN lists under bound-parameter limits)
+BULK_STATUS_CHUNK_SIZE = int(os.getenv("BULK_STATUS_CHUNK_SIZE", "5000"))
+
+class BulkStatusFilter(BaseModel):
+    status: Optional[str] = None
+    risk_level: Optional[str] = None
+    decision: Optional[str] = None
+    min_age_days: Optional[int] = None
+    max_age_days: Optional[int] = None
+
+    def clauses(self):
+        clauses = []
+        for name in ("status", "risk_level", "decision"):
+            value = getattr(self, name)
+            if value:
+                clauses.append(getattr(InvoiceDB, name) == value.upper())
+        if self.min_age_days is not None:
+            clauses.append(InvoiceDB.age_days >= self.min_age_days)
+        if self.max_age_days is not None:
+            clauses.append(InvoiceDB.age_days <= self.max_age_days)
+        return clauses
+
+class BulkStatusUpdateRequest(BaseModel):
+    new_status: str
+    case_ids: Optional[List[str]] = None  # Either case_ids ...
+    filter: Optional[BulkStatusFilter] = None  # ... or a filter
+    reason: Optional[str] = None
+
+@app.post("/api/v1/cases/status/bulk")
+def bulk_update_case_status(
+    update: BulkStatusUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(verify_token)
+):
+    """
+    Move many cases to one status in a single transaction, by case_ids or by filter.
+    VALID_TRANSITIONS is checked in the WHERE clause and history rows are written with
+    INSERT ... SELECT, so it costs a few statements per BULK_STATUS_CHUNK_SIZE cases instead
+    of a request per case. Cases that cannot move are listed in "rejected"; the rest move.
+    """
+    new_status = update.new_status.upper()
+    if new_status not in VALID_TRANSITIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {update.new_status}")
+    if (update.case_ids is None) == (update.filter is None):
+        raise HTTPException(status_code=400, detail="Give either case_ids or filter")
+
+    invoice_ids = {}
+    if update.case_ids is not None:
+        for case_id in update.case_ids:
+            try:
+                invoice_ids[case_id] = int(case_id.replace("C-", ""))
+            except ValueError:
+                invoice_ids[case_id] = None
+        unique_ids = sorted({i for i in invoice_ids.values() if i is not None})
+        targets = [InvoiceDB.id.in_(unique_ids[start:start + BULK_STATUS_CHUNK_SIZE])
+                   for start in range(0, len(unique_ids), BULK_STATUS_CHUNK_SIZE)]
+    else:
+        clauses = update.filter.clauses()
+        if not clauses:
+            raise HTTPException(status_code=400, detail="Filter matches every case; give at least one field")
+        targets = [and_(*clauses)]
+
+    timestamp = datetime.utcnow()
+    moved, refused = [], {}
+    try:
+        reserve_change_seq(db)  # Version row lock first: no other writer moves these cases until commit
+        for target in targets:
+            chunk_moved, chunk_refused = transition_cases(db, target, new_status, update.reason, current_user, timestamp)
+            moved.extend(chunk_moved)
+            refused.update(chunk_refused)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def rejection(case_id, detail, current_status=None):
+        return {"case_id": case_id, "current_status": current_status, "detail": detail}
+
+    def refused_detail(old_status):
+        if old_status not in VALID_TRANSITIONS:
+            return f"Invalid current status: {old_status}"
+        return f"Invalid transition: {old_status} → {new_status}"
+
+    rejected = []
+    if update.case_ids is not None:
+        moved_ids = {invoice_id for invoice_id, _ in moved}
+        for case_id, invoice_id in invoice_ids.items():
+            if invoice_id is None:
+                rejected.append(rejection(case_id, "Invalid case_id format"))
+            elif invoice_id in refused:
+                rejected.append(rejection(case_id, refused_detail(refused[invoice_id]), refused[invoice_id]))
+            elif invoice_id not in moved_ids:
+                rejected.append(rejection(case_id, "Case not found"))
+    else:
+        rejected = [rejection(f"C-{invoice_id}", refused_detail(old_status), old_status)
+                    for invoice_id, old_status in sorted(refused.items())]
+
+    return {
+        "status": "success",
+        "new_status": new_status,
+        "updated": len(moved),
+        "case_ids": [f"C-{invoice_id}" for invoice_id, _ in sorted(moved)],
+        "rejected": rejected
+    }
+
+def transition_cases(db: Session, target, new_status, reason, changed_by, timestamp):
+    """
+    Moves the cases matching `target` whose status allows new_status, in the caller's
+    transaction. Returns ([(invoice_id, old_status)] moved, {invoice_id: status} refused).
+    """
+    allowed = [old for old, targets in VALID_TRANSITIONS.items() if new_status in targets]
+    eligible = and_(target, InvoiceDB.status.in_(allowed))
+    refused = dict(db.execute(
+        select(InvoiceDB.id, InvoiceDB.status).where(target, or_(InvoiceDB.status.is_(None), InvoiceDB.status.notin_(allowed)))
+    ).all())
+
+    # Portfolio summary: the moved groups leave their status for new_status (one aggregate, no rebuild)
+    deltas = {}
+    for *key, invoices, amount, paid in db.execute(summary_aggregate(eligible)):
+        for group, sign in ((tuple(key), -1), ((new_status, *key[1:]), 1)):
+            delta = deltas.setdefault(group, [0, 0.0, 0.0])
+            delta[0] += sign * invoices
+            delta[1] += sign * amount
+            delta[2] += sign * paid
+    apply_summary_deltas(db, deltas)
+
+    # History first, while the rows still hold their old status
+    moved = db.execute(
+        insert(StatusHistoryDB).from_select(
+            ["invoice_id", "old_status", "new_status", "changed_by", "changed_at", "reason", "auto_updated"],
+            select(InvoiceDB.id, InvoiceDB.status, literal(new_status), literal(changed_by), literal(timestamp),
+                   literal(reason, String), literal(0)).where(eligible)
+        ).returning(StatusHistoryDB.invoice_id, StatusHistoryDB.old_status)
+    ).all()
+    if not moved:
+        return [], refused
+
+    values = {"status": new_status}
+    if new_status == "RESOLVED":
+        values["resolved_at"] = func.coalesce(InvoiceDB.resolved_at, timestamp)
+    elif new_status == "CLOSED":
+        values["closed_at"] = func.coalesce(InvoiceDB.closed_at, timestamp)
+        if reason:
+            values["closed_reason"] = reason
+    db.execute(sql_update(InvoiceDB).where(eligible).values(**values),
+               execution_options={"synchronize_session": False, "portfolio_summary": False})
+
+    if events.bus.subscribers:  # INSERT ... SELECT skips the flush hooks that collect these
+        version = db.info.get("change_seq", 0)
+        events.queue_case_events(db, [
+            events.StatusChanged(f"C-{invoice_id}", version, old_status, new_status, changed_by, reason, False,
+                                 events.isoformat(timestamp))
+            for invoice_id, old_status in moved
+        ])
+    return [tuple(row) for row in moved], refused
+
 class ContactUpdateRequest(BaseModel):
     phone: str
 
@@ -572,7 +809,7 @@ def get_voice_token(current_user: str = Depends(verify_token)):
     Generates a Twilio Access Token for the frontend VOIP client.
     """
     try:
-        if not TWILIO_AVAILABLE:
+        if not load_twilio():
             raise HTTPException(status_code=503, detail="Twilio features are currently disabled (SDK not found)")
             
         # Check if credentials are present
@@ -604,7 +841,7 @@ async def handle_voice_webhook(request: Request):
     """
     Twilio Voice Webhook: Orchestrates the call and enables recording.
     """
-    if not TWILIO_AVAILABLE:
+    if not load_twilio():
         return Response(content="<Response><Say>Telephony disabled.</Say></Response>", media_type="application/xml")
         
     form_data = await request.form()
@@ -636,7 +873,7 @@ async def handle_voice_webhook(request: Request):
 async def handle_recording_complete(
     case_id: str, 
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Post-Call AI Analysis Loop:
@@ -657,7 +894,9 @@ async def handle_recording_complete(
         # A. Download Audio (Twilio recordings require auth if private)
         account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-        audio_resp = requests.get(recording_url, auth=(account_sid, auth_token))
+        import httpx
+        async with httpx.AsyncClient(timeout=60) as http:
+            audio_resp = await http.get(recording_url, auth=(account_sid, auth_token) if account_sid and auth_token else None)
         audio_content = audio_resp.content
         
         # B. Analyze with Sentinel (Gemini Multimodal)
@@ -672,13 +911,13 @@ async def handle_recording_complete(
             print(f"[ERROR] Invalid Case ID format: {case_id}")
             return {"status": "error", "message": "Invalid Case ID"}
 
-        invoice = db.query(InvoiceDB).filter(InvoiceDB.id == invoice_id).first()
+        invoice = await db.get(InvoiceDB, invoice_id)
         
         if invoice:
             # 1. Save Transcription/Analysis to logs
             log = InteractionLogDB(
                 invoice_id=invoice_id,
-                created_at=datetime.utcnow().isoformat(),
+                created_at=datetime.utcnow(),
                 interaction_text=f"[AUTO-ANALYSIS] {analysis.get('transcript', 'Call Recorded')}",
                 risk_level=analysis.get('risk_level', 'UNKNOWN'),
                 intent=analysis.get('intent', 'GENERAL'),
@@ -709,13 +948,13 @@ async def handle_recording_complete(
                     old_status="IN_PROGRESS", # Assume current
                     new_status="UNDER_REVIEW",
                     changed_by="SENTINEL_AI",
-                    changed_at=datetime.utcnow().isoformat(),
+                    changed_at=datetime.utcnow(),
                     reason="Automated intent detection: Promise to Pay",
                     auto_updated=1
                 )
                 db.add(history)
                 
-            db.commit()
+            await db.commit()
             print(f"[SUCCESS] AI Loop Complete. Case {case_id} p_score -> {new_score}")
         else:
             print(f"[WARNING] Case ID {case_id} not found in DB")
@@ -774,6 +1013,11 @@ def create_manual_case(case: ManualCaseRequest, db: Session = Depends(get_db), c
             status="PENDING"
         )
         db.add(invoice)
+
+        # SCORE-ON-INGEST: Score right away so the dashboard never shows 0%
+        if SCORE_ON_INGEST:
+            score_invoices([invoice], [debtor.credit_score])
+
         db.commit()
         db.refresh(invoice)
         
@@ -785,49 +1029,231 @@ def create_manual_case(case: ManualCaseRequest, db: Session = Depends(get_db), c
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# In-memory pages of the case list, keyed by portfolio version + query
+case_list_cache = PageCache("cases")
+
+# Statuses that take a case off the active list
+CLOSED_STATUSES = ["RESOLVED", "CLOSED"]
+
 @app.get("/api/v1/cases")
-def get_pending_cases(db: Session = Depends(get_db), current_user: str = Depends(verify_token)):
+def get_pending_cases(request: Request, fields: Optional[str] = None, db: Session = Depends(get_db), current_user: str = Depends(verify_token)):
     """
     Fetch all pending invoices from the database.
+    ?fields=status,pScore,... returns only those fields (plus case_id); leave out "history"
+    and the interaction logs are not loaded at all (see /api/v1/cases/{case_id}/history).
+    Conditional GET: the ETag only changes when the portfolio version (or the query) does,
+    so an unchanged dashboard refresh costs one query and a 304.
+    """
+    fields = parse_case_fields(fields)
+    version = get_portfolio_version(db)
+    query = normalized_query(request.query_params)
+    etag = make_etag(version, query)
+    headers = {"ETag": etag, "X-Portfolio-Version": str(version)}  # Version = cursor for /api/v1/cases/changes
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    headers.update({"Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+    encoding = compression.negotiate(request.headers.get("accept-encoding"))
+    # Compressed bodies are cached too: a large list is compressed once per version, not per request
+    body = case_list_cache.get(version, f"{query}#{encoding}") if encoding else None
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={**headers, "Content-Encoding": encoding})
+
+    body = case_list_cache.get(version, query)
+    if body is None:
+        body = serialization.dumps(build_case_list(db, fields=fields))
+        case_list_cache.put(version, query, body)
+    if encoding and len(body) >= compression.COMPRESSION_MIN_BYTES:
+        body = compression.compress(body, encoding)
+        case_list_cache.put(version, f"{query}#{encoding}", body)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Case list fields (?fields=): output name -> columns it needs, and how to build it from a row.
+# Only the columns of the requested fields are selected; "history" costs one more query.
+CASE_FIELDS = {
+    "case_id": ([InvoiceDB.id], lambda row: f"C-{row.id}"),
+    "companyName": ([DebtorDB.name], lambda row: row.name),
+    "phone": ([DebtorDB.phone], lambda row: row.phone),
+    "amount": ([InvoiceDB.amount], lambda row: row.amount),
+    "initial_score": ([DebtorDB.credit_score], lambda row: row.credit_score),
+    "age_days": ([InvoiceDB.age_days], lambda row: row.age_days),
+    "history": ([InvoiceDB.id], None),
+    "pScore": ([InvoiceDB.p_score], lambda row: row.p_score),
+    "suggestedAction": ([InvoiceDB.decision], lambda row: row.decision),
+    "status": ([InvoiceDB.status], lambda row: row.status),
+    "paidAmount": ([InvoiceDB.paid_amount], lambda row: row.paid_amount),
+    "riskLevel": ([InvoiceDB.risk_level], lambda row: row.risk_level if row.risk_level else "UNKNOWN"),
+}
+
+def parse_case_fields(fields: Optional[str]):
+    """?fields=status,pScore -> ["case_id", "status", "pScore"] (case_id is always included)."""
+    if not fields:
+        return list(CASE_FIELDS)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in CASE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Valid: {', '.join(CASE_FIELDS)}")
+    return ["case_id"] + [name for name in dict.fromkeys(requested) if name != "case_id"]
+
+def serialize_log(log):
+    return {
+        "id": log.id,
+        "date": log.created_at.isoformat() if log.created_at else None,
+        "text": log.interaction_text,
+        "riskLevel": log.risk_level,
+        "sentimentScore": log.sentiment_score,
+        "violationFlags": json.loads(log.violation_flags) if log.violation_flags else []
+    }
+
+def build_case_list(db: Session, only=None, fields=None):
     """
-    results = []
-    # Join Invoice with Debtor to get company name
+    Active cases, with their interaction history if requested (one or two queries).
+    only: optional extra filter on InvoiceDB (e.g. the change feed's "changed since").
+    fields: output fields to build (see CASE_FIELDS), default all.
+    """
+    fields = fields or list(CASE_FIELDS)
     # Show all active cases (Except those already resolved or closed)
-    invoices = db.query(InvoiceDB, DebtorDB).join(DebtorDB, InvoiceDB.debtor_id == DebtorDB.id).filter(
-        InvoiceDB.status.notin_(["RESOLVED", "CLOSED"])
-    ).all()
-    
-    for inv, debtor in invoices:
-        # Fetch interaction logs for this invoice
-        logs = db.query(InteractionLogDB).filter(
-            InteractionLogDB.invoice_id == inv.id
+    active = InvoiceDB.status.notin_(CLOSED_STATUSES)
+    if only is not None:
+        active = and_(active, only)
+    columns = list(dict.fromkeys(column for name in fields for column in CASE_FIELDS[name][0]))
+    query = db.query(*columns)
+    if any(column.class_ is DebtorDB for column in columns):
+        # Join Invoice with Debtor to get company name
+        query = query.select_from(InvoiceDB).join(DebtorDB, InvoiceDB.debtor_id == DebtorDB.id)
+    rows = query.filter(active).all()
+
+    # Interaction logs of every active case in one query (not one per case)
+    logs_by_invoice = {}
+    if "history" in fields:
+        all_logs = db.query(InteractionLogDB).join(InvoiceDB, InteractionLogDB.invoice_id == InvoiceDB.id).filter(
+            active
         ).order_by(InteractionLogDB.created_at.desc()).all()
-        
-        results.append({
-            "case_id": f"C-{inv.id}", # Simple ID generation
-            "companyName": debtor.name,
-            "phone": debtor.phone,
-            "amount": inv.amount,
-            "initial_score": debtor.credit_score,
-            "age_days": inv.age_days,
-            "history": [
-                {
-                    "id": log.id,
-                    "date": log.created_at,
-                    "text": log.interaction_text,
-                    "riskLevel": log.risk_level,
-                    "sentimentScore": log.sentiment_score,
-                    "violationFlags": json.loads(log.violation_flags) if log.violation_flags else []
-                }
-                for log in logs
-            ],
-            "pScore": inv.p_score,
-            "suggestedAction": inv.decision,
-            "status": inv.status,
-            "paidAmount": inv.paid_amount,
-            "riskLevel": inv.risk_level if inv.risk_level else "UNKNOWN"
-        })
-    return results
+        for log in all_logs:
+            logs_by_invoice.setdefault(log.invoice_id, []).append(serialize_log(log))
+
+    getters = [(name, CASE_FIELDS[name][1]) for name in fields]
+    return [
+        {name: getter(row) if getter else logs_by_invoice.get(row.id, []) for name, getter in getters}
+        for row in rows
+    ]
+
+@app.get("/api/v1/cases/changes")
+def get_case_changes(since: int = 0, db: Session = Depends(get_db), current_user: str = Depends(verify_token)):
+    """
+    Incremental sync for the case list. `since` is the cursor from the previous call.
+    Returns cases changed after it (same shape as /api/v1/cases), ids of cases that left
+    the active set, and the next cursor. reset=true means the cursor is too old (rows were
+    deleted or bulk loaded since) and `changed` is a full snapshot to replace local state.
+    """
+    state = db.query(PortfolioStateDB).filter(PortfolioStateDB.id == 1).first()
+    cursor = state.version if state else 0
+    reset = since <= 0 or since < (state.reset_seq if state else 0) or since > cursor
+
+    if reset:
+        return {"cursor": cursor, "reset": True, "changed": build_case_list(db), "removed": []}
+
+    # Upper bound too: rows committed after the cursor was read belong to the next call
+    in_window = lambda column: and_(column > since, column <= cursor)
+    changed = or_(
+        in_window(InvoiceDB.change_seq),
+        InvoiceDB.id.in_(select(InteractionLogDB.invoice_id).where(in_window(InteractionLogDB.change_seq))),
+    )
+    removed = db.query(InvoiceDB.id).filter(InvoiceDB.status.in_(CLOSED_STATUSES), in_window(InvoiceDB.change_seq))
+    return {
+        "cursor": cursor,
+        "reset": False,
+        "changed": build_case_list(db, only=changed),
+        "removed": [f"C-{invoice_id}" for (invoice_id,) in removed],
+    }
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 500
+
+def encode_history_cursor(log):
+    return base64.urlsafe_b64encode(json.dumps([log.created_at.isoformat(), log.id]).encode()).decode()
+
+def decode_history_cursor(cursor):
+    try:
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/api/v1/portfolio/summary")
+def get_portfolio_summary(db: Session = Depends(get_db), current_user: str = Depends(verify_token)):
+    """
+    Dashboard KPIs: invoice counts and amount / paid / outstanding balances, in total and by
+    status, risk level, decision and age bucket. Reads the maintained summary table (one row
+    per group), never the invoices, so its cost does not grow with the portfolio.
+    """
+    return {"version": get_portfolio_version(db), **portfolio_summary.read_summary(db)}
+
+@app.get("/api/v1/cases/{case_id}/history")
+def get_case_history(case_id: str, limit: int = HISTORY_PAGE_SIZE, cursor: Optional[str] = None,
+                     db: Session = Depends(get_db), current_user: str = Depends(verify_token)):
+    """
+    Interaction history of one case, newest first, a page at a time.
+    Keyset pagination on (created_at, id): pass next_cursor back as ?cursor= for the next
+    (older) page; each page is an index range scan however deep the history goes.
+    """
+    try:
+        invoice_id = int(case_id.replace("C-", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid case_id format")
+    if not db.query(InvoiceDB.id).filter(InvoiceDB.id == invoice_id).first():
+        raise HTTPException(status_code=404, detail="Case not found")
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+
+    query = db.query(InteractionLogDB).filter(InteractionLogDB.invoice_id == invoice_id)
+    if cursor:
+        created_at, log_id = decode_history_cursor(cursor)
+        query = query.filter(or_(
+            InteractionLogDB.created_at < created_at,
+            and_(InteractionLogDB.created_at == created_at, InteractionLogDB.id < log_id),
+        ))
+    logs = query.order_by(InteractionLogDB.created_at.desc(), InteractionLogDB.id.desc()).limit(limit + 1).all()
+    page = logs[:limit]
+    return {
+        "case_id": case_id,
+        "items": [serialize_log(log) for log in page],
+        "next_cursor": encode_history_cursor(page[-1]) if len(logs) > limit else None,
+    }
+
+@app.get("/api/v1/events")
+async def stream_case_events(request: Request, current_user: str = Depends(verify_stream_token)):
+    """
+    Server-sent events for status changes and interaction logs, as they commit.
+    Event ids are portfolio versions: on a "resync" event (or reconnect with Last-Event-ID)
+    catch up from /api/v1/cases/changes?since=<id>.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    subscription = events.bus.subscribe(resync_since=int(last_event_id) if last_event_id.isdigit() else None)
+    return StreamingResponse(
+        events.event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --- ADMIN: REQUEST PROFILES ---
+@app.get("/api/v1/admin/profiles")
+def list_profiles(limit: int = 20, current_user: str = Depends(verify_admin)):
+    """
+    Most recent request profiles (metadata and top functions), newest first.
+    """
+    return profiler.store.list(limit=max(1, min(limit, profiler.PROFILE_KEEP)))
+
+@app.get("/api/v1/admin/profiles/{profile_id}")
+def download_profile(profile_id: str, current_user: str = Depends(verify_admin)):
+    """
+    Folded stacks of one profile (open with speedscope or flamegraph.pl).
+    """
+    path = profiler.store.path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found (expired from the ring buffer?)")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
+
 
 @app.get("/api/v1/payment/success")
 def payment_success_callback(case_id: str, amount_paid: float = 0.0, db: Session = Depends(get_db)):
@@ -850,7 +1276,7 @@ def payment_success_callback(case_id: str, amount_paid: float = 0.0, db: Session
             new_status = "RESOLVED" if remaining_balance <= 0 else "IN_PROGRESS"
             
             invoice.status = new_status
-            timestamp = datetime.utcnow().isoformat()
+            timestamp = datetime.utcnow()
             
             if new_status == "RESOLVED":
                 invoice.resolved_at = timestamp
@@ -877,4 +1303,5 @@ def payment_success_callback(case_id: str, amount_paid: float = 0.0, db: Session
         raise HTTPException(status_code=400, detail="Invalid case_id format")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,48 @@
+"""
+Schema migrations for DATABASE_URL (see modules/migrations.py).
+
+  python migrate.py status                 applied / pending versions, backfills in progress
+  python migrate.py upgrade [--to N]       create missing tables, run pending migrations
+          [--batch-size ROWS] [--sleep-ms MS]
+  python migrate.py stamp [N]              record migrations as applied without running them
+  python migrate.py new "description"      write the next migrations/NNNN_description.py
+
+An interrupted upgrade (deploy, crash, Ctrl-C) is finished by running it again: backfills
+resume from their last committed batch.
+"""
+
+import argparse
+
+from modules import migrations
+from modules.database import Base, engine
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RecoverAI schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+    upgrade = commands.add_parser("upgrade")
+    upgrade.add_argument("--to", type=int, help="Stop after this version")
+    upgrade.add_argument("--batch-size", type=int, help=f"Backfill rows per transaction (default {migrations.MIGRATION_BATCH_SIZE})")
+    upgrade.add_argument("--sleep-ms", type=float, help=f"Pause between backfill batches (default {migrations.MIGRATION_BATCH_SLEEP_MS:g})")
+    stamp = commands.add_parser("stamp")
+    stamp.add_argument("version", type=int, nargs="?")
+    new = commands.add_parser("new")
+    new.add_argument("description")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for version, name, applied_at, backfills in migrations.status(engine):
+            state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+            progress = "".join(f", {key} at id {position:,}" for key, position in backfills.items())
+            print(f"{version:04d}_{name:<40} {state}{progress}")
+    elif args.command == "upgrade":
+        Base.metadata.create_all(bind=engine)
+        done = migrations.upgrade(engine, to=args.to, batch_size=args.batch_size, sleep_ms=args.sleep_ms)
+        print(f"Applied {len(done)} migration(s)" if done else "Already up to date")
+    elif args.command == "stamp":
+        migrations.stamp(engine, to=args.version)
+    elif args.command == "new":
+        print(f"Created {migrations.new(args.description)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+change_seq on invoices and interaction logs: the portfolio version of each row's last write,
+the cursor of the case change feed.
+"""
+
+def upgrade(op):
+    for table in ("invoices", "interaction_logs"):
+        op.add_column(table, "change_seq", "INTEGER", default=0)
+        op.create_index(f"ix_{table}_change_seq", table, ["change_seq"])
@@ -0,0 +1,49 @@
+"""
+ISO-string timestamps become DateTime, with range indexes on (invoice_id, created_at),
+changed_at and closed_at.
+
+SQLite keeps a column's declared type, so values are rewritten in place into DateTime's
+storage format ('YYYY-MM-DD HH:MM:SS.ffffff', where string order is time order). Postgres
+fills a TIMESTAMP shadow column in batches, catches up rows written meanwhile under a short
+lock and swaps it in.
+"""
+
+from sqlalchemy import DateTime
+
+COLUMNS = [
+    ("interaction_logs", "created_at"),
+    ("status_history", "changed_at"),
+    ("invoices", "resolved_at"),
+    ("invoices", "closed_at"),
+]
+INDEXES = [
+    ("ix_interaction_logs_invoice_created", "interaction_logs", ["invoice_id", "created_at"]),
+    ("ix_status_history_changed_at", "status_history", ["changed_at"]),
+    ("ix_invoices_closed_at", "invoices", ["closed_at"]),
+]
+
+def normalize_sqlite(op, table, column):
+    op.backfill(f"{table}.{column}", table,
+                f"UPDATE {table} SET {column} = replace(substr({column}, 1, 19), 'T', ' ') || "
+                f"CASE WHEN length({column}) > 19 THEN substr({column}, 20) ELSE '.000000' END "
+                f"WHERE id >= :low AND id < :high AND (substr({column}, 11, 1) = 'T' OR length({column}) = 19)")
+
+def convert_postgres(op, table, column):
+    if isinstance(op.column_type(table, column), DateTime):
+        return
+    shadow = f"{column}_ts"
+    op.add_column(table, shadow, "TIMESTAMP")
+    convert = f"UPDATE {table} SET {shadow} = CAST({column} AS TIMESTAMP) WHERE {column} IS NOT NULL AND {shadow} IS NULL"
+    op.backfill(f"{table}.{column}", table, f"{convert} AND id >= :low AND id < :high")
+    with op.transaction() as conn:
+        conn.exec_driver_sql(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+        conn.exec_driver_sql(convert)
+        conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+        conn.exec_driver_sql(f"ALTER TABLE {table} RENAME COLUMN {shadow} TO {column}")
+
+def upgrade(op):
+    convert = convert_postgres if op.dialect == "postgresql" else normalize_sqlite
+    for table, column in COLUMNS:
+        convert(op, table, column)
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
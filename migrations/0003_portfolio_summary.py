@@ -0,0 +1,12 @@
+"""
+portfolio_summary: invoice counts and balances per (status, risk_level, decision, age bucket),
+filled from the existing invoices. From then on the session hooks keep it current.
+"""
+
+from modules.database import PortfolioSummaryDB
+from modules.portfolio_summary import reconcile
+
+def upgrade(op):
+    PortfolioSummaryDB.__table__.create(op.bind, checkfirst=True)
+    # Under the portfolio version lock, so invoice writes during the fill are not lost
+    reconcile(op.bind)
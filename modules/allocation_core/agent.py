@@ -1,3 +1,5 @@
+import numpy as np
+
 class AllocationAgent:
     def __init__(self, risk_engine):
         self.risk_engine = risk_engine
@@ -34,3 +36,14 @@ class AllocationAgent:
                 "target": "Internal_Legal_Review",
                 "reason": "Score below threshold for DCA effort."
             }
+
+    def allocate_batch(self, p_scores):
+        """
+        Vectorized decision logic for bulk scoring.
+        Maps an array of p_scores to the same actions allocate_case would pick.
+        """
+        p = np.asarray(p_scores, dtype=float)
+        return np.where(
+            p > 0.70, "ALLOCATE_DIGITAL",
+            np.where(p >= 0.30, "ALLOCATE_AGENCY", "ALLOCATE_LEGAL")
+        )
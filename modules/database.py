@@ -1,7 +1,9 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import create_engine, event, inspect, text, select, delete, func, case, update, insert, make_url, Column, Index, Integer, String, Float, Date, DateTime, ForeignKey
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, column_property
+from itertools import chain
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,15 +12,82 @@ load_dotenv()
 # Check for Cloud SQL URL (PostgreSQL) or fallback to Local SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./recoverai.db")
 
-connect_args = {}
-# SQLite needs this specific check_same_thread flag, Postgres does not
-if "sqlite" in DATABASE_URL:
-    connect_args = {"check_same_thread": False}
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# Connection pool (Postgres, and SQLite files): size, overflow, liveness check, max connection age
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", "true")  # Survives Cloud SQL / proxy restarts
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds; below server/proxy idle timeouts
+
+# SQLite pragmas applied to every new connection, by profile (SQLITE_PROFILE):
+#   wal:    concurrent readers alongside one writer, fsync at checkpoints instead of every commit
+#           (a power loss can lose the last commits, never corrupt the file)
+#   legacy: SQLite defaults (rollback journal, fsync on every commit)
+SQLITE_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),  # Negative = KiB, per connection
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000")),
+        "temp_store": "MEMORY",
+    },
+    "legacy": {},
+}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "wal")
+SQLITE_PRAGMAS = SQLITE_PROFILES[SQLITE_PROFILE]
+
+def engine_options(url):
+    """create_engine() / create_async_engine() keyword arguments for a URL, from the environment."""
+    url = make_url(url)
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        if url.get_driver_name() in ("", "pysqlite"):
+            # Connections are shared with threadpool workers (the pool hands out one at a time)
+            options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options  # Single-connection pool: no pool settings
+    else:
+        options["pool_pre_ping"] = DB_POOL_PRE_PING
+    options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                   pool_recycle=DB_POOL_RECYCLE)
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def configure_engine(bind):
+    """Per-connection setup of a (sync) engine; returns it."""
+    if bind.dialect.name == "sqlite" and SQLITE_PRAGMAS:
+        event.listen(bind, "connect", apply_sqlite_pragmas)
+    return bind
+
+engine = configure_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def async_database_url(url):
+    """Same database through an asyncio driver: aiosqlite for SQLite, asyncpg for Postgres."""
+    url = make_url(url)
+    driver = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}.get(url.get_backend_name())
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}") if driver else url
+
+# Async engine for the async routes (same database; override with ASYNC_DATABASE_URL).
+# Its sessions use SessionLocal's session class, so the version/change-feed/event hooks
+# below apply to them too. expire_on_commit=False: attributes stay readable after commit
+# without an implicit (blocking) refresh.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+configure_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False,
+                                       sync_session_class=SessionLocal.class_)
+
 # 2. DEFINING THE TABLES (ORM)
 class DebtorDB(Base):
     __tablename__ = "debtors"
@@ -32,30 +101,36 @@ class InvoiceDB(Base):
     __tablename__ = "invoices"
     id = Column(Integer, primary_key=True, index=True)
     debtor_id = Column(Integer, ForeignKey("debtors.id"), index=True)
-    amount = Column(Float)
-    age_days = Column(Integer)
+    # active_history: the portfolio summary needs the old value of these even when it was never loaded
+    amount = column_property(Column(Float), active_history=True)
+    age_days = column_property(Column(Integer), active_history=True)
     # AI Scores
     p_score = Column(Float, default=0.0)
-    decision = Column(String, default="PENDING")
+    decision = column_property(Column(String, default="PENDING"), active_history=True)
     # Sentinel Compliance
-    risk_level = Column(String, default="UNKNOWN")
+    risk_level = column_property(Column(String, default="UNKNOWN"), active_history=True)
     # Payment Status
-    status = Column(String, default="PENDING")  # PENDING | IN_PROGRESS | UNDER_REVIEW | RESOLVED | CLOSED | ESCALATED
-    paid_amount = Column(Float, default=0.0) # Track partial payments
-    resolved_at = Column(String, nullable=True)  # ISO timestamp when resolved
-    closed_at = Column(String, nullable=True)  # ISO timestamp when closed
+    status = column_property(Column(String, default="PENDING"), active_history=True)  # PENDING | IN_PROGRESS | UNDER_REVIEW | RESOLVED | CLOSED | ESCALATED
+    paid_amount = column_property(Column(Float, default=0.0), active_history=True) # Track partial payments
+    resolved_at = Column(DateTime, nullable=True)  # UTC, when resolved
+    closed_at = Column(DateTime, nullable=True, index=True)  # UTC, when closed
     closed_reason = Column(String, nullable=True)  # Reason for closing
+    change_seq = Column(Integer, default=0, index=True)  # Portfolio version of the last write (change feed cursor)
 
 class InteractionLogDB(Base):
     __tablename__ = "interaction_logs"
     id = Column(Integer, primary_key=True, index=True)
     invoice_id = Column(Integer, ForeignKey("invoices.id"), index=True)
-    created_at = Column(String)  # ISO timestamp
+    created_at = Column(DateTime)  # UTC
     interaction_text = Column(String)  # What the agent said/wrote
     risk_level = Column(String, default="UNKNOWN")  # Sentinel result
     intent = Column(String, default="GENERAL") # PTP, DISPUTE, etc.
     sentiment_score = Column(Float, default=0.0)
     violation_flags = Column(String, default="[]")  # JSON as string for SQLite compatibility
+    change_seq = Column(Integer, default=0, index=True)  # Portfolio version of the write
+
+    # A case's timeline, newest first, and "activity in the last N days" as a range scan
+    __table_args__ = (Index("ix_interaction_logs_invoice_created", "invoice_id", "created_at"),)
 
 class StatusHistoryDB(Base):
     __tablename__ = "status_history"
@@ -64,7 +139,7 @@ class StatusHistoryDB(Base):
     old_status = Column(String)
     new_status = Column(String)
     changed_by = Column(String)  # username or "SYSTEM"
-    changed_at = Column(String)  # ISO timestamp
+    changed_at = Column(DateTime, index=True)  # UTC
     reason = Column(String, nullable=True)  # Optional reason for change
     auto_updated = Column(Integer, default=0)  # 0=Manual, 1=Automatic
 
@@ -74,10 +149,252 @@ class UserDB(Base):
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
 
-# 3. HELPER TO GET DB SESSION
+class PortfolioStateDB(Base):
+    __tablename__ = "portfolio_state"
+    id = Column(Integer, primary_key=True)  # Single row, id=1
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every committed portfolio write
+    reset_seq = Column(Integer, nullable=False, default=0)  # Version of the last delete/bulk load (change feeds must resync)
+
+class PortfolioSummaryDB(Base):
+    __tablename__ = "portfolio_summary"
+    # One row per group of invoices; see section 3b
+    status = Column(String, primary_key=True)
+    risk_level = Column(String, primary_key=True)
+    decision = Column(String, primary_key=True)
+    age_bucket = Column(String, primary_key=True)
+    invoices = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+    paid_amount = Column(Float, nullable=False, default=0.0)
+
+event.listen(
+    PortfolioStateDB.__table__, "after_create",
+    lambda target, connection, **kw: connection.execute(insert(target).values(id=1, version=0, reset_seq=0))
+)
+
+def init_schema(bind=None, migrate=True):
+    """
+    create_all() for missing tables, then the versioned migrations (modules/migrations.py)
+    that change existing ones. A database created here from the current models is already
+    at the latest version, so its migrations are only recorded.
+    """
+    from modules import migrations
+    bind = bind or engine
+    fresh = not inspect(bind).has_table(InvoiceDB.__tablename__)
+    Base.metadata.create_all(bind=bind)
+    if fresh:
+        migrations.stamp(bind)
+    elif migrate:
+        migrations.upgrade(bind)
+    elif pending := migrations.pending(bind):
+        print(f"Pending migrations (run python migrate.py upgrade): {', '.join(f'{m.version:04d}_{m.name}' for m in pending)}")
+
+# 3. PORTFOLIO VERSION & CHANGE SEQUENCE
+# The first flush of a transaction that touches these tables bumps portfolio_state.version
+# (its row lock is held until commit, so versions commit in order) and stamps every invoice
+# and interaction log written in that transaction with change_seq = the new version.
+# Readers use the version for ETags and change_seq for "what changed since" feeds.
+# Tracked through session events, so every write path (API, ingest, scripts) is covered.
+PORTFOLIO_TABLES = {"debtors", "invoices", "interaction_logs", "status_history"}
+CHANGE_TRACKED = (InvoiceDB, InteractionLogDB)
+
+def bump_portfolio_version(conn):
+    """
+    Increments and returns the version, on a Session or a Connection (for writers
+    that bypass the ORM).
+    """
+    version = conn.execute(
+        update(PortfolioStateDB).where(PortfolioStateDB.id == 1)
+        .values(version=PortfolioStateDB.version + 1).returning(PortfolioStateDB.version)
+    ).scalar()
+    if version is None:
+        conn.execute(insert(PortfolioStateDB).values(id=1, version=1, reset_seq=0))
+        version = 1
+    return version
+
+def mark_portfolio_reset(conn, version):
+    """Rows were deleted or bulk loaded: change-feed cursors older than this must resync."""
+    conn.execute(update(PortfolioStateDB).where(PortfolioStateDB.id == 1).values(reset_seq=version))
+
+def get_portfolio_version(db):
+    return db.query(PortfolioStateDB.version).filter(PortfolioStateDB.id == 1).scalar() or 0
+
+def reserve_change_seq(session):
+    """The version this transaction will commit as (bumped once, on first use)."""
+    seq = session.info.get("change_seq")
+    if seq is None:
+        seq = session.info["change_seq"] = bump_portfolio_version(session)
+    return seq
+
+@event.listens_for(SessionLocal, "before_flush")
+def stamp_flushed_changes(session, flush_context, instances):
+    touched = [
+        obj for obj in chain(session.new, session.deleted,
+                             (o for o in session.dirty if session.is_modified(o)))
+        if getattr(obj, "__tablename__", None) in PORTFOLIO_TABLES
+    ]
+    if not touched:
+        return
+    seq = reserve_change_seq(session)
+    for obj in touched:
+        if obj in session.deleted:
+            if isinstance(obj, InvoiceDB):
+                mark_portfolio_reset(session, seq)
+        elif isinstance(obj, CHANGE_TRACKED):
+            obj.change_seq = seq
+        elif isinstance(obj, DebtorDB) and obj.id is not None:
+            # Name/phone are part of every case of this debtor
+            session.execute(update(InvoiceDB).where(InvoiceDB.debtor_id == obj.id).values(change_seq=seq),
+                            execution_options={"synchronize_session": False, "portfolio_summary": False})
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def stamp_bulk_statement(orm_execute_state):
+    # Bulk insert()/update()/delete() statements do not go through the flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    name = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+    if name not in PORTFOLIO_TABLES:
+        return
+    seq = reserve_change_seq(orm_execute_state.session)
+    if orm_execute_state.is_update and name in ("invoices", "interaction_logs"):
+        orm_execute_state.statement = orm_execute_state.statement.values(change_seq=seq)
+    elif orm_execute_state.is_delete and name == "invoices":
+        mark_portfolio_reset(orm_execute_state.session, seq)
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def release_change_seq(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("change_seq", None)
+        session.info.pop("rebuild_summary", None)
+
+# 3b. PORTFOLIO SUMMARY
+# Invoice counts and balances per (status, risk_level, decision, age bucket), kept in step
+# with invoices inside the writing transaction, so dashboard KPIs read a few hundred rows
+# instead of scanning invoices. Flushes apply per-group deltas (the version row lock taken
+# above already serializes invoice writers); bulk DELETEs subtract their rows' aggregate;
+# other bulk statements on invoices rebuild the table at commit unless they pass
+# execution_options={"portfolio_summary": False} (they leave these columns alone, or the
+# caller applies the deltas). Raw Connection writes call rebuild_portfolio_summary().
+AGE_BUCKETS = [(30, "0-30"), (60, "31-60"), (90, "61-90"), (180, "91-180")]
+OLDEST_AGE_BUCKET = "180+"
+SUMMARY_KEYS = ("status", "risk_level", "decision", "age_bucket")
+SUMMARY_COLUMNS = ("status", "risk_level", "decision", "age_days", "amount", "paid_amount")
+NULL_GROUP = "UNKNOWN"  # Group of invoices with no status / risk_level / decision (raw imports)
+
+def age_bucket(age_days):
+    for upper, label in AGE_BUCKETS:
+        if (age_days or 0) <= upper:
+            return label
+    return OLDEST_AGE_BUCKET
+
+def age_bucket_sql(column):
+    return case(*[(func.coalesce(column, 0) <= upper, label) for upper, label in AGE_BUCKETS], else_=OLDEST_AGE_BUCKET)
+
+def summary_aggregate(whereclause=None):
+    """SELECT status, risk_level, decision, age_bucket, invoices, amount, paid_amount FROM invoices GROUP BY the keys."""
+    keys = [func.coalesce(InvoiceDB.status, NULL_GROUP), func.coalesce(InvoiceDB.risk_level, NULL_GROUP),
+            func.coalesce(InvoiceDB.decision, NULL_GROUP), age_bucket_sql(InvoiceDB.age_days)]
+    query = select(*keys, func.count(), func.coalesce(func.sum(InvoiceDB.amount), 0.0),
+                   func.coalesce(func.sum(InvoiceDB.paid_amount), 0.0)).group_by(*keys)
+    return query.where(whereclause) if whereclause is not None else query
+
+# ON CONFLICT ... DO UPDATE reads the same on SQLite (3.24+) and Postgres (9.5+)
+UPSERT_SUMMARY = text(
+    f"INSERT INTO portfolio_summary ({', '.join(SUMMARY_KEYS)}, invoices, amount, paid_amount) "
+    f"VALUES ({', '.join(':' + k for k in SUMMARY_KEYS)}, :invoices, :amount, :paid_amount) "
+    f"ON CONFLICT ({', '.join(SUMMARY_KEYS)}) DO UPDATE SET invoices = portfolio_summary.invoices + excluded.invoices, "
+    "amount = portfolio_summary.amount + excluded.amount, paid_amount = portfolio_summary.paid_amount + excluded.paid_amount"
+)
+
+def apply_summary_deltas(conn, deltas):
+    """deltas: {(status, risk_level, decision, age_bucket): [invoices, amount, paid_amount]}, upserted."""
+    rows = [dict(zip(SUMMARY_KEYS, key), invoices=invoices, amount=amount, paid_amount=paid)
+            for key, (invoices, amount, paid) in deltas.items() if invoices or amount or paid]
+    if rows:
+        conn.execute(UPSERT_SUMMARY, rows)  # One executemany per flush
+
+def rebuild_portfolio_summary(conn):
+    """Recomputes the whole table from invoices (a Session or a Connection, in its transaction)."""
+    conn.execute(delete(PortfolioSummaryDB))
+    conn.execute(insert(PortfolioSummaryDB).from_select(
+        [*SUMMARY_KEYS, "invoices", "amount", "paid_amount"], summary_aggregate()))
+
+def _summary_values(obj, old):
+    """An invoice's group key and (amount, paid_amount), as committed (old) or as about to be flushed."""
+    state = inspect(obj)
+    values = {}
+    for name in SUMMARY_COLUMNS:
+        if old:
+            history = state.attrs[name].history
+            value = history.deleted[0] if history.deleted else getattr(obj, name)
+        else:
+            value = getattr(obj, name)
+            if value is None and InvoiceDB.__table__.c[name].default is not None:
+                value = InvoiceDB.__table__.c[name].default.arg  # Column default, applied at INSERT
+        values[name] = value
+    key = tuple(NULL_GROUP if values[name] is None else values[name] for name in ("status", "risk_level", "decision"))
+    key += (age_bucket(values["age_days"]),)
+    return key, values["amount"] or 0.0, values["paid_amount"] or 0.0
+
+@event.listens_for(SessionLocal, "before_flush")
+def track_summary_changes(session, flush_context, instances):
+    deltas = {}
+    def add(key, sign, amount, paid):
+        delta = deltas.setdefault(key, [0, 0.0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * amount
+        delta[2] += sign * paid
+    for obj in session.new:
+        if isinstance(obj, InvoiceDB):
+            key, amount, paid = _summary_values(obj, old=False)
+            add(key, 1, amount, paid)
+    for obj in session.deleted:
+        if isinstance(obj, InvoiceDB):
+            key, amount, paid = _summary_values(obj, old=True)
+            add(key, -1, amount, paid)
+    for obj in session.dirty:
+        if isinstance(obj, InvoiceDB) and obj not in session.deleted:
+            state = inspect(obj)
+            if not any(state.attrs[name].history.has_changes() for name in SUMMARY_COLUMNS):
+                continue
+            key, amount, paid = _summary_values(obj, old=True)
+            add(key, -1, amount, paid)
+            key, amount, paid = _summary_values(obj, old=False)
+            add(key, 1, amount, paid)
+    if deltas:
+        apply_summary_deltas(session, deltas)
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def track_summary_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if getattr(getattr(orm_execute_state.statement, "table", None), "name", None) != "invoices":
+        return
+    if orm_execute_state.execution_options.get("portfolio_summary", True) is False:
+        return
+    session = orm_execute_state.session
+    if orm_execute_state.is_delete:
+        # Subtract the rows about to go (same transaction, read before the DELETE runs)
+        rows = session.execute(summary_aggregate(orm_execute_state.statement.whereclause)).all()
+        apply_summary_deltas(session, {tuple(row[:4]): [-row[4], -row[5], -row[6]] for row in rows})
+    else:
+        session.info["rebuild_summary"] = True
+
+@event.listens_for(SessionLocal, "before_commit")
+def rebuild_summary_on_commit(session):
+    if session.info.get("rebuild_summary"):
+        session.flush()
+        rebuild_portfolio_summary(session)
+        session.info.pop("rebuild_summary", None)
+
+# 4. HELPER TO GET DB SESSION
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """For async routes: DB waits yield to the event loop instead of blocking it."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,207 @@
+"""
+In-process pub/sub of case events, streamed to dashboards over SSE (/api/v1/events).
+
+Events are collected from session flushes (every StatusHistoryDB / InteractionLogDB row,
+whichever endpoint or helper wrote it) and published only once the transaction commits.
+Each client has a small bounded buffer: a newer event for a case replaces the one still
+waiting for that client (coalesce), and when a slow client overflows, its oldest events are
+dropped and it gets a "resync" event pointing at /api/v1/cases/changes instead.
+Idle clients cost one sleeping coroutine each, woken only for events and heartbeats.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+
+from sqlalchemy import event
+
+from modules.database import SessionLocal, InteractionLogDB, StatusHistoryDB
+from modules.metrics import Counter, Gauge
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))  # Pending events per client
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))  # Keeps proxies open, detects dead clients
+EVENT_RETRY_MS = 3000  # EventSource reconnect delay
+
+EVENT_CLIENTS = Gauge("recoverai_event_stream_clients", "Connected /api/v1/events clients.")
+EVENTS_PUBLISHED = Counter("recoverai_events_published_total", "Case events published, by type.", ("type",))
+EVENTS_SHED = Counter("recoverai_events_shed_total", "Per-client events coalesced or dropped under backpressure.",
+                      ("action",))
+
+# --- EVENT TYPES ---
+@dataclass(frozen=True)
+class CaseEvent:
+    case_id: str
+    version: int  # Portfolio version of the commit: a cursor for /api/v1/cases/changes
+
+    type = "case"
+
+    def key(self):
+        return (self.type, self.case_id)
+
+    def merge(self, older):
+        """This event replaces `older` (same key) that the client has not received yet."""
+        return self
+
+    def to_sse(self):
+        return f"id: {self.version}\nevent: {self.type}\ndata: {json.dumps(asdict(self))}\n\n"
+
+@dataclass(frozen=True)
+class StatusChanged(CaseEvent):
+    old_status: str
+    new_status: str
+    changed_by: str
+    reason: str
+    auto_updated: bool
+    changed_at: str
+
+    type = "status_changed"
+
+    def merge(self, older):
+        # A -> B then B -> C reaches a lagging client as A -> C
+        return replace(self, old_status=older.old_status)
+
+@dataclass(frozen=True)
+class InteractionLogged(CaseEvent):
+    log_id: int
+    risk_level: str
+    intent: str
+    created_at: str
+
+    type = "interaction_logged"
+
+def format_resync(since):
+    return f"event: resync\ndata: {json.dumps({'since': since})}\n\n"
+
+# --- BUS ---
+class Subscription:
+    """One client's pending events, touched only from its event loop."""
+
+    def __init__(self, loop, maxsize=EVENT_QUEUE_SIZE, resync_since=None):
+        self.loop = loop
+        self.maxsize = maxsize
+        self.pending = OrderedDict()  # key -> event, oldest first
+        self.resync_since = resync_since  # Cursor to catch up from after drops / a reconnect
+        self.wakeup = asyncio.Event()
+        if resync_since is not None:
+            self.wakeup.set()
+
+    def offer(self, case_event):
+        key = case_event.key()
+        older = self.pending.pop(key, None)
+        if older is not None:
+            case_event = case_event.merge(older)
+            EVENTS_SHED.inc(action="coalesced")
+        elif len(self.pending) >= self.maxsize:
+            _, dropped = self.pending.popitem(last=False)
+            since = dropped.version - 1
+            self.resync_since = since if self.resync_since is None else min(self.resync_since, since)
+            EVENTS_SHED.inc(action="dropped")
+        self.pending[key] = case_event
+        self.wakeup.set()
+
+    def drain(self):
+        """Pending events as one SSE chunk (resync first), and empties the buffer."""
+        chunk = "" if self.resync_since is None else format_resync(self.resync_since)
+        chunk += "".join(case_event.to_sse() for case_event in self.pending.values())
+        self.pending.clear()
+        self.resync_since = None
+        self.wakeup.clear()
+        return chunk
+
+class EventBus:
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self, maxsize=EVENT_QUEUE_SIZE, resync_since=None):
+        """Call from the event loop that will consume the subscription."""
+        subscription = Subscription(asyncio.get_running_loop(), maxsize, resync_since)
+        with self.lock:
+            self.subscribers.add(subscription)
+        EVENT_CLIENTS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription not in self.subscribers:
+                return
+            self.subscribers.discard(subscription)
+        EVENT_CLIENTS.dec()
+
+    def publish(self, case_events):
+        """
+        Thread-safe (request handlers run in the threadpool): one callback per event loop
+        hands the whole batch to that loop's subscribers.
+        """
+        for case_event in case_events:
+            EVENTS_PUBLISHED.inc(type=case_event.type)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        by_loop = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(deliver, group, case_events)
+            except RuntimeError:  # Loop already closed (shutdown)
+                for subscription in group:
+                    self.unsubscribe(subscription)
+
+def deliver(subscriptions, case_events):
+    for subscription in subscriptions:
+        for case_event in case_events:
+            subscription.offer(case_event)
+
+bus = EventBus()
+
+async def event_stream(subscription, heartbeat=EVENT_HEARTBEAT_SECONDS):
+    """SSE body for one client; unsubscribes when the client goes away."""
+    try:
+        yield f"retry: {EVENT_RETRY_MS}\n\n"
+        while True:
+            try:
+                async with asyncio.timeout(heartbeat):  # No extra task per wait, unlike wait_for()
+                    await subscription.wakeup.wait()
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield subscription.drain()
+    finally:
+        bus.unsubscribe(subscription)
+
+# --- SESSION HOOKS ---
+def isoformat(value):
+    return value.isoformat() if value else None
+
+def case_event_for(obj, version):
+    case_id = f"C-{obj.invoice_id}"
+    if isinstance(obj, StatusHistoryDB):
+        return StatusChanged(case_id, version, obj.old_status, obj.new_status, obj.changed_by,
+                             obj.reason, bool(obj.auto_updated), isoformat(obj.changed_at))
+    return InteractionLogged(case_id, version, obj.id, obj.risk_level, obj.intent, isoformat(obj.created_at))
+
+@event.listens_for(SessionLocal, "after_flush")
+def collect_case_events(session, flush_context):
+    if not bus.subscribers:
+        return  # Nobody listening: no per-write cost
+    rows = [obj for obj in session.new if isinstance(obj, (StatusHistoryDB, InteractionLogDB))]
+    if rows:
+        version = session.info.get("change_seq", 0)
+        queue_case_events(session, [case_event_for(obj, version) for obj in rows])
+
+def queue_case_events(session, case_events):
+    """Published when the session commits; for writers that bypass the flush (bulk statements)."""
+    session.info.setdefault("case_events", []).extend(case_events)
+
+@event.listens_for(SessionLocal, "after_commit")
+def publish_case_events(session):
+    case_events = session.info.pop("case_events", None)
+    if case_events:
+        bus.publish(case_events)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def discard_case_events(session):
+    session.info.pop("case_events", None)
@@ -1,50 +1,154 @@
 import pandas as pd
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from modules.database import DebtorDB, InvoiceDB, engine
+from modules.database import DebtorDB, InvoiceDB, InteractionLogDB, StatusHistoryDB, engine
+from modules.scoring import SCORE_ON_INGEST, score_invoices
+from modules.metrics import timed
+import asyncio
 import io
+import os
+import logging
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
-def process_csv_upload(file_contents: bytes, db: Session):
+logger = logging.getLogger(__name__)
+
+# Rows are inserted (and optionally scored) in chunks of this size
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+
+# Magic bytes of the supported upload formats
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"  # IPC continuation marker
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def detect_format(file_contents: bytes):
+    """
+    Sniffs the upload format from its leading bytes.
+    Returns: 'parquet' | 'arrow' | 'arrow_stream' | 'csv.gz' | 'csv.zst' | 'csv'
+    """
+    if file_contents.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if file_contents.startswith(ARROW_FILE_MAGIC):
+        return "arrow"
+    if file_contents.startswith(ARROW_STREAM_MAGIC):
+        return "arrow_stream"
+    if file_contents.startswith(GZIP_MAGIC):
+        return "csv.gz"
+    if file_contents.startswith(ZSTD_MAGIC):
+        return "csv.zst"
+    return "csv"
+
+def read_upload(file_contents: bytes):
+    """
+    Loads an ERP export into a DataFrame, whatever the format.
+    Columnar formats are read straight from the upload buffer (no copy, no text parsing).
+    """
+    fmt = detect_format(file_contents)
+
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(file_contents))
+    if fmt == "csv.gz":
+        return pd.read_csv(io.BytesIO(file_contents), compression="gzip")
+
+    if not PYARROW_AVAILABLE:
+        raise ValueError(f"Upload format '{fmt}' requires pyarrow. Install it or upload plain CSV.")
+
+    buffer = pa.BufferReader(file_contents)
+    if fmt == "csv.zst":
+        return pd.read_csv(pa.CompressedInputStream(buffer, "zstd"))
+    if fmt == "parquet":
+        table = pq.read_table(buffer)
+    elif fmt == "arrow":
+        table = pa.ipc.open_file(buffer).read_all()
+    else:
+        table = pa.ipc.open_stream(buffer).read_all()
+    return table.to_pandas()
+
+def purge_sample_data(db: Session):
     """
-    Reads a FedEx CSV export and ingests it into Cloud SQL.
+    Deletes every sample debtor (is_sample=1) with its invoices, logs and status history.
+    Set-based: one DELETE ... WHERE ... IN (SELECT ...) per table, whatever the sample size.
+    Returns: { 'debtors': int, 'invoices': int }
+    """
+    sample_debtor_ids = select(DebtorDB.id).where(DebtorDB.is_sample == 1)
+    sample_invoice_ids = select(InvoiceDB.id).where(InvoiceDB.debtor_id.in_(sample_debtor_ids))
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for debtor_id, name in db.execute(select(DebtorDB.id, DebtorDB.name).where(DebtorDB.is_sample == 1)):
+            logger.debug("Removing sample debtor %s (ID: %s)", name, debtor_id)
+
+    # Children first so Postgres foreign keys stay satisfied
+    db.execute(delete(InteractionLogDB).where(InteractionLogDB.invoice_id.in_(sample_invoice_ids)))
+    db.execute(delete(StatusHistoryDB).where(StatusHistoryDB.invoice_id.in_(sample_invoice_ids)))
+    invoices = db.execute(delete(InvoiceDB).where(InvoiceDB.debtor_id.in_(sample_debtor_ids))).rowcount
+    debtors = db.execute(delete(DebtorDB).where(DebtorDB.is_sample == 1)).rowcount
+    db.commit()
+    return {"debtors": debtors, "invoices": invoices}
+
+@timed("ingestion.process_csv_upload")
+def process_csv_upload(file_contents: bytes, db: Session, score_on_ingest: bool = None):
+    """
+    Reads a FedEx ERP export and ingests it into Cloud SQL.
+    Accepts CSV (plain, gzip or zstd), Parquet and Arrow IPC; see detect_format.
     Expected Columns: 'company_name', 'amount', 'age_days', 'credit_score', 'phone'
+    score_on_ingest: score each inserted chunk in bulk (defaults to SCORE_ON_INGEST).
     """
     try:
-        # Load CSV into Pandas DataFrame
-        df = pd.read_csv(io.BytesIO(file_contents))
-        
-        # Standardize Columns (Lowercase, strip spaces)
-        df.columns = [c.lower().strip() for c in df.columns]
-        
-        # AUTO-CLEANUP: Remove ONLY sample data (is_sample=1) when real data is uploaded
-        # SAFETY: Real data (is_sample=0) is NEVER deleted by this logic
-        print("[*] Checking for sample data to remove...")
-        sample_debtors = db.query(DebtorDB).filter(DebtorDB.is_sample == 1).all()
-        
-        if len(sample_debtors) > 0:
-            print(f"[CLEANUP] Found {len(sample_debtors)} sample debtors (is_sample=1):")
-            for sample_debtor in sample_debtors:
-                print(f"  - Removing: {sample_debtor.name} (ID: {sample_debtor.id}, is_sample: {sample_debtor.is_sample})")
-                # Delete all invoices for this sample debtor
-                invoice_count = db.query(InvoiceDB).filter(InvoiceDB.debtor_id == sample_debtor.id).count()
-                db.query(InvoiceDB).filter(InvoiceDB.debtor_id == sample_debtor.id).delete()
-                # Delete the sample debtor
-                db.delete(sample_debtor)
-                print(f"    -> Deleted {invoice_count} invoice(s)")
-            db.commit()
-            print(f"[OK] Sample data cleanup complete")
-        else:
-            print("[OK] No sample data found (all existing data is real)")
-        
-        results = {"total": 0, "inserted": 0, "errors": []}
-        results["total"] = len(df)
-        
-        for index, row in df.iterrows():
+        # Load the export (any supported format) into Pandas DataFrame
+        return ingest_dataframe(db, read_upload(file_contents), score_on_ingest)
+    except Exception as e:
+        return {"error": str(e)}
+
+@timed("ingestion.process_csv_upload", source="async")
+async def process_csv_upload_async(file_contents: bytes, db: AsyncSession, score_on_ingest: bool = None):
+    """
+    process_csv_upload for async routes: parsing runs in a worker thread and the inserts
+    go through the async session, so neither blocks the event loop.
+    """
+    try:
+        df = await asyncio.to_thread(read_upload, file_contents)
+        return await db.run_sync(ingest_dataframe, df, score_on_ingest)
+    except Exception as e:
+        return {"error": str(e)}
+
+def ingest_dataframe(db: Session, df, score_on_ingest: bool = None):
+    """
+    Inserts the rows of a parsed export (see process_csv_upload).
+    Raises on failure; row-level problems are reported in results["errors"].
+    """
+    if score_on_ingest is None:
+        score_on_ingest = SCORE_ON_INGEST
+
+    # Standardize Columns (Lowercase, strip spaces)
+    df.columns = [c.lower().strip() for c in df.columns]
+    
+    # AUTO-CLEANUP: Remove ONLY sample data (is_sample=1) when real data is uploaded
+    # SAFETY: Real data (is_sample=0) is NEVER deleted by this logic
+    purged = purge_sample_data(db)
+    if purged["debtors"]:
+        print(f"[CLEANUP] Removed {purged['debtors']} sample debtor(s) and {purged['invoices']} invoice(s)")
+    
+    results = {"total": 0, "inserted": 0, "scored": 0, "errors": []}
+    results["total"] = len(df)
+    
+    for start in range(0, len(df), INGEST_CHUNK_SIZE):
+        chunk = df.iloc[start:start + INGEST_CHUNK_SIZE]
+        new_invoices, initial_scores = [], []
+
+        for index, row in chunk.iterrows():
             try:
                 # 1. Get or Create/Update Debtor
                 debtor_name = str(row.get("company_name", "Unknown")).strip()
                 credit_score = float(row.get("credit_score", 0.5))
                 phone = str(row.get("phone", "")).strip()
-                
+            
                 debtor = db.query(DebtorDB).filter(DebtorDB.name == debtor_name).first()
                 if not debtor:
                     debtor = DebtorDB(name=debtor_name, credit_score=credit_score, phone=phone, is_sample=0)
@@ -57,17 +161,17 @@ def process_csv_upload(file_contents: bytes, db: Session):
                         debtor.credit_score = credit_score
                         if phone: debtor.phone = phone
                         db.commit()
-                
+            
                 # 2. Check for Duplicate Invoice (Avoid double-billing)
                 amount = float(row.get("amount", 0))
                 age_days = int(row.get("age_days", 0))
-                
+            
                 existing_invoice = db.query(InvoiceDB).filter(
                     InvoiceDB.debtor_id == debtor.id,
                     InvoiceDB.amount == amount,
                     InvoiceDB.status != "CLOSED" # Allow re-ingesting if closed? No, usually not.
                 ).first()
-                
+            
                 if not existing_invoice:
                     new_invoice = InvoiceDB(
                         debtor_id=debtor.id,
@@ -78,17 +182,21 @@ def process_csv_upload(file_contents: bytes, db: Session):
                         status="PENDING"
                     )
                     db.add(new_invoice)
+                    new_invoices.append(new_invoice)
+                    initial_scores.append(debtor.credit_score)
                     results["inserted"] += 1
                 else:
                     results["errors"].append(f"Row {index}: Duplicate invoice for {debtor_name} rejected.")
-                
+            
             except Exception as row_err:
                 print(f"Row {index} Error: {row_err}")
                 results["errors"].append(f"Row {index}: {str(row_err)}")
                 db.rollback()
-        
+
+        # SCORE-ON-INGEST: one vectorized RISKON + Allocation pass per chunk
+        if score_on_ingest:
+            results["scored"] += score_invoices(new_invoices, initial_scores)
         db.commit()
-        return results
-        
-    except Exception as e:
-        return {"error": str(e)}
+
+    return results
+
@@ -0,0 +1,234 @@
+"""
+Versioned schema migrations.
+
+create_all() only creates missing tables; everything that changes an existing table is a
+script in migrations/ named NNNN_description.py with an upgrade(op) function. Applied
+versions are recorded in schema_migrations. Scripts must be safe to re-run: the Operations
+helpers skip work that is already done, and backfills resume from their last committed batch,
+so an interrupted upgrade is finished by running it again.
+
+    python migrate.py status | upgrade [--to N] | stamp [N] | new "description"
+"""
+
+import importlib.util
+import os
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+from modules.database import engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+# Backfills: rows per transaction, and a pause between batches so live traffic keeps its share
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+MIGRATION_BATCH_SLEEP_MS = float(os.getenv("MIGRATION_BATCH_SLEEP_MS", "20"))
+# Postgres DDL gives up instead of queueing every query behind a long transaction (then re-run)
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "5000"))
+ADVISORY_LOCK_ID = 7_305_004_521  # Postgres: one runner at a time across app instances
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+migration_progress = Table(
+    "migration_progress", metadata,
+    Column("key", String, primary_key=True),  # "<version>:<backfill name>"
+    Column("position", Integer, nullable=False),  # Backfilled up to (excluding) this id
+)
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: str
+
+    def load(self):
+        spec = importlib.util.spec_from_file_location(f"migration_{self.version:04d}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+def discover(directory=None):
+    """Migration scripts in version order."""
+    directory = directory or MIGRATIONS_DIR
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = re.fullmatch(r"(\d{4})_(\w+)\.py", filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+# --- OPERATIONS ---
+class Operations:
+    """What a migration script's upgrade(op) works with."""
+
+    def __init__(self, bind, version, batch_size=None, sleep_ms=None, log=print):
+        self.bind = bind
+        self.dialect = bind.dialect.name
+        self.version = version
+        self.batch_size = batch_size or MIGRATION_BATCH_SIZE
+        self.sleep_ms = MIGRATION_BATCH_SLEEP_MS if sleep_ms is None else sleep_ms
+        self.log = log
+
+    def has_column(self, table, column):
+        return column in {c["name"] for c in inspect(self.bind).get_columns(table)}
+
+    def has_index(self, table, index):
+        return index in {i["name"] for i in inspect(self.bind).get_indexes(table)}
+
+    def column_type(self, table, column):
+        return next(c["type"] for c in inspect(self.bind).get_columns(table) if c["name"] == column)
+
+    @contextmanager
+    def transaction(self):
+        with self.bind.begin() as conn:
+            if self.dialect == "postgresql":
+                conn.execute(text(f"SET LOCAL lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}"))
+            yield conn
+
+    def execute(self, sql, **params):
+        """One statement in its own transaction."""
+        with self.transaction() as conn:
+            return conn.execute(text(sql), params)
+
+    def add_column(self, table, column, type_sql, default=None):
+        if self.has_column(table, column):
+            return
+        # A constant default is metadata-only on Postgres 11+ and SQLite (no table rewrite)
+        self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {type_sql}" + (f" DEFAULT {default}" if default is not None else ""))
+
+    def create_index(self, name, table, columns, unique=False):
+        """CREATE INDEX CONCURRENTLY on Postgres: writes to the table continue during the build."""
+        unique = "UNIQUE " if unique else ""
+        if self.dialect != "postgresql":
+            self.execute(f"CREATE {unique}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+            return
+        with self.bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # An interrupted concurrent build leaves an INVALID index behind: rebuild it
+            invalid = conn.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"), {"name": name}).first()
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            conn.execute(text(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+    def backfill(self, name, table, update_sql, **params):
+        """
+        Runs update_sql (an UPDATE whose WHERE bounds id by :low and :high) over the table in
+        id ranges of batch_size, one transaction each, sleeping sleep_ms between batches.
+        The position commits with each batch, so a re-run resumes where the last one stopped.
+        """
+        key = f"{self.version}:{name}"
+        with self.bind.begin() as conn:
+            position = conn.execute(select(migration_progress.c.position).where(migration_progress.c.key == key)).scalar()
+            if position is None:
+                position = conn.execute(text(f"SELECT MIN(id) FROM {table}")).scalar() or 1
+                conn.execute(migration_progress.insert().values(key=key, position=position))
+            last = conn.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0
+        rows, started = 0, time.perf_counter()
+        while position <= last:
+            high = position + self.batch_size
+            with self.bind.begin() as conn:
+                rows += conn.execute(text(update_sql), {**params, "low": position, "high": high}).rowcount or 0
+                conn.execute(migration_progress.update().where(migration_progress.c.key == key).values(position=high))
+            position = high
+            if self.sleep_ms and position <= last:
+                time.sleep(self.sleep_ms / 1000)
+        self.log(f"  backfill {name}: {rows:,} rows updated in {time.perf_counter() - started:.1f}s")
+        return rows
+
+# --- RUNNER ---
+def applied_versions(bind):
+    metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        return {row.version: row for row in conn.execute(select(schema_migrations))}
+
+def pending(bind=None, directory=None):
+    bind = bind or engine
+    applied = applied_versions(bind)
+    return [m for m in discover(directory) if m.version not in applied]
+
+def record(bind, migration):
+    with bind.begin() as conn:
+        conn.execute(schema_migrations.insert().values(version=migration.version, name=migration.name,
+                                                       applied_at=datetime.utcnow()))
+        conn.execute(migration_progress.delete().where(migration_progress.c.key.startswith(f"{migration.version}:")))
+
+def stamp(bind=None, to=None, directory=None):
+    """Records migrations as applied without running them (a schema created from the current models)."""
+    bind = bind or engine
+    for migration in pending(bind, directory):
+        if to is None or migration.version <= to:
+            record(bind, migration)
+
+def upgrade(bind=None, to=None, directory=None, batch_size=None, sleep_ms=None, log=print):
+    """Runs the pending migrations (up to version `to`) in order; returns the versions applied."""
+    bind = bind or engine
+    with advisory_lock(bind):
+        done = []
+        for migration in pending(bind, directory):
+            if to is not None and migration.version > to:
+                break
+            log(f"Migrating {migration.version:04d}_{migration.name}")
+            started = time.perf_counter()
+            migration.load().upgrade(Operations(bind, migration.version, batch_size, sleep_ms, log))
+            record(bind, migration)
+            log(f"  done in {time.perf_counter() - started:.1f}s")
+            done.append(migration.version)
+        return done
+
+@contextmanager
+def advisory_lock(bind):
+    """Postgres session-level advisory lock around an upgrade (a no-op elsewhere)."""
+    if bind.dialect.name != "postgresql":
+        yield
+        return
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+
+def status(bind=None, directory=None):
+    """(version, name, applied_at or None, {backfill: position}) per migration."""
+    bind = bind or engine
+    applied = applied_versions(bind)
+    with bind.connect() as conn:
+        progress = conn.execute(select(migration_progress)).all()
+    rows = []
+    for migration in discover(directory):
+        backfills = {key.split(":", 1)[1]: position for key, position in progress
+                     if key.startswith(f"{migration.version}:")}
+        row = applied.get(migration.version)
+        rows.append((migration.version, migration.name, row.applied_at if row else None, backfills))
+    return rows
+
+TEMPLATE = '''"""
+{description}
+"""
+
+def upgrade(op):
+    pass
+'''
+
+def new(description, directory=None):
+    """Writes the next NNNN_description.py script; returns its path."""
+    directory = directory or MIGRATIONS_DIR
+    version = max((m.version for m in discover(directory)), default=0) + 1
+    slug = re.sub(r"\W+", "_", description.lower()).strip("_")
+    path = os.path.join(directory, f"{version:04d}_{slug}.py")
+    with open(path, "w") as out:
+        out.write(TEMPLATE.format(description=description))
+    return path
@@ -1,21 +1,32 @@
-try:
-    import stripe
-    STRIPE_AVAILABLE = True
-except ImportError:
-    STRIPE_AVAILABLE = False
-    print("Warning: Stripe SDK not found. Payment features will be disabled.")
 import os
 
-# Configure Stripe
-if STRIPE_AVAILABLE:
-    stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+from modules.metrics import HOT_PATH
+
+# Stripe is imported on first payment, not at app import (cold-start time)
+stripe = None
+STRIPE_AVAILABLE = None  # None = not probed yet
+
+def load_stripe():
+    """
+    Imports and configures the Stripe SDK once. Returns the module, or None when it is not installed.
+    """
+    global stripe, STRIPE_AVAILABLE
+    if STRIPE_AVAILABLE is None:
+        try:
+            import stripe
+            stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+            STRIPE_AVAILABLE = True
+        except ImportError:
+            STRIPE_AVAILABLE = False
+            print("Warning: Stripe SDK not found. Payment features will be disabled.")
+    return stripe if STRIPE_AVAILABLE else None
 
 def create_payment_link(case_id: str, amount: float, partial_amount: float = None, currency: str = "inr"):
     """
     Generates a Stripe Checkout Session URL for a specific debt case.
     """
     try:
-        if not STRIPE_AVAILABLE:
+        if not load_stripe():
             return {"error": "Stripe SDK not found. Install it to enable payments."}
             
         if not stripe.api_key:
@@ -26,26 +37,27 @@ def create_payment_link(case_id: str, amount: float, partial_amount: float = Non
         # Determine the amount to charge
         charge_amount = partial_amount if partial_amount is not None else amount
 
-        session = stripe.checkout.Session.create(
-            payment_method_types=['card'],
-            line_items=[{
-                'price_data': {
-                    'currency': currency,
-                    'product_data': {
-                        'name': f'Debt Settlement - Case {case_id}',
+        with HOT_PATH.time(operation="stripe.checkout_session_create", source="stripe"):
+            session = stripe.checkout.Session.create(
+                payment_method_types=['card'],
+                line_items=[{
+                    'price_data': {
+                        'currency': currency,
+                        'product_data': {
+                            'name': f'Debt Settlement - Case {case_id}',
+                        },
+                        'unit_amount': int(charge_amount * 100), # Stripe expects cents
                     },
-                    'unit_amount': int(charge_amount * 100), # Stripe expects cents
-                },
-                'quantity': 1,
-            }],
-            mode='payment',
-            success_url=f"{domain_url}/api/v1/payment/success?case_id={case_id}&amount_paid={charge_amount}",
-            cancel_url=domain_url + '?payment=cancelled',
-            metadata={
-                "case_id": case_id,
-                "amount_paid": str(charge_amount)
-            }
-        )
+                    'quantity': 1,
+                }],
+                mode='payment',
+                success_url=f"{domain_url}/api/v1/payment/success?case_id={case_id}&amount_paid={charge_amount}",
+                cancel_url=domain_url + '?payment=cancelled',
+                metadata={
+                    "case_id": case_id,
+                    "amount_paid": str(charge_amount)
+                }
+            )
         return {"payment_url": session.url}
     except Exception as e:
         print(f"Stripe Error: {e}")
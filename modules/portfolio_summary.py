@@ -0,0 +1,102 @@
+"""
+Portfolio KPIs from the portfolio_summary table (maintained by the session hooks in
+modules/database.py, section 3b), and the reconciliation job that repairs drift.
+
+Drift should not happen through the ORM; it can through writes that bypass it (manual SQL,
+a restored dump, float rounding over millions of deltas). reconcile() recomputes the
+aggregate from invoices and rewrites only the groups that differ, holding the portfolio
+version row lock so no invoice write commits in between.
+"""
+
+import os
+import threading
+
+from sqlalchemy import select, update, delete
+
+from modules import metrics
+from modules.database import (
+    engine, PortfolioStateDB, PortfolioSummaryDB, SUMMARY_KEYS, AGE_BUCKETS, OLDEST_AGE_BUCKET,
+    summary_aggregate, apply_summary_deltas,
+)
+
+SUMMARY_RECONCILE_SECONDS = float(os.getenv("SUMMARY_RECONCILE_SECONDS", "3600"))  # 0 = off
+SUMMARY_TOLERANCE = 0.005  # Balances are floats; smaller differences are rounding, not drift
+
+SUMMARY_DRIFT = metrics.Counter("recoverai_portfolio_summary_drift_total",
+                                "Portfolio summary groups repaired by reconciliation.")
+
+DIMENSIONS = {"status": "by_status", "risk_level": "by_risk_level", "decision": "by_decision", "age_bucket": "by_age_bucket"}
+
+def totals(invoices=0, amount=0.0, paid=0.0):
+    return {"invoices": invoices, "amount": round(amount, 2), "paid": round(paid, 2), "outstanding": round(amount - paid, 2)}
+
+def summarize(rows):
+    """Summary rows -> totals plus a breakdown per dimension (each with the same totals shape)."""
+    sums = {dimension: {} for dimension in DIMENSIONS}
+    overall = [0, 0.0, 0.0]
+    for row in rows:
+        if not row.invoices:
+            continue
+        for target in [overall] + [sums[d].setdefault(getattr(row, d), [0, 0.0, 0.0]) for d in DIMENSIONS]:
+            target[0] += row.invoices
+            target[1] += row.amount
+            target[2] += row.paid_amount
+    result = {"totals": totals(*overall)}
+    for dimension, key in DIMENSIONS.items():
+        groups = sums[dimension]
+        if dimension == "age_bucket":
+            order = [label for _, label in AGE_BUCKETS] + [OLDEST_AGE_BUCKET]
+            names = [label for label in order if label in groups]
+        else:
+            names = sorted(groups)
+        result[key] = {name: totals(*groups[name]) for name in names}
+    return result
+
+def read_summary(db):
+    return summarize(db.execute(select(PortfolioSummaryDB)).scalars())
+
+def reconcile(bind=None):
+    """Repairs the summary from invoices; returns the keys of the groups that had drifted."""
+    bind = bind or engine
+    with bind.begin() as conn:
+        # Same row lock as every invoice write (a no-op UPDATE also starts a SQLite write transaction)
+        conn.execute(update(PortfolioStateDB).where(PortfolioStateDB.id == 1).values(version=PortfolioStateDB.version))
+        actual = {tuple(row[:4]): row[4:] for row in conn.execute(summary_aggregate())}
+        stored = {tuple(getattr(row, k) for k in SUMMARY_KEYS): (row.invoices, row.amount, row.paid_amount)
+                  for row in conn.execute(select(PortfolioSummaryDB))}
+        deltas = {}
+        for key in actual.keys() | stored.keys():
+            want = actual.get(key, (0, 0.0, 0.0))
+            have = stored.get(key, (0, 0.0, 0.0))
+            if want[0] != have[0] or any(abs(w - h) > SUMMARY_TOLERANCE for w, h in zip(want[1:], have[1:])):
+                deltas[key] = [w - h for w, h in zip(want, have)]
+        apply_summary_deltas(conn, deltas)
+        # Empty groups (every invoice moved on) are dropped
+        conn.execute(delete(PortfolioSummaryDB).where(PortfolioSummaryDB.invoices == 0))
+    if deltas:
+        SUMMARY_DRIFT.inc(len(deltas))
+        print(f"[SUMMARY] Reconciled {len(deltas)} drifted portfolio summary group(s)")
+    return sorted(deltas)
+
+class ReconcileJob:
+    """Runs reconcile() every interval seconds in a daemon thread until stop()."""
+
+    def __init__(self, interval=SUMMARY_RECONCILE_SECONDS):
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="summary-reconcile", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                reconcile()
+            except Exception as e:
+                print(f"[SUMMARY] Reconciliation failed: {e}")
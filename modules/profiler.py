@@ -0,0 +1,208 @@
+"""
+Opt-in per-request profiler.
+A request is captured when an admin sends `X-Profile: 1` (with their bearer token) or
+when it is picked by PROFILE_SAMPLE_RATE. Capture is a statistical stack sampler: a
+background thread snapshots every thread's stack each PROFILE_INTERVAL_MS, so sync
+routes running in the threadpool are covered too (cProfile only sees its own thread).
+While other threads hold the GIL, samples land at most every sys.getswitchinterval()
+(5 ms by default), so short requests yield few samples: profile slow ones.
+Stacks are written in "folded" format (flamegraph.pl, speedscope) to a bounded
+on-disk ring buffer of the last PROFILE_KEEP captures.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+from modules.security import ADMIN_USERS, decode_username
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "recoverai-profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_HEADER = b"x-profile"
+
+# Leaf frames of threads that are parked, not working (idle workers, the event loop's select)
+IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get"), ("threading.py", "_wait_for_tstate_lock")}
+
+PROFILE_ID = re.compile(r"^\d{13}-[0-9a-f]{8}$")
+
+def frame_label(code, cache={}):
+    label = cache.get(code)
+    if label is None:
+        label = cache[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+class StackSampler:
+    """Samples the stacks of every other thread until stop()."""
+
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        return self
+
+    def run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.stopped.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names.update((t.ident, t.name) for t in threading.enumerate())
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit=10):
+        """Self-time leaders: (leaf frame, samples)."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+class ProfileStore:
+    """Ring buffer of captures on disk: <id>.folded (stacks) + <id>.json (metadata)."""
+
+    def __init__(self, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self.lock = threading.Lock()
+
+    def new_id(self):
+        # Millisecond timestamp first, so ids sort by capture time
+        return f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id, meta, folded):
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f"{profile_id}.folded"), "w") as f:
+                f.write(folded)
+            with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+                json.dump(dict(meta, id=profile_id), f)
+            for old in self.ids()[self.keep:]:
+                for ext in (".json", ".folded"):
+                    try:
+                        os.remove(os.path.join(self.directory, old + ext))
+                    except FileNotFoundError:
+                        pass
+
+    def ids(self):
+        """Stored profile ids, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted((name[:-5] for name in os.listdir(self.directory)
+                       if name.endswith(".json") and PROFILE_ID.match(name[:-5])), reverse=True)
+
+    def list(self, limit=20):
+        entries = []
+        for profile_id in self.ids()[:limit]:
+            try:
+                with open(os.path.join(self.directory, f"{profile_id}.json")) as f:
+                    entries.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue  # Evicted or half-written
+        return entries
+
+    def path(self, profile_id):
+        """Path of the folded stacks, or None for unknown / malformed ids."""
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        return path if os.path.exists(path) else None
+
+store = ProfileStore()
+
+# One capture at a time keeps the overhead bounded under load
+capture_lock = threading.Lock()
+
+def requested_by_admin(scope):
+    headers = dict(scope.get("headers") or [])
+    if headers.get(PROFILE_HEADER, b"").lower() not in (b"1", b"true", b"yes"):
+        return False
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    if not auth.lower().startswith("bearer "):
+        return False
+    return decode_username(auth[7:].strip()) in ADMIN_USERS
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware. Profiled responses carry an X-Profile-Id header with the
+    id to download from /api/v1/admin/profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if requested_by_admin(scope):
+            trigger = "header"
+        elif PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            trigger = "sample"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        if not capture_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = store.new_id()
+        status = {"code": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())])
+            await send(message)
+
+        started = time.perf_counter()
+        sampler = StackSampler().start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            capture_lock.release()
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+                "trigger": trigger,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "samples": sampler.samples,
+                "top_functions": sampler.top_functions(),
+            }
+            store.save(profile_id, meta, sampler.folded())
@@ -0,0 +1,149 @@
+"""
+SQL instrumentation via SQLAlchemy cursor events:
+  - per-request query count and DB time (X-DB-Query-Count / X-DB-Time-Ms headers when DEBUG=true)
+  - slow-query log (statements above SLOW_QUERY_MS, logged with the shape of their parameters, never the values)
+  - count_queries(), used by the tests to put a query budget on each endpoint
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from modules.database import async_engine, engine
+from modules.metrics import HOT_PATH_BUCKETS, Histogram
+
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+slow_query_logger = logging.getLogger("recoverai.sql.slow")
+
+DB_QUERY_TIME = Histogram("recoverai_db_query_duration_seconds", "SQL statement latency by statement type.",
+                          ("statement",), buckets=HOT_PATH_BUCKETS)
+
+class QueryStats:
+    def __init__(self, record_statements=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if record_statements else None
+
+    def add(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        if self.statements is not None:
+            self.statements.append(statement)
+
+# Stats of the request being served (set by QueryStatsMiddleware, inherited by threadpool workers)
+current_request = contextvars.ContextVar("current_request_query_stats", default=None)
+
+# Process-wide collectors opened by count_queries()
+collectors = []
+collectors_lock = threading.Lock()
+
+def statement_type(statement):
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+def parameter_shape(parameters, executemany=False):
+    """
+    Types of the bound parameters, e.g. "(int x 3, str)" or "{name: str, amount: float}";
+    executemany batches become "500 x (...)". Values are never included.
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {parameter_shape(rows[0])}" if rows else "0 x ()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        runs = []
+        for value in parameters:
+            name = type(value).__name__
+            if runs and runs[-1][0] == name:
+                runs[-1][1] += 1
+            else:
+                runs.append([name, 1])
+        return "(" + ", ".join(name if n == 1 else f"{name} x {n}" for name, n in runs) + ")"
+    return type(parameters).__name__
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    DB_QUERY_TIME.observe(elapsed, statement=statement_type(statement))
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+    if collectors:
+        with collectors_lock:
+            for collector in collectors:
+                collector.add(statement, elapsed)
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_query_logger.warning("Slow query (%.1f ms, params %s): %s",
+                                  elapsed * 1000, parameter_shape(parameters, executemany), statement[:2000])
+
+def handle_error(exception_context):
+    # after_cursor_execute does not run for failed statements; drop their start time
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+def instrument(bind):
+    """Attaches the hooks to an engine (idempotent)."""
+    if not event.contains(bind, "before_cursor_execute", before_cursor_execute):
+        event.listen(bind, "before_cursor_execute", before_cursor_execute)
+        event.listen(bind, "after_cursor_execute", after_cursor_execute)
+        event.listen(bind, "handle_error", handle_error)
+
+instrument(engine)
+instrument(async_engine.sync_engine)
+
+@contextmanager
+def count_queries():
+    """
+    Counts every statement run anywhere in the process inside the block.
+    Yields QueryStats (with .statements) for assertions.
+    """
+    stats = QueryStats(record_statements=True)
+    with collectors_lock:
+        collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with collectors_lock:
+            collectors.remove(stats)
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware: collects the queries of each request and, in DEBUG mode,
+    reports them as X-DB-Query-Count / X-DB-Time-Ms response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_request.set(stats)
+
+        async def send_with_headers(message):
+            if DEBUG and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_request.reset(token)
@@ -0,0 +1,77 @@
+"""
+Conditional GET support: ETags derived from the portfolio version, and a bounded
+in-memory cache of serialized response bodies keyed by (version, query).
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from modules.metrics import CACHE_LOOKUPS
+
+CASE_CACHE_ENTRIES = int(os.getenv("CASE_CACHE_ENTRIES", "16"))
+CASE_CACHE_MAX_MB = float(os.getenv("CASE_CACHE_MAX_MB", "64"))
+
+def normalized_query(query_params):
+    """Query string with parameters sorted, so ?a=1&b=2 and ?b=2&a=1 share a cache entry."""
+    return urlencode(sorted(query_params.multi_items()))
+
+def make_etag(version, query):
+    digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f'"v{version}-{digest}"'
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison (RFC 9110): W/"x" matches "x"
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+class PageCache:
+    """
+    LRU of response bodies per (version, query), bounded by entry count and total bytes.
+    Entries of older versions are dropped as soon as a newer version is cached,
+    since lookups always use the current version.
+    """
+
+    def __init__(self, name, max_entries=CASE_CACHE_ENTRIES, max_bytes=int(CASE_CACHE_MAX_MB * 1024 * 1024)):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.latest = -1
+        self.lock = threading.Lock()
+
+    def get(self, version, query):
+        with self.lock:
+            body = self.entries.get((version, query))
+            if body is not None:
+                self.entries.move_to_end((version, query))
+        CACHE_LOOKUPS.inc(cache=self.name, result="hit" if body is not None else "miss")
+        return body
+
+    def put(self, version, query, body):
+        with self.lock:
+            if version < self.latest or len(body) > self.max_bytes:
+                return  # A newer version is already cached, or the page is too big to keep
+            if version > self.latest:
+                self.latest = version
+                for key in [key for key in self.entries if key[0] < version]:
+                    self.size -= len(self.entries.pop(key))
+            previous = self.entries.pop((version, query), None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[(version, query)] = body
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.latest = -1
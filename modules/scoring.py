@@ -0,0 +1,33 @@
+import os
+from modules.riskon_engine.model import RiskonODE
+from modules.allocation_core.agent import AllocationAgent
+
+# SCORE-ON-INGEST: When enabled, new invoices are scored right after insert
+# (ingest + manual create) instead of waiting for a /api/v1/analyze call per case.
+SCORE_ON_INGEST = os.getenv("SCORE_ON_INGEST", "false").lower() in ("1", "true", "yes")
+
+# Same tuning as the API engines in main.py
+risk_engine = RiskonODE(decay_rate=0.03, boost_factor=0.15)
+allocation_agent = AllocationAgent(risk_engine)
+
+def score_invoices(invoices, initial_scores):
+    """
+    Scores a chunk of freshly inserted invoices in one vectorized pass.
+    invoices: InvoiceDB rows, initial_scores: matching debtor credit scores.
+    New invoices have no interaction history yet, so only decay applies.
+    Returns the number of invoices scored.
+    """
+    if not invoices:
+        return 0
+
+    initial_scores = [0.5 if score is None else score for score in initial_scores]
+    p_scores = risk_engine.predict_probability_batch(
+        initial_scores,
+        [inv.age_days or 0 for inv in invoices]
+    )
+    decisions = allocation_agent.allocate_batch(p_scores)
+
+    for invoice, p_score, decision in zip(invoices, p_scores, decisions):
+        invoice.p_score = float(p_score)
+        invoice.decision = str(decision)
+    return len(invoices)
@@ -11,10 +11,14 @@ SECRET_KEY = os.getenv("SECRET_KEY", "INSECURE-dev-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Users allowed to use admin-only tooling (e.g. request profiles), comma-separated
+ADMIN_USERS = {u.strip() for u in os.getenv("ADMIN_USERS", "admin").split(",") if u.strip()}
+
 # Password Hashing
 # Switched to pbkdf2_sha256 to avoid passlib/bcrypt 4.0 incompatibility
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -46,3 +50,23 @@ async def verify_token(token: str = Depends(oauth2_scheme)):
         return username
     except JWTError:
         raise credentials_exception
+
+async def verify_stream_token(token: Optional[str] = Depends(optional_oauth2_scheme), access_token: Optional[str] = None):
+    """
+    verify_token that also accepts ?access_token=, since browser EventSource cannot send headers.
+    """
+    return await verify_token(token or access_token or "")
+
+def decode_username(token: str) -> Optional[str]:
+    """
+    Username of a valid token, else None. For middleware, which cannot raise 401s.
+    """
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+async def verify_admin(username: str = Depends(verify_token)):
+    if username not in ADMIN_USERS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return username
@@ -1,28 +1,34 @@
+import asyncio
 import json
 import os
-try:
-    import vertexai
-    from vertexai.generative_models import GenerativeModel, Part
-    VERTEX_AVAILABLE = True
-except ImportError:
-    VERTEX_AVAILABLE = False
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from modules.metrics import HOT_PATH, LLM_FALLBACKS, timed
+
+# Optional SDKs are imported on first use (see Sentinel.model / Sentinel.analyzer)
+# so that constructing a Sentinel costs nothing on a cold start.
+vertexai = None
+VERTEX_AVAILABLE = None  # None = not probed yet
+
+def load_vertex():
+    """
+    Imports the Vertex AI SDK once. Returns the module, or None when it is not installed.
+    """
+    global VERTEX_AVAILABLE, vertexai
+    if VERTEX_AVAILABLE is None:
+        try:
+            import vertexai
+            import vertexai.generative_models
+            VERTEX_AVAILABLE = True
+        except ImportError:
+            VERTEX_AVAILABLE = False
+    return vertexai if VERTEX_AVAILABLE else None
 
 class Sentinel:
     def __init__(self):
-        self.analyzer = SentimentIntensityAnalyzer()
         self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT") # Auto-set on Cloud Run
-        self.model = None
-        
-        # Initialize Vertex AI if possible
-        if VERTEX_AVAILABLE and self.project_id:
-            try:
-                vertexai.init(project=self.project_id, location="us-central1")
-                self.model = GenerativeModel("gemini-2.5-flash")
-                print("Sentinel: Vertex AI Gemini Pro Initialized.")
-            except Exception as e:
-                print(f"Sentinel: Vertex AI Init Failed ({e}). Using VADER fallback.")
+        self._analyzer = None
+        self._model = None
+        self._model_loaded = False
 
         # Load banned keywords (Simulated hard-coded list for Phase 1)
         self.banned_words = [
@@ -32,12 +38,71 @@ class Sentinel:
             "ruin your credit"                     # Specific FDCPA violations
         ]
 
+    @property
+    def analyzer(self):
+        """VADER, loaded on first use (reading its lexicon is the slow part)."""
+        if self._analyzer is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
+
+    @property
+    def model(self):
+        """
+        Gemini model, initialized on first use. None when Vertex AI is not
+        installed, no project is configured, or init failed (VADER fallback).
+        """
+        if not self._model_loaded:
+            self._model_loaded = True
+            self._model = self.init_model()
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self._model_loaded = True
+
+    def init_model(self):
+        # Initialize Vertex AI if possible
+        vertex = load_vertex()
+        if not (vertex and self.project_id):
+            return None
+        try:
+            vertex.init(project=self.project_id, location="us-central1")
+            model = vertex.generative_models.GenerativeModel("gemini-2.5-flash")
+            print("Sentinel: Vertex AI Gemini Pro Initialized.")
+            return model
+        except Exception as e:
+            print(f"Sentinel: Vertex AI Init Failed ({e}). Using VADER fallback.")
+            return None
+
+    def warm_up(self):
+        """Loads VADER and the Gemini model ahead of the first request."""
+        self.analyzer
+        self.model
+
     def scan_interaction(self, text_content):
         """
         Analyzes an interaction for Compliance Risk.
         Returns: { 'risk_level': str, 'flags': list, 'sentiment': float }
+        Timed per source (llm / rules) in recoverai_hot_path_duration_seconds.
+        """
+        with HOT_PATH.time(operation="sentinel.scan_interaction", source="rules") as timer:
+            if self.model:
+                timer.labels["source"] = "llm"
+                result = self.scan_llm(text_content)
+                if result is not None:
+                    return result
+                LLM_FALLBACKS.inc(operation="sentinel.scan_interaction")
+                timer.labels["source"] = "llm_fallback"
+
+            # 2. FALLBACK RULES (Old VADER/Keyword Logic)
+            return self.scan_rules(text_content)
+
+    def scan_llm(self, text_content):
+        """
+        LLM path. Returns None when there is no model or the call / its JSON fails.
         """
-        
         # 1. GENERATIVE AI CHECK (The Brain)
         # If enabled, ask Gemini for a sophisticated legal opinion
         if self.model:
@@ -77,19 +142,37 @@ class Sentinel:
 
             except Exception as e:
                 print(f"Sentinel: Vertex AI Analysis Failed ({e}). Falling back to Rules.")
+                return None
 
-        # 2. FALLBACK RULES (Old VADER/Keyword Logic)
-        flags = []
+    def scan_rules(self, text_content):
+        """
+        Rules Engine path: keywords -> VADER sentiment -> risk -> intent.
+        Each stage is its own method so benchmarks can time them separately.
+        """
         text_lower = text_content.lower()
+        flags = self.check_keywords(text_lower)
+        sentiment_score = self.score_sentiment(text_content)
+        risk_level = self.classify_risk(flags, sentiment_score)
+        intent, sentiment_score = self.classify_intent(text_lower, sentiment_score)
+            
+        return {
+            "risk_level": risk_level,
+            "sentiment_score": round(sentiment_score, 2),
+            "violation_flags": flags,
+            "intent": intent,
+            "audit_recommendation": "Human Review" if risk_level in ["HIGH", "CRITICAL"] else "Auto-Approve",
+            "source": "Rules Engine (VADER)"
+        }
 
+    def check_keywords(self, text_lower):
         # KEYWORD CHECK (The Hard Guardrail)
-        for word in self.banned_words:
-            if word in text_lower:
-                flags.append(f"VIOLATION_KEYWORD: '{word}'")
+        return [f"VIOLATION_KEYWORD: '{word}'" for word in self.banned_words if word in text_lower]
 
+    def score_sentiment(self, text_content):
         # SENTIMENT CHECK (The Soft Guardrail)
-        sentiment_score = self.analyzer.polarity_scores(text_content)['compound']
-        
+        return self.analyzer.polarity_scores(text_content)['compound']
+
+    def classify_risk(self, flags, sentiment_score):
         # RISK CLASSIFICATION
         risk_level = "LOW"
         if len(flags) > 0:
@@ -98,16 +181,18 @@ class Sentinel:
             risk_level = "HIGH"
         elif sentiment_score < -0.1:
             risk_level = "MEDIUM"
-            
-        # INTENT CHECK (Basic Rules)
+        return risk_level
+
+    def classify_intent(self, text_lower, sentiment_score):
+        """
+        INTENT CHECK (Basic Rules). Returns (intent, sentiment_score);
+        a refusal forces the sentiment strongly negative.
+        """
         intent = "GENERAL"
         ptp_keywords = ["pay", "tomorrow", "friday", "monday", "promise", "send", "payment", "clear", "settle", "cheque", "transfer", "remit"]
         dispute_keywords = ["dispute", "wrong", "mistake", "error", "charged", "incorrect", "already paid", "never received"]
         refusal_keywords = ["not pay", "won't pay", "refuse", "not going to pay", "can't pay", "no money"]
         
-        # Lowercase for matching
-        text_lower = text_content.lower()
-        
         if any(word in text_lower for word in ptp_keywords):
             # Allow PTP even with slightly negative sentiment (e.g. frustrated but paying)
             if sentiment_score > -0.7:
@@ -120,16 +205,9 @@ class Sentinel:
         if any(word in text_lower for word in dispute_keywords):
             # Dispute usually overrides GENERAL
             intent = "DISPUTE"
-            
-        return {
-            "risk_level": risk_level,
-            "sentiment_score": round(sentiment_score, 2),
-            "violation_flags": flags,
-            "intent": intent,
-            "audit_recommendation": "Human Review" if risk_level in ["HIGH", "CRITICAL"] else "Auto-Approve",
-            "source": "Rules Engine (VADER)"
-        }
+        return intent, sentiment_score
 
+    @timed("sentinel.analyze_audio", source="llm")
     async def analyze_audio(self, audio_content, mime_type="audio/webm"):
         """
         Multimodal Audio analysis using Gemini.
@@ -155,8 +233,9 @@ class Sentinel:
             }
             """
             
-            # Send audio bytes directly to Gemini
-            response = self.model.generate_content([
+            # Send audio bytes directly to Gemini (blocking SDK call: keep it off the event loop)
+            Part = vertexai.generative_models.Part
+            response = await asyncio.to_thread(self.model.generate_content, [
                 Part.from_text(prompt),
                 Part.from_data(data=audio_content, mime_type=mime_type)
             ])
@@ -0,0 +1,27 @@
+"""
+JSON encoding for responses: orjson when installed (several times faster than the stdlib
+encoder and writes UTF-8 bytes directly), falling back to compact json.dumps.
+"""
+
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # numpy scalars/arrays come back from the risk engine; dict keys may be ints
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps(content) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """Default response class of the app (FastAPI's ORJSONResponse is deprecated)."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
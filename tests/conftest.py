@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+
+import pytest
+
+from modules.query_stats import count_queries
+
+@pytest.fixture
+def max_queries():
+    """
+    Query budget for a block:  with max_queries(2): client.get("/api/v1/cases")
+    Fails listing every statement when the block runs more queries than allowed.
+    """
+    @contextmanager
+    def budget(limit):
+        with count_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"{stats.count} queries (budget {limit}):\n" + "\n".join(f"  {s}" for s in stats.statements)
+        )
+    return budget
@@ -0,0 +1,93 @@
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+import main
+from main import app
+from modules.database import Base, engine, SessionLocal, AsyncSessionLocal, InvoiceDB, InteractionLogDB, get_portfolio_version
+from modules.security import verify_token
+from modules.sentinel_guard import analyzer
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+class FakeAudioModel:
+    def __init__(self, verdict):
+        self.verdict = verdict
+
+    def generate_content(self, parts):
+        return SimpleNamespace(text=json.dumps(self.verdict))
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    part = SimpleNamespace(from_text=lambda text: text, from_data=lambda data, mime_type: data)
+    monkeypatch.setattr(analyzer, "vertexai", SimpleNamespace(generative_models=SimpleNamespace(Part=part)))
+    previous = main.sentinel.model
+    main.sentinel.model = FakeAudioModel({"transcript": "I will pay on Friday", "risk_level": "LOW",
+                                          "violation_flags": [], "intent": "PTP"})
+    yield
+    main.sentinel.model = previous
+
+def create_case(name):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": 9000, "age_days": 40, "credit_score": 0.5
+    }).json()["case_id"]
+
+def test_async_session_shares_the_version_and_change_hooks():
+    async def write(invoice_id):
+        async with AsyncSessionLocal() as db:
+            db.add(InteractionLogDB(invoice_id=invoice_id, created_at=datetime(2025, 1, 1), interaction_text="async"))
+            await db.commit()
+
+    invoice_id = int(create_case("Async Hooks Pvt Ltd").replace("C-", ""))
+    db = SessionLocal()
+    before = get_portfolio_version(db)
+    db.close()
+
+    asyncio.run(write(invoice_id))
+
+    db = SessionLocal()
+    try:
+        log = db.query(InteractionLogDB).filter(InteractionLogDB.invoice_id == invoice_id).one()
+        assert get_portfolio_version(db) == log.change_seq == before + 1
+    finally:
+        db.close()
+
+def test_analyze_audio_logs_and_updates_the_case(fake_gemini, max_queries):
+    case_id = create_case("Async Audio Exports")
+    with max_queries(12):  # Async engine statements are counted like the sync ones
+        response = client.post(f"/api/v1/cases/{case_id}/analyze_audio",
+                               files={"file": ("call.webm", b"fake-audio", "audio/webm")})
+    assert response.status_code == 200
+    assert response.json()["new_invoice_status"] == "UNDER_REVIEW"
+
+    history = client.get(f"/api/v1/cases/{case_id}/history").json()["items"]
+    assert history[0]["text"] == "[VOICE RECORDING] I will pay on Friday"
+
+def test_recording_complete_downloads_without_blocking(fake_gemini, monkeypatch):
+    case_id = create_case("Async Recording Co")
+    client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "IN_PROGRESS"})
+
+    downloads = []
+    def recording(request):
+        downloads.append(str(request.url))
+        return httpx.Response(200, content=b"wav-bytes")
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: real_client(transport=httpx.MockTransport(recording), **kwargs))
+
+    response = client.post("/api/v1/telephony/recording_complete", params={"case_id": case_id},
+                           data={"RecordingUrl": "https://api.twilio.test/recording.wav"})
+    assert response.json() == {"status": "processed"}
+    assert downloads == ["https://api.twilio.test/recording.wav"]
+
+    db = SessionLocal()
+    try:
+        invoice = db.query(InvoiceDB).filter(InvoiceDB.id == int(case_id.replace("C-", ""))).one()
+        assert invoice.status == "UNDER_REVIEW"
+    finally:
+        db.close()
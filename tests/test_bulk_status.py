@@ -0,0 +1,69 @@
+import random
+
+from fastapi.testclient import TestClient
+from main import app
+from modules import portfolio_summary
+from modules.database import Base, engine, SessionLocal, InvoiceDB, StatusHistoryDB
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def create_case(name, amount=10000, age_days=45):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": amount, "age_days": age_days, "credit_score": 0.5
+    }).json()["case_id"]
+
+def bulk(**payload):
+    return client.post("/api/v1/cases/status/bulk", json=payload)
+
+def test_bulk_update_by_ids_moves_valid_cases_and_rejects_the_rest():
+    portfolio_summary.reconcile()
+    pending = [create_case(f"Bulk Ids {i} Ltd") for i in range(3)]
+    in_progress = create_case("Bulk Ids Progress Ltd")
+    client.patch(f"/api/v1/cases/{in_progress}/status", json={"new_status": "IN_PROGRESS"})
+
+    response = bulk(new_status="closed", case_ids=pending + [in_progress, "C-99999999", "X-abc"], reason="Settled batch")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 4 and body["case_ids"] == sorted(pending + [in_progress], key=lambda c: int(c[2:]))
+    assert [r["detail"] for r in body["rejected"]] == ["Case not found", "Invalid case_id format"]
+
+    # Closed cases cannot move again: rejected per case with their current status
+    again = bulk(new_status="IN_PROGRESS", case_ids=pending[:2]).json()
+    assert again["updated"] == 0
+    assert again["rejected"] == [{"case_id": c, "current_status": "CLOSED", "detail": "Invalid transition: CLOSED → IN_PROGRESS"}
+                                 for c in pending[:2]]
+
+    db = SessionLocal()
+    try:
+        invoice = db.get(InvoiceDB, int(pending[0][2:]))
+        assert invoice.status == "CLOSED" and invoice.closed_at and invoice.closed_reason == "Settled batch"
+        history = db.query(StatusHistoryDB).filter(StatusHistoryDB.invoice_id == int(in_progress[2:])).order_by(StatusHistoryDB.id).all()
+        assert [(h.old_status, h.new_status, h.changed_by, h.auto_updated) for h in history] == [
+            ("PENDING", "IN_PROGRESS", "test_user", 0), ("IN_PROGRESS", "CLOSED", "test_user", 0)]
+    finally:
+        db.close()
+    assert portfolio_summary.reconcile() == []
+
+def test_bulk_update_by_filter_and_query_count_does_not_grow_with_cases(max_queries):
+    age = random.randint(10**6, 10**9)  # Only this run's cases match (the test database persists)
+    cohort = {"min_age_days": age, "max_age_days": age}
+    cases = [create_case(f"Bulk Filter {i} Ltd", amount=1000 + i, age_days=age) for i in range(40)]
+    with max_queries(9):  # Version lock, refused, summary aggregate + upsert, history insert, update, commit
+        body = bulk(new_status="IN_PROGRESS", filter={"status": "pending", **cohort}).json()
+    assert body["updated"] == 40 and set(body["case_ids"]) == set(cases) and body["rejected"] == []
+
+    escalated = bulk(new_status="ESCALATED", filter=cohort).json()
+    assert escalated["updated"] == 40
+    rejected = bulk(new_status="RESOLVED", filter=cohort).json()
+    assert rejected["updated"] == 0 and len(rejected["rejected"]) == 40
+    assert rejected["rejected"][0]["detail"] == "Invalid transition: ESCALATED → RESOLVED"
+    assert portfolio_summary.reconcile() == []
+
+def test_bulk_update_validates_the_request():
+    assert bulk(new_status="ARCHIVED", case_ids=["C-1"]).status_code == 400
+    assert bulk(new_status="CLOSED").status_code == 400
+    assert bulk(new_status="CLOSED", case_ids=["C-1"], filter={"status": "PENDING"}).status_code == 400
+    assert bulk(new_status="CLOSED", filter={}).status_code == 400
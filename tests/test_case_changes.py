@@ -0,0 +1,70 @@
+from fastapi.testclient import TestClient
+from main import app
+from modules.database import Base, engine, SessionLocal, DebtorDB, InvoiceDB
+from modules.ingestion import purge_sample_data
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def changes(since):
+    response = client.get("/api/v1/cases/changes", params={"since": since})
+    assert response.status_code == 200
+    return response.json()
+
+def create_case(name):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": 8000, "age_days": 20, "credit_score": 0.6
+    }).json()["case_id"]
+
+def test_first_call_is_a_full_snapshot_matching_the_case_list():
+    feed = changes(0)
+    listing = client.get("/api/v1/cases")
+    assert feed["reset"] is True
+    assert feed["cursor"] == int(listing.headers["x-portfolio-version"])
+    assert {c["case_id"] for c in feed["changed"]} == {c["case_id"] for c in listing.json()}
+
+def test_feed_reports_only_what_changed_since_the_cursor():
+    cursor = changes(0)["cursor"]
+    quiet = changes(cursor)
+    assert quiet == {"cursor": cursor, "reset": False, "changed": [], "removed": []}
+
+    case_id = create_case("Change Feed Logistics")
+    feed = changes(cursor)
+    assert [c["case_id"] for c in feed["changed"]] == [case_id]
+    assert feed["cursor"] > cursor
+
+    cursor = feed["cursor"]
+    client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": "Payment will be sent Monday"})
+    feed = changes(cursor)
+    assert [c["case_id"] for c in feed["changed"]] == [case_id]
+    assert len(feed["changed"][0]["history"]) == 1
+
+    cursor = feed["cursor"]
+    client.post(f"/api/v1/cases/{case_id}/update_contact", json={"phone": "+91 98000 00001"})
+    feed = changes(cursor)
+    assert feed["changed"][0]["phone"] == "+91 98000 00001"
+
+    cursor = feed["cursor"]
+    assert client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "RESOLVED"}).status_code == 200
+    feed = changes(cursor)
+    assert feed["changed"] == []
+    assert feed["removed"] == [case_id]
+
+def test_deletes_force_a_resync():
+    cursor = changes(0)["cursor"]
+    db = SessionLocal()
+    try:
+        debtor = DebtorDB(name="Change Feed Sample Co", credit_score=0.5, is_sample=1)
+        db.add(debtor)
+        db.flush()
+        db.add(InvoiceDB(debtor_id=debtor.id, amount=100, age_days=1, status="PENDING"))
+        db.commit()
+        purge_sample_data(db)
+    finally:
+        db.close()
+
+    feed = changes(cursor)
+    assert feed["reset"] is True
+    assert feed["cursor"] > cursor
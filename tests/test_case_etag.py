@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from main import app
+from modules.database import Base, engine
+from modules.response_cache import PageCache, etag_matches
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def etag():
+    return client.get("/api/v1/cases").headers["etag"]
+
+def test_unchanged_portfolio_revalidates_with_304():
+    tag = etag()
+    response = client.get("/api/v1/cases", headers={"If-None-Match": tag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == tag
+    assert response.content == b""
+
+    assert client.get("/api/v1/cases?page=2").headers["etag"] != tag
+
+def test_every_write_changes_the_etag():
+    tag = etag()
+    case_id = client.post("/api/v1/cases/create", json={
+        "company_name": "ETag Freight Ltd", "amount": 7000, "age_days": 12, "credit_score": 0.7
+    }).json()["case_id"]
+    assert etag() != tag
+
+    writes = [
+        lambda: client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": "We will settle next week"}),
+        lambda: client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "ESCALATED"}),
+        lambda: client.get("/api/v1/payment/success", params={"case_id": case_id, "amount_paid": 500}),
+        lambda: client.post("/api/v1/ingest", files={"file": ("etag.csv", b"company_name,amount,age_days\nETag Ingest Ltd,999,3\n")}),
+    ]
+    for write in writes:
+        tag = etag()
+        assert write().status_code == 200
+        fresh = client.get("/api/v1/cases", headers={"If-None-Match": tag})
+        assert fresh.status_code == 200
+        assert fresh.headers["etag"] != tag
+
+def test_if_none_match_parsing():
+    assert etag_matches('"v1-a", "v2-b"', '"v2-b"')
+    assert etag_matches('W/"v2-b"', '"v2-b"')
+    assert etag_matches("*", '"v2-b"')
+    assert not etag_matches('"v1-a"', '"v2-b"')
+    assert not etag_matches(None, '"v2-b"')
+
+def test_page_cache_is_bounded_and_drops_old_versions():
+    cache = PageCache("test", max_entries=2, max_bytes=10)
+    cache.put(1, "a", b"1111")
+    cache.put(1, "b", b"2222")
+    cache.put(1, "c", b"3333")  # Over max_entries: "a" is least recently used
+    assert cache.get(1, "a") is None and cache.get(1, "c") == b"3333"
+
+    cache.put(1, "big", b"x" * 11)  # Larger than the whole cache: not kept
+    assert cache.get(1, "big") is None
+
+    cache.put(2, "a", b"new")
+    assert cache.get(1, "c") is None  # Older versions can never be served again
+    cache.put(1, "late", b"stale")    # A slow request that read an older version
+    assert cache.get(1, "late") is None
+    assert cache.size == 3
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from main import app
+from modules.database import Base, engine
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def create_case(name):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": 6000, "age_days": 30, "credit_score": 0.6
+    }).json()["case_id"]
+
+def test_fields_projects_the_case_list():
+    case_id = create_case("Sparse Fieldset Mills")
+    client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": "Please call back tomorrow"})
+
+    full = {c["case_id"]: c for c in client.get("/api/v1/cases").json()}
+    sparse = client.get("/api/v1/cases", params={"fields": "companyName,status,pScore"}).json()
+    case = next(c for c in sparse if c["case_id"] == case_id)
+    assert list(case) == ["case_id", "companyName", "status", "pScore"]
+    assert all(c == {k: full[c["case_id"]][k] for k in c} for c in sparse)
+
+    only_ids = client.get("/api/v1/cases", params={"fields": "status"}).json()
+    assert {c["case_id"] for c in only_ids} == set(full)
+
+    response = client.get("/api/v1/cases", params={"fields": "status,secret"})
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+def test_history_pages_newest_first_with_keyset_cursor():
+    case_id = create_case("Keyset History Works")
+    texts = [f"Follow-up call number {i}" for i in range(7)]
+    for text in texts:
+        client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": text})
+
+    seen, cursor = [], None
+    while True:
+        page = client.get(f"/api/v1/cases/{case_id}/history", params={"limit": 3, **({"cursor": cursor} if cursor else {})}).json()
+        assert len(page["items"]) <= 3
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [item["text"] for item in seen] == texts[::-1]
+    assert len({item["id"] for item in seen}) == len(texts)
+
+    # Same entries as the embedded history of the case list
+    listed = next(c for c in client.get("/api/v1/cases").json() if c["case_id"] == case_id)
+    assert {h["id"] for h in listed["history"]} == {item["id"] for item in seen}
+
+def test_history_errors():
+    assert client.get("/api/v1/cases/C-99999999/history").status_code == 404
+    assert client.get("/api/v1/cases/abc/history").status_code == 400
+    case_id = create_case("Bad Cursor Co")
+    assert client.get(f"/api/v1/cases/{case_id}/history", params={"cursor": "!!"}).status_code == 400
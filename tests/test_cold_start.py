@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import main
+from modules.database import Base, engine, SessionLocal, UserDB
+from modules.security import get_password_hash
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("scipy", "pandas", "pyarrow", "vaderSentiment", "twilio", "stripe", "vertexai", "requests", "uvicorn")
+
+def test_importing_main_defers_heavy_modules():
+    code = f"import sys, main; print('LOADED=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert proc.stdout.strip().splitlines()[-1] == "LOADED="
+
+def test_fast_bootstrap_keeps_existing_admin_password():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        admin = db.query(UserDB).filter(UserDB.username == "admin").first()
+        if not admin:
+            admin = UserDB(username="admin", hashed_password=get_password_hash("password123"))
+            db.add(admin)
+            db.commit()
+        before = admin.hashed_password
+    finally:
+        db.close()
+
+    main.bootstrap(reset_admin_password=False)
+
+    db = SessionLocal()
+    try:
+        assert db.query(UserDB).filter(UserDB.username == "admin").one().hashed_password == before
+    finally:
+        db.close()
+
+def test_sentinel_loads_vader_on_first_scan():
+    sentinel = main.Sentinel()
+    assert sentinel._analyzer is None
+    assert sentinel.scan_rules("I will pay on Friday")["intent"] == "PTP"
+    assert sentinel._analyzer is not None
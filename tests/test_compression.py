@@ -0,0 +1,74 @@
+import gzip
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from main import app, case_list_cache
+from modules import compression, serialization
+from modules.database import Base, engine
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def create_case(name):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": 4000, "age_days": 25, "credit_score": 0.5
+    }).json()["case_id"]
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "BROTLI_AVAILABLE", False)
+
+def test_case_list_is_gzipped_and_cached_compressed(without_brotli):
+    for i in range(3):
+        create_case(f"Compression Textiles {i}")
+    plain = client.get("/api/v1/cases", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) > compression.COMPRESSION_MIN_BYTES
+
+    compressed = client.get("/api/v1/cases", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert compressed.headers["etag"] == plain.headers["etag"]
+    assert compressed.content == plain.content
+    assert compressed.num_bytes_downloaded < len(plain.content) / 3
+
+    # Compressed once per version: later requests are served the cached gzip body
+    cached = case_list_cache.get(int(plain.headers["x-portfolio-version"]), "#gzip")
+    assert gzip.decompress(cached) == plain.content
+    assert len(cached) == compressed.num_bytes_downloaded
+
+def test_middleware_compresses_large_responses_only(without_brotli):
+    case_id = create_case("Compression History Co")
+    for i in range(20):
+        client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": f"Debtor asked for a callback, attempt {i}"})
+    history = client.get(f"/api/v1/cases/{case_id}/history", headers={"Accept-Encoding": "gzip"})
+    assert history.headers["content-encoding"] == "gzip"
+    assert len(history.json()["items"]) == 20
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+def test_accept_encoding_negotiation(monkeypatch, without_brotli):
+    assert compression.negotiate("gzip, deflate") == "gzip"
+    assert compression.negotiate("br, gzip") == "gzip"
+    assert compression.negotiate("gzip;q=0, deflate") is None
+    assert compression.negotiate(None) is None
+    monkeypatch.setattr(compression, "BROTLI_AVAILABLE", None)
+    monkeypatch.setattr(compression, "load_brotli", lambda: object())
+    assert compression.negotiate("gzip, br") == "br"
+    assert compression.negotiate("gzip, br;q=0") == "gzip"
+
+def test_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    plain = client.get("/api/v1/cases", headers={"Accept-Encoding": "identity"})
+    raw = client.get("/api/v1/cases", headers={"Accept-Encoding": "br"})
+    assert raw.headers["content-encoding"] == "br"
+    assert raw.content == plain.content
+    assert brotli.decompress(compression.compress(b"x" * 5000, "br")) == b"x" * 5000
+
+def test_default_response_class_serializes_numpy():
+    response = serialization.FastJSONResponse({"p": np.float64(0.25), "n": np.int64(3), 1: "int key"})
+    assert response.body == b'{"p":0.25,"n":3,"1":"int key"}'
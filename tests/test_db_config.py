@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from modules import database
+from modules.database import engine, async_engine, engine_options
+
+sqlite_only = pytest.mark.skipif(engine.dialect.name != "sqlite", reason="SQLite profile")
+
+def test_pool_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(database, "DB_POOL_RECYCLE", 300)
+    options = engine_options("postgresql://user:pw@db/recoverai")
+    assert options["pool_size"] == 20 and options["pool_recycle"] == 300
+    assert options["pool_pre_ping"] is True
+    assert "connect_args" not in options
+
+    assert engine_options("sqlite:///./x.db")["connect_args"] == {"check_same_thread": False}
+    assert "connect_args" not in engine_options("sqlite+aiosqlite:///./x.db")
+    assert engine_options("sqlite://") == {"connect_args": {"check_same_thread": False}}
+
+@sqlite_only
+def test_every_connection_gets_the_profile_pragmas():
+    expected = database.SQLITE_PRAGMAS
+    with engine.connect() as conn:
+        pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+        if database.SQLITE_PROFILE == "wal":
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == expected.get("busy_timeout", 5000)
+
+    async def async_busy_timeout():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+    assert asyncio.run(async_busy_timeout()) == expected.get("busy_timeout", 5000)
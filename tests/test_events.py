@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from main import app
+from modules import events
+from modules.database import Base, engine
+from modules.security import create_access_token, verify_stream_token, verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+@pytest.fixture
+def subscriber():
+    """A bus subscription consumed from a private event loop, like one SSE client."""
+    loop = asyncio.new_event_loop()
+    subscriptions = []
+
+    def subscribe(**kwargs):
+        async def make():
+            return events.bus.subscribe(**kwargs)
+        subscriptions.append(loop.run_until_complete(make()))
+        return subscriptions[-1]
+
+    def receive(subscription):
+        loop.run_until_complete(asyncio.sleep(0))  # Run the delivery callbacks
+        return parse(subscription.drain())
+
+    yield subscribe, receive
+    for subscription in subscriptions:
+        events.bus.unsubscribe(subscription)
+    loop.close()
+
+def parse(chunk):
+    messages = []
+    for block in filter(None, chunk.split("\n\n")):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        messages.append((fields["event"], json.loads(fields["data"])))
+    return messages
+
+def create_case(name):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": 5000, "age_days": 15, "credit_score": 0.6
+    }).json()["case_id"]
+
+def test_committed_writes_are_published_and_coalesced_per_case(subscriber):
+    subscribe, receive = subscriber
+    case_id = create_case("Event Bus Traders")
+    subscription = subscribe()
+
+    response = client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": "Payment will be sent Monday"})
+    assert response.status_code == 200
+    version = int(client.get("/api/v1/cases").headers["x-portfolio-version"])
+
+    received = dict(receive(subscription))
+    assert received["interaction_logged"]["case_id"] == case_id
+    assert received["interaction_logged"]["log_id"] == response.json()["log_id"]
+    # PENDING -> IN_PROGRESS -> UNDER_REVIEW in one commit reaches the client as one transition
+    status = received["status_changed"]
+    assert (status["old_status"], status["new_status"]) == ("PENDING", "UNDER_REVIEW")
+    assert status["auto_updated"] is True
+    assert status["version"] == received["interaction_logged"]["version"] == version
+
+    client.get("/api/v1/payment/success", params={"case_id": case_id, "amount_paid": 5000})
+    [(kind, payload)] = receive(subscription)
+    assert (kind, payload["new_status"]) == ("status_changed", "RESOLVED")
+
+def test_rejected_writes_publish_nothing(subscriber):
+    subscribe, receive = subscriber
+    case_id = create_case("Event Bus Rollback Ltd")
+    subscription = subscribe()
+    assert client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "RESOLVED"}).status_code == 400
+    assert receive(subscription) == []
+
+def test_slow_client_drops_oldest_and_is_told_to_resync(subscriber):
+    subscribe, receive = subscriber
+    subscription = subscribe(maxsize=2)
+    for version, case_id in enumerate(["C-1", "C-2", "C-3"], start=10):
+        events.deliver([subscription], [events.InteractionLogged(case_id, version, version, "LOW", "GENERAL", "")])
+    messages = receive(subscription)
+    assert messages[0] == ("resync", {"since": 9})
+    assert [payload["case_id"] for _, payload in messages[1:]] == ["C-2", "C-3"]
+
+def test_stream_sends_heartbeats_and_unsubscribes_on_close():
+    async def run():
+        subscription = events.bus.subscribe(resync_since=41)
+        stream = events.event_stream(subscription, heartbeat=0.01)
+        assert (await anext(stream)).startswith("retry:")
+        assert parse(await anext(stream)) == [("resync", {"since": 41})]  # Reconnect with Last-Event-ID
+        assert await anext(stream) == ": keep-alive\n\n"
+        assert subscription in events.bus.subscribers
+        await stream.aclose()
+        assert subscription not in events.bus.subscribers
+    asyncio.run(run())
+
+def test_stream_token_may_come_from_the_query_string():
+    assert client.get("/api/v1/events").status_code == 401
+    token = create_access_token({"sub": "agent1"})
+    assert asyncio.run(verify_stream_token(token=None, access_token=token)) == "agent1"
+    with pytest.raises(HTTPException):
+        asyncio.run(verify_stream_token(token=None, access_token="not-a-jwt"))
@@ -0,0 +1,44 @@
+from datetime import datetime
+import numpy as np
+from modules.database import Base, engine, SessionLocal, InvoiceDB, DebtorDB, InteractionLogDB
+from modules.ingestion import purge_sample_data, read_upload
+from generate_portfolio import generate_debtors, generate_invoices, load_database, write_ingestion_file
+
+Base.metadata.create_all(bind=engine)
+
+AS_OF = datetime(2025, 1, 1)
+
+def test_generation_is_deterministic_from_seed():
+    ids = np.arange(1, 501)
+    debtors = np.arange(1, 101)
+    scores = generate_debtors(7, 0, debtors)["credit_score"].to_numpy()
+
+    first = generate_invoices(7, 0, ids, debtors, scores, AS_OF)
+    again = generate_invoices(7, 0, ids, debtors, scores, AS_OF)
+    other = generate_invoices(8, 0, ids, debtors, scores, AS_OF)
+
+    assert first.equals(again)
+    assert not first.equals(other)
+    assert first["p_score"].between(0, 1).all()
+
+def test_bulk_load_into_database():
+    db = SessionLocal()
+    try:
+        before = db.query(InvoiceDB).count()
+        stats = load_database(debtors=50, invoices=200, logs=300, seed=3, chunk_size=64)
+        assert stats["invoices"]["rows"] == 200
+
+        assert db.query(InvoiceDB).count() == before + 200
+        assert db.query(InteractionLogDB).filter(InteractionLogDB.risk_level == "CRITICAL").count() >= 1
+        assert db.query(DebtorDB).filter(DebtorDB.is_sample == 1).count() >= 50
+    finally:
+        purge_sample_data(db)
+        db.close()
+
+def test_ingestion_file_matches_upload_layout(tmp_path):
+    path = tmp_path / "portfolio.csv"
+    write_ingestion_file(str(path), "csv", debtors=20, invoices=150, chunk_size=64)
+
+    df = read_upload(path.read_bytes())
+    assert list(df.columns) == ["company_name", "amount", "age_days", "credit_score", "phone"]
+    assert len(df) == 150
@@ -0,0 +1,63 @@
+import gzip
+import pytest
+import pandas as pd
+from modules.database import Base, engine, SessionLocal, InvoiceDB, DebtorDB
+from modules.ingestion import detect_format, read_upload, process_csv_upload
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+Base.metadata.create_all(bind=engine)
+
+FRAME = pd.DataFrame({
+    "company_name": ["Format Co A", "Format Co B"],
+    "amount": [1200.0, 3400.0],
+    "age_days": [15, 60],
+    "credit_score": [0.8, 0.55],
+    "phone": ["9000000001", "9000000002"],
+})
+
+def encode(fmt):
+    csv_bytes = FRAME.to_csv(index=False).encode()
+    if fmt == "csv":
+        return csv_bytes
+    if fmt == "csv.gz":
+        return gzip.compress(csv_bytes)
+
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(FRAME, preserve_index=False)
+    if fmt == "csv.zst":
+        with pa.CompressedOutputStream(sink, "zstd") as out:
+            out.write(csv_bytes)
+    elif fmt == "parquet":
+        pq.write_table(table, sink)
+    elif fmt == "arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+@pytest.mark.parametrize("fmt", ["csv", "csv.gz", "csv.zst", "parquet", "arrow", "arrow_stream"])
+def test_every_format_reads_the_same_frame(fmt):
+    payload = encode(fmt)
+    assert detect_format(payload) == fmt
+
+    df = read_upload(payload)
+    assert list(df["company_name"]) == list(FRAME["company_name"])
+    assert list(df["amount"]) == list(FRAME["amount"])
+    assert list(df["age_days"]) == list(FRAME["age_days"])
+
+def test_parquet_upload_ingests_invoices():
+    db = SessionLocal()
+    try:
+        results = process_csv_upload(encode("parquet"), db)
+        assert results["total"] == 2
+
+        debtor = db.query(DebtorDB).filter(DebtorDB.name == "Format Co B").first()
+        invoice = db.query(InvoiceDB).filter(InvoiceDB.debtor_id == debtor.id).first()
+        assert invoice.amount == 3400.0
+        assert invoice.age_days == 60
+    finally:
+        db.close()
@@ -0,0 +1,36 @@
+import asyncio
+import httpx
+import main
+from main import app
+from modules.database import Base, engine, SessionLocal, DebtorDB, InvoiceDB
+from modules.security import verify_token
+from benchmarks.load_test import FakeSentinelModel, run_load, compare
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+
+def test_in_process_run_reports_every_endpoint(monkeypatch):
+    monkeypatch.setattr(main.sentinel, "model", FakeSentinelModel(latency_ms=0))
+
+    db = SessionLocal()
+    debtor = DebtorDB(name="Load Harness Ltd", credit_score=0.6)
+    db.add(debtor)
+    db.flush()
+    db.add(InvoiceDB(debtor_id=debtor.id, amount=4200, age_days=20, status="PENDING"))
+    db.commit()
+    db.close()
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_load(client, requests=60, concurrency=4)
+
+    report = asyncio.run(go())
+    assert report["total_requests"] == 60
+    assert set(report["endpoints"]) == {"cases", "analyze", "log_interaction", "status", "sentinel_audit"}
+    for stats in report["endpoints"].values():
+        assert stats["error_rate"] == 0
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+    # The same report never regresses against itself
+    assert compare(report, report, threshold_pct=0) == []
@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+import main
+from main import app
+from modules import metrics
+from modules.database import Base, engine
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+class FailingModel:
+    def generate_content(self, prompt):
+        raise RuntimeError("quota exceeded")
+
+def sample(text, name, **labels):
+    """Value of one sample line in the exposition text (None when absent)."""
+    wanted = name + "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+    for line in text.splitlines():
+        if line.startswith(wanted + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+def test_routes_are_labelled_by_template():
+    response = client.patch("/api/v1/cases/C-999999/status", json={"status": "CLOSED"})
+    body = client.get("/metrics").text
+
+    assert "# TYPE recoverai_http_request_duration_seconds histogram" in body
+    count = sample(body, "recoverai_http_request_duration_seconds_count",
+                   method="PATCH", route="/api/v1/cases/{case_id}/status", status=str(response.status_code))
+    assert count >= 1
+    assert "C-999999" not in body
+    assert sample(body, "recoverai_http_requests_in_flight", method="PATCH", route="/api/v1/cases/{case_id}/status") == 0
+
+def test_sentinel_timer_split_by_source_and_fallbacks_counted(monkeypatch):
+    monkeypatch.setattr(main.sentinel, "model", FailingModel())
+    before = sample(metrics.render(), "recoverai_llm_fallbacks_total", operation="sentinel.scan_interaction") or 0
+
+    result = client.post("/api/v1/sentinel/audit", json={"text": "I will pay on Friday"}).json()
+    assert result["source"] == "Rules Engine (VADER)"
+
+    body = client.get("/metrics").text
+    assert sample(body, "recoverai_llm_fallbacks_total", operation="sentinel.scan_interaction") == before + 1
+    assert sample(body, "recoverai_hot_path_duration_seconds_count",
+                  operation="sentinel.scan_interaction", source="llm_fallback") >= 1
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_latency_seconds", "Test.", ("op",), buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, op="x")
+        text = "\n".join(histogram.render())
+        assert sample(text, "test_latency_seconds_bucket", op="x", le="0.1") == 1
+        assert sample(text, "test_latency_seconds_bucket", op="x", le="1.0") == 3
+        assert sample(text, "test_latency_seconds_bucket", op="x", le="+Inf") == 4
+        assert sample(text, "test_latency_seconds_count", op="x") == 4
+        assert sample(text, "test_latency_seconds_sum", op="x") == 6.05
+    finally:
+        metrics.REGISTRY.remove(histogram)
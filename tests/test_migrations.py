@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+import migrate
+from modules import migrations
+from modules.database import Base, init_schema
+
+FILL_SCRIPT = '''
+def upgrade(op):
+    op.add_column("invoices", "amount_due", "FLOAT")
+    op.backfill("amount_due", "invoices", "UPDATE invoices SET amount_due = amount - paid_amount "
+                                          "WHERE id >= :low AND id < :high")
+    op.create_index("ix_invoices_amount_due", "invoices", ["amount_due"])
+'''
+
+def sqlite_bind(tmp_path, name="app.db"):
+    return create_engine(f"sqlite:///{tmp_path / name}")
+
+def columns(bind, table):
+    return {c["name"] for c in inspect(bind).get_columns(table)}
+
+def test_new_database_is_stamped_and_old_one_is_upgraded(tmp_path):
+    fresh = sqlite_bind(tmp_path, "fresh.db")
+    init_schema(fresh)
+    assert all(applied_at for _, _, applied_at, _ in migrations.status(fresh))
+
+    # A database from before change_seq: no column, no index, no schema_migrations table
+    old = sqlite_bind(tmp_path, "old.db")
+    Base.metadata.create_all(bind=old)
+    with old.begin() as conn:
+        for table in ("invoices", "interaction_logs"):
+            conn.execute(text(f"DROP INDEX ix_{table}_change_seq"))
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN change_seq"))
+    init_schema(old)
+    assert "change_seq" in columns(old, "invoices") and "change_seq" in columns(old, "interaction_logs")
+    assert "ix_invoices_change_seq" in {i["name"] for i in inspect(old).get_indexes("invoices")}
+    assert migrations.pending(old) == []
+
+def test_interrupted_backfill_resumes_from_its_last_batch(tmp_path, monkeypatch):
+    scripts = tmp_path / "migrations"
+    scripts.mkdir()
+    (scripts / "0001_amount_due.py").write_text(FILL_SCRIPT)
+    bind = sqlite_bind(tmp_path)
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        conn.execute(text("INSERT INTO invoices (id, amount, paid_amount) VALUES " +
+                          ", ".join(f"({i}, {i * 100}, 0)" for i in range(1, 101))))
+
+    pauses = []
+    def sleep(seconds):
+        pauses.append(seconds)
+        if len(pauses) == 3:
+            raise KeyboardInterrupt  # Deploy killed the runner mid-backfill
+    monkeypatch.setattr(migrations.time, "sleep", sleep)
+    with pytest.raises(KeyboardInterrupt):
+        migrations.upgrade(bind, directory=str(scripts), batch_size=10, sleep_ms=5, log=lambda line: None)
+    assert pauses == [0.005] * 3
+    [(version, _, applied_at, backfills)] = migrations.status(bind, directory=str(scripts))
+    assert applied_at is None and backfills == {"amount_due": 31}
+
+    log = []
+    monkeypatch.setattr(migrations.time, "sleep", lambda seconds: None)
+    assert migrations.upgrade(bind, directory=str(scripts), batch_size=10, log=log.append) == [1]
+    assert "backfill amount_due: 70 rows updated" in log[1]
+    with bind.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM invoices WHERE amount_due = amount")).scalar() == 100
+        assert conn.execute(select(migrations.migration_progress)).all() == []
+    assert "ix_invoices_amount_due" in {i["name"] for i in inspect(bind).get_indexes("invoices")}
+
+def test_cli_creates_numbered_scripts_and_reports_status(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(migrations, "MIGRATIONS_DIR", str(tmp_path))
+    (tmp_path / "0001_first.py").write_text("def upgrade(op):\n    pass\n")
+    migrate.main(["new", "Add case owner index"])
+    assert (tmp_path / "0002_add_case_owner_index.py").exists()
+
+    bind = sqlite_bind(tmp_path)
+    monkeypatch.setattr(migrate, "engine", bind)
+    migrate.main(["upgrade", "--to", "1"])
+    migrate.main(["status"])
+    output = capsys.readouterr().out
+    assert "Applied 1 migration(s)" in output
+    assert "0002_add_case_owner_index" in output and output.rstrip().endswith("pending")
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func, text, update
+from main import app
+from modules import portfolio_summary
+from modules.database import Base, engine, SessionLocal, DebtorDB, InvoiceDB
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def create_case(name, amount=10000, age_days=45):
+    return client.post("/api/v1/cases/create", json={
+        "company_name": name, "amount": amount, "age_days": age_days, "credit_score": 0.5
+    }).json()["case_id"]
+
+def test_every_write_path_keeps_the_summary_exact():
+    portfolio_summary.reconcile()  # Baseline: whatever earlier tests left behind
+    case_id = create_case("Summary Paths Ltd")
+    steps = [
+        lambda: client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": "I will pay on Friday"}),
+        lambda: client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "IN_PROGRESS"}),
+        lambda: client.get("/api/v1/payment/success", params={"case_id": case_id, "amount_paid": 2500}),
+        lambda: client.get("/api/v1/payment/success", params={"case_id": case_id, "amount_paid": 7500}),
+        lambda: client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "CLOSED", "reason": "Paid"}),
+    ]
+    assert portfolio_summary.reconcile() == []
+    for step in steps:
+        step()
+        assert portfolio_summary.reconcile() == []
+
+    # Ingest, after a sample debtor it purges with a bulk DELETE
+    db = SessionLocal()
+    debtor = DebtorDB(name="Summary Sample Co", credit_score=0.5, is_sample=1)
+    db.add(debtor)
+    db.flush()
+    db.add(InvoiceDB(debtor_id=debtor.id, amount=999, age_days=400))
+    db.commit()
+    db.close()
+    csv = "company_name,amount,age_days,credit_score\nSummary Ingest Ltd,4200,95,0.7\nSummary Ingest Two,800,5,0.4\n"
+    client.post("/api/v1/ingest", files={"file": ("summary.csv", csv.encode())})
+    assert portfolio_summary.reconcile() == []
+
+    # A bulk UPDATE is rebuilt at commit
+    db = SessionLocal()
+    db.execute(update(InvoiceDB).where(InvoiceDB.amount == 800).values(risk_level="HIGH"))
+    db.commit()
+    db.close()
+    assert portfolio_summary.reconcile() == []
+
+def test_summary_endpoint_reads_the_table_not_the_invoices(max_queries):
+    create_case("Summary Endpoint Ltd", amount=1234.5, age_days=200)
+    with max_queries(2):  # Portfolio version + summary rows
+        summary = client.get("/api/v1/portfolio/summary").json()
+
+    db = SessionLocal()
+    try:
+        count, amount, paid = db.query(func.count(), func.sum(InvoiceDB.amount), func.sum(InvoiceDB.paid_amount)).one()
+        pending = db.query(func.count()).filter(InvoiceDB.status == "PENDING").scalar()
+        oldest = db.query(func.count()).filter(InvoiceDB.age_days > 180).scalar()
+    finally:
+        db.close()
+    assert summary["totals"] == {"invoices": count, "amount": round(amount, 2), "paid": round(paid, 2),
+                                 "outstanding": round(amount - paid, 2)}
+    assert summary["by_status"]["PENDING"]["invoices"] == pending
+    assert summary["by_age_bucket"]["180+"]["invoices"] == oldest
+    assert list(summary["by_age_bucket"]) == [b for b in ["0-30", "31-60", "61-90", "91-180", "180+"]
+                                              if b in summary["by_age_bucket"]]
+
+def test_reconcile_repairs_drift():
+    create_case("Summary Drift Ltd", amount=5000, age_days=10)
+    portfolio_summary.reconcile()
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE portfolio_summary SET invoices = invoices + 3, amount = amount - 10 "
+                          "WHERE status = 'PENDING' AND age_bucket = '0-30'"))
+        conn.execute(text("INSERT INTO portfolio_summary VALUES ('GHOST', 'SAFE', 'NONE', '0-30', 2, 50.0, 0.0)"))
+    drifted = portfolio_summary.reconcile()
+    assert ("GHOST", "SAFE", "NONE", "0-30") in drifted
+    assert all(key[0] in ("PENDING", "GHOST") for key in drifted)
+    assert "GHOST" not in client.get("/api/v1/portfolio/summary").json()["by_status"]
+    assert portfolio_summary.reconcile() == []
@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+import main
+from main import app
+from modules import profiler
+from modules.database import Base, engine
+from modules.security import create_access_token, verify_token
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+def auth(username):
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+@pytest.fixture(autouse=True)
+def profile_store(tmp_path, monkeypatch):
+    # Real tokens here: admin checks must see the actual user, not another module's override
+    monkeypatch.delitem(app.dependency_overrides, verify_token, raising=False)
+    store = profiler.ProfileStore(str(tmp_path), keep=3)
+    monkeypatch.setattr(profiler, "store", store)
+    return store
+
+def test_admin_header_captures_a_downloadable_profile():
+    response = client.post("/api/v1/sentinel/audit", json={"text": "I will pay on Friday"},
+                           headers={**auth("admin"), "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+
+    listed = client.get("/api/v1/admin/profiles", headers=auth("admin")).json()
+    assert listed[0]["id"] == profile_id
+    assert listed[0]["path"] == "/api/v1/sentinel/audit"
+    assert listed[0]["trigger"] == "header"
+
+    download = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=auth("admin"))
+    assert download.status_code == 200
+    for line in download.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+def test_header_from_non_admin_is_ignored_and_endpoints_are_admin_only():
+    response = client.post("/api/v1/sentinel/audit", json={"text": "hello"},
+                           headers={**auth("agent7"), "X-Profile": "1"})
+    assert "x-profile-id" not in response.headers
+    assert client.get("/api/v1/admin/profiles", headers=auth("agent7")).status_code == 403
+    assert client.get("/api/v1/admin/profiles/../../etc/passwd", headers=auth("admin")).status_code == 404
+
+def test_ring_buffer_keeps_only_the_newest(profile_store, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_RATE", 1.0)
+    ids = [client.get("/").headers["x-profile-id"] for _ in range(5)]
+
+    assert profile_store.ids() == sorted(ids, reverse=True)[:3]
@@ -0,0 +1,48 @@
+from datetime import datetime
+from modules.database import Base, engine, SessionLocal, InvoiceDB, DebtorDB, InteractionLogDB
+from modules.ingestion import purge_sample_data
+from add_sample_data import add_sample_data, SAMPLE_DEBTORS, SAMPLE_INVOICES
+
+Base.metadata.create_all(bind=engine)
+
+def test_sample_load_is_scored_and_idempotent():
+    add_sample_data()
+    add_sample_data()  # Second run must not duplicate anything
+
+    db = SessionLocal()
+    try:
+        samples = db.query(DebtorDB).filter(DebtorDB.is_sample == 1).all()
+        assert len(samples) == len(SAMPLE_DEBTORS)
+
+        invoices = db.query(InvoiceDB).filter(InvoiceDB.debtor_id.in_([d.id for d in samples])).all()
+        assert len(invoices) == len(SAMPLE_INVOICES)
+        assert all(inv.p_score > 0 and inv.decision != "PENDING" for inv in invoices)
+    finally:
+        db.close()
+
+def test_purge_removes_only_sample_rows():
+    add_sample_data()
+
+    db = SessionLocal()
+    try:
+        real = DebtorDB(name="Purge Survivor Ltd", credit_score=0.7, is_sample=0)
+        db.add(real)
+        db.flush()
+        real_invoice = InvoiceDB(debtor_id=real.id, amount=999, age_days=4)
+        db.add(real_invoice)
+
+        sample = db.query(DebtorDB).filter(DebtorDB.is_sample == 1).first()
+        sample_invoice = db.query(InvoiceDB).filter(InvoiceDB.debtor_id == sample.id).first()
+        db.add(InteractionLogDB(invoice_id=sample_invoice.id, created_at=datetime.utcnow(), interaction_text="hi"))
+        db.commit()
+        sample_invoice_id, real_invoice_id = sample_invoice.id, real_invoice.id
+
+        purged = purge_sample_data(db)
+        assert purged["debtors"] == len(SAMPLE_DEBTORS)
+        assert purged["invoices"] == len(SAMPLE_INVOICES)
+
+        assert db.query(DebtorDB).filter(DebtorDB.is_sample == 1).count() == 0
+        assert db.query(InteractionLogDB).filter(InteractionLogDB.invoice_id == sample_invoice_id).count() == 0
+        assert db.query(InvoiceDB).filter(InvoiceDB.id == real_invoice_id).count() == 1
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+import main
+from main import app
+from modules.database import Base, engine, SessionLocal, InvoiceDB, DebtorDB
+from modules.ingestion import process_csv_upload
+from modules.riskon_engine.model import RiskonODE
+from modules.allocation_core.agent import AllocationAgent
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+
+def test_batch_matches_scalar_riskon():
+    """Vectorized RISKON must agree with the step loop, boosts included"""
+    engine_ = RiskonODE(decay_rate=0.03, boost_factor=0.15)
+    probs = [0.9, 0.5, 0.2, 0.75]
+    ages = [0, 30, 180, 45]
+    logs = [[], [{"day": 5, "weight": 1.2}, {"day": 20, "weight": 1.5}], [{"day": 200, "weight": 2.0}], [{"day": 0, "weight": -3.0}]]
+
+    batch = engine_.predict_probability_batch(probs, ages, logs)
+    for i in range(len(probs)):
+        assert batch[i] == engine_.predict_probability(probs[i], ages[i], logs[i])
+
+    agent = AllocationAgent(engine_)
+    actions = agent.allocate_batch(batch)
+    for i in range(len(probs)):
+        case = {"initial_score": probs[i], "age_days": ages[i], "history_logs": logs[i]}
+        assert actions[i] == agent.allocate_case(case)["action"]
+
+def test_csv_upload_scores_new_invoices():
+    csv = b"company_name,amount,age_days,credit_score,phone\nScore Ingest A,1111,10,0.9,111\nScore Ingest B,2222,150,0.4,222\n"
+
+    db = SessionLocal()
+    try:
+        results = process_csv_upload(csv, db, score_on_ingest=True)
+        assert results["inserted"] == 2
+        assert results["scored"] == 2
+
+        debtor = db.query(DebtorDB).filter(DebtorDB.name == "Score Ingest B").first()
+        invoice = db.query(InvoiceDB).filter(InvoiceDB.debtor_id == debtor.id).first()
+        assert invoice.p_score == RiskonODE(decay_rate=0.03, boost_factor=0.15).predict_probability(0.4, 150, [])
+        assert invoice.decision == "ALLOCATE_LEGAL"
+        assert invoice.status == "PENDING"
+    finally:
+        db.close()
+
+def test_manual_case_scored_on_create(monkeypatch):
+    monkeypatch.setattr(main, "SCORE_ON_INGEST", True)
+    payload = {"company_name": "Score Create Corp", "amount": 5000, "age_days": 3, "credit_score": 0.95}
+    response = client.post("/api/v1/cases/create", json=payload)
+    assert response.status_code == 200
+
+    db = SessionLocal()
+    try:
+        invoice = db.query(InvoiceDB).filter(InvoiceDB.id == int(response.json()["case_id"].replace("C-", ""))).first()
+        assert invoice.p_score > 0.70
+        assert invoice.decision == "ALLOCATE_DIGITAL"
+    finally:
+        db.close()
@@ -0,0 +1,21 @@
+from modules.sentinel_guard.analyzer import Sentinel
+from benchmarks.bench_sentinel import load_corpus, evaluate
+
+INTENTS = {"PTP", "REFUSAL", "DISPUTE", "GENERAL"}
+RISK_LEVELS = {"LOW", "MEDIUM", "HIGH", "CRITICAL"}
+
+def test_corpus_labels_are_well_formed():
+    corpus = load_corpus()
+    assert len(corpus) == 2 * len(load_corpus(long_variants=False))
+    for item in corpus:
+        assert item["intent"] in INTENTS
+        assert item["risk_level"] in RISK_LEVELS
+        assert item["violation"] == (item["risk_level"] == "CRITICAL")
+
+def test_rules_engine_does_not_degrade():
+    """Floors are the rules engine's accuracy when the corpus was added; raise them as it improves."""
+    accuracy = evaluate(Sentinel(), load_corpus())
+    assert accuracy["intent_accuracy"] >= 0.70
+    assert accuracy["risk_accuracy"] >= 0.58
+    assert accuracy["violation_precision"] == 1.0
+    assert accuracy["violation_recall"] >= 0.75
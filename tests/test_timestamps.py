@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from main import app
+from modules import migrations
+from modules.database import Base, engine, InteractionLogDB, InvoiceDB, StatusHistoryDB
+from modules.security import verify_token
+
+Base.metadata.create_all(bind=engine)
+app.dependency_overrides[verify_token] = lambda: "test_user"
+client = TestClient(app)
+
+def legacy_database(path):
+    """A database as the string-timestamp schema left it: ISO values, no range indexes."""
+    bind = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        for index in ("ix_interaction_logs_invoice_created", "ix_status_history_changed_at", "ix_invoices_closed_at"):
+            conn.execute(text(f"DROP INDEX {index}"))
+        conn.execute(text("INSERT INTO invoices (id, status, resolved_at, closed_at) VALUES "
+                          "(1, 'CLOSED', '2024-12-01T10:00:00', '2024-12-02T09:30:00.250000'), (2, 'PENDING', NULL, NULL)"))
+        for i, stamp in enumerate(["2024-12-30T23:59:59", "2024-12-31T00:00:00.000001", "2024-11-01T08:00:00",
+                                   "2024-12-31 12:00:00.000000", None], start=1):
+            conn.execute(text("INSERT INTO interaction_logs (id, invoice_id, created_at) VALUES (:id, 1, :at)"),
+                         {"id": i, "at": stamp})
+        conn.execute(text("INSERT INTO status_history (id, invoice_id, changed_at) VALUES (1, 1, '2024-12-02T09:30:00')"))
+    return bind
+
+def test_migration_backfills_in_batches_and_adds_range_indexes(tmp_path):
+    bind = legacy_database(tmp_path / "legacy.db")
+    assert migrations.upgrade(bind, batch_size=2, sleep_ms=0) == [m.version for m in migrations.discover()]
+
+    with bind.connect() as conn:
+        stored = conn.execute(text("SELECT created_at FROM interaction_logs ORDER BY id")).scalars().all()
+    assert stored == ["2024-12-30 23:59:59.000000", "2024-12-31 00:00:00.000001", "2024-11-01 08:00:00.000000",
+                      "2024-12-31 12:00:00.000000", None]
+    with Session(bind) as db:
+        invoice = db.get(InvoiceDB, 1)
+        assert invoice.closed_at == datetime(2024, 12, 2, 9, 30, 0, 250000)
+        assert db.get(StatusHistoryDB, 1).changed_at == datetime(2024, 12, 2, 9, 30)
+        since = datetime(2024, 12, 31)
+        recent = db.query(InteractionLogDB.id).filter(InteractionLogDB.invoice_id == 1, InteractionLogDB.created_at >= since) \
+            .order_by(InteractionLogDB.created_at.desc()).all()
+        assert [log_id for (log_id,) in recent] == [4, 2]
+
+        plan = " ".join(str(row) for row in db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM interaction_logs WHERE invoice_id = 1 AND created_at >= :since"),
+            {"since": "2024-12-31 00:00:00.000000"}))
+        assert "ix_interaction_logs_invoice_created (invoice_id=? AND created_at>?)" in plan
+
+    indexes = {table: {i["name"] for i in inspect(bind).get_indexes(table)} for table in ("invoices", "status_history")}
+    assert "ix_invoices_closed_at" in indexes["invoices"] and "ix_status_history_changed_at" in indexes["status_history"]
+    assert migrations.upgrade(bind) == []
+
+def test_api_writes_and_returns_timestamps():
+    case_id = client.post("/api/v1/cases/create", json={
+        "company_name": "Timestamp Traders", "amount": 1000, "age_days": 10, "credit_score": 0.5
+    }).json()["case_id"]
+    before = datetime.utcnow()
+    client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "IN_PROGRESS"})
+    resolved = client.patch(f"/api/v1/cases/{case_id}/status", json={"new_status": "RESOLVED"}).json()
+    assert before <= datetime.fromisoformat(resolved["resolved_at"]) < before + timedelta(minutes=1)
+
+    client.post(f"/api/v1/cases/{case_id}/log_interaction", json={"text": "Paid in full, thanks"})
+    item = client.get(f"/api/v1/cases/{case_id}/history").json()["items"][0]
+    assert datetime.fromisoformat(item["date"]) >= before